@@ -0,0 +1,99 @@
+# src/api.py
+"""
+API para gerar catálogos sem interface gráfica (scripts, tarefas agendadas, benchmarks).
+Nenhuma função deste módulo usa Tk: o andamento é informado pelo callback
+progresso(mensagem, log_type, atual, total).
+"""
+import os
+from catalogo import (carregar_planilha, gerar_catalogo_personalizado, atualizar_precos_catalogo,
+                      load_catalog_groups, get_documents_folder, get_user_data_folder, CatalogoError)
+from price_index import PriceIndex
+from pdf_optimizer import otimizar_pdf
+
+# Configuração padrão de cada catálogo (a mesma usada pela interface gráfica)
+CATALOGOS = {
+    "principal": {
+        "arquivo": "Catalogo_Principal.pdf",
+        "position": "left",
+        "style": "principal",
+    },
+    "secundario": {
+        "arquivo": "Catalogo_Secundario.pdf",
+        "position": "right",
+        "style": "secundario",
+    },
+}
+
+def planilha_padrao():
+    """Caminho padrão da planilha na pasta de dados do usuário."""
+    return os.path.join(get_user_data_folder(), "Planilha_Catalogo_2025.ods")
+
+def pasta_imagens_padrao(catalogo):
+    """Pasta padrão das imagens do catálogo ("principal" ou "secundario")."""
+    return os.path.join(get_documents_folder(), "images", f"catalogo_{catalogo}")
+
+def grupos_do_catalogo(catalogo):
+    """Retorna o dicionário de grupos (modelos salvos ou padrão) do catálogo."""
+    grupos_principal, grupos_secundario = load_catalog_groups()
+    return grupos_principal if catalogo == "principal" else grupos_secundario
+
+def carregar_precos(planilha=None):
+    """Carrega a planilha e retorna (df, codigo_coluna, preco_colunas, price_index)."""
+    df, codigo_coluna, preco_colunas = carregar_planilha(planilha or planilha_padrao())
+    return df, codigo_coluna, preco_colunas, PriceIndex(df, codigo_coluna, preco_colunas)
+
+def gerar(saida, catalogo="principal", planilha=None, pasta_imagens=None, grupos_ordenados=None, grupos_dict=None,
+          style=None, position=None, progresso=None, sobrescrever=True, **opcoes):
+    """
+    Gera um catálogo completo.
+    Os parâmetros omitidos usam a configuração padrão do catálogo escolhido
+    (pasta de imagens, grupos salvos, estilo e posição da tabela).
+    grupos_ordenados define a ordem e quais grupos entram (padrão: todos).
+    opcoes são repassadas para gerar_catalogo_personalizado (workers, usar_cache, incremental...).
+    Retorna True se o catálogo foi gravado; levanta CatalogoError se a planilha não puder ser lida.
+    """
+    if catalogo not in CATALOGOS:
+        raise CatalogoError(f"Catálogo desconhecido: {catalogo}")
+    config = CATALOGOS[catalogo]
+    df, codigo_coluna, preco_colunas, price_index = carregar_precos(planilha)
+    if grupos_dict is None:
+        grupos_dict = grupos_do_catalogo(catalogo)
+    if grupos_ordenados is None:
+        grupos_ordenados = list(grupos_dict.keys())
+    desconhecidos = [grupo for grupo in grupos_ordenados if grupo not in grupos_dict]
+    if desconhecidos:
+        raise CatalogoError(f"Grupos inexistentes: {', '.join(desconhecidos)}")
+    return gerar_catalogo_personalizado(
+        f"catalogo_{catalogo}",
+        pasta_imagens or pasta_imagens_padrao(catalogo),
+        saida,
+        df, codigo_coluna, preco_colunas,
+        grupos_ordenados=grupos_ordenados,
+        grupos_dict=grupos_dict,
+        position=position or config["position"],
+        style=style or config["style"],
+        progresso=progresso,
+        price_index=price_index,
+        confirmar_sobrescrita=(lambda _: True) if sobrescrever else (lambda _: False),
+        **opcoes
+    )
+
+def atualizar_precos(catalogo_pdf, planilha=None, progresso=None):
+    """Atualiza apenas as tabelas de preços de um catálogo já gerado."""
+    df, codigo_coluna, preco_colunas, price_index = carregar_precos(planilha)
+    return atualizar_precos_catalogo(catalogo_pdf, df, codigo_coluna, preco_colunas,
+                                     price_index=price_index, progresso=progresso)
+
+def caminho_versao_web(pdf):
+    """Caminho padrão da versão otimizada de um PDF (Catalogo.pdf -> Catalogo_web.pdf)."""
+    base, ext = os.path.splitext(pdf)
+    return f"{base}_web{ext or '.pdf'}"
+
+def otimizar(pdf, saida=None, alvo_mb=None, dpi=None, max_lado=None, qualidade=None, progresso=None):
+    """
+    Gera uma versão menor de um catálogo (imagens duplicadas removidas e,
+    opcionalmente, recomprimidas até alvo_mb megabytes). Retorna o RelatorioOtimizacao.
+    """
+    tamanho_alvo = int(alvo_mb * 1024 * 1024) if alvo_mb else None
+    return otimizar_pdf(pdf, saida or caminho_versao_web(pdf), tamanho_alvo=tamanho_alvo, dpi=dpi,
+                        max_lado=max_lado, qualidade=qualidade, progresso=progresso)
@@ -0,0 +1,197 @@
+# src/benchmarks/dados_sinteticos.py
+"""
+Gera um catálogo sintético para os benchmarks: planilha no mesmo layout que
+carregar_planilha espera e fotos de produto com os prefixos dos grupos.
+
+Uso (a partir da pasta src):
+    python -m benchmarks.dados_sinteticos --pasta /tmp/catalogo_sintetico --produtos 1000
+    python -m benchmarks.dados_sinteticos --pasta dados --produtos 100 --largura 1600 --altura 1200 --xlsx
+"""
+import os
+import sys
+import json
+import random
+import argparse
+import pandas as pd
+from PIL import Image, ImageDraw
+
+# Grupos usados quando não há modelos salvos (mesmo formato de GRUPOS_PRINCIPAL)
+GRUPOS_SINTETICOS = {
+    "Churrasco": ["LFC-"],
+    "Vazadas Gerais": ["LVZ-"],
+    "Cerveja": ["VZC-"],
+    "Carros": ["VCR-"],
+    "Profissões": ["LPF-"],
+    "Bandas": ["VBD-"],
+}
+
+# Layout da planilha lido por carregar_planilha: linhas de título antes do
+# cabeçalho, código na 5ª coluna e preços da 13ª à 19ª
+LINHAS_TITULO = 4
+COLUNA_CODIGO = 4
+PRIMEIRA_COLUNA_PRECO = 12
+COLUNAS_PRECO = 7
+TOTAL_COLUNAS = PRIMEIRA_COLUNA_PRECO + COLUNAS_PRECO
+
+# Arquivo que descreve o conjunto gerado (permite reaproveitá-lo entre execuções)
+DESCRICAO = "dados_sinteticos.json"
+
+def grupos_do_benchmark():
+    """Grupos do catálogo principal salvos pelo usuário ou, se não houver, GRUPOS_SINTETICOS."""
+    from catalogo import load_catalog_groups
+    grupos, _ = load_catalog_groups()
+    return grupos or GRUPOS_SINTETICOS
+
+def codigos_sinteticos(grupos_dict, produtos):
+    """
+    Distribui os produtos entre os prefixos dos grupos (em rodízio) e retorna
+    os códigos, ex.: ["LFC-0000", "LVZ-0000", "LFC-0001", ...].
+    """
+    prefixos = [prefixo for prefixos in grupos_dict.values() for prefixo in prefixos]
+    if not prefixos:
+        raise ValueError("Nenhum prefixo de grupo para gerar os códigos")
+    return [f"{prefixos[i % len(prefixos)]}{i // len(prefixos):04d}" for i in range(produtos)]
+
+def gerar_planilha(caminho, codigos, semente=0):
+    """
+    Grava a planilha com um produto por linha. O formato segue a extensão:
+    .ods ou .xlsx (requer openpyxl); carregar_planilha lê os dois.
+    Alguns preços ficam vazios, como em produtos sem todas as variações.
+    """
+    aleatorio = random.Random(semente)
+    linhas = [[f"Título {n}"] + [""] * (TOTAL_COLUNAS - 1) for n in range(LINHAS_TITULO)]
+    cabecalho = [f"Coluna {n}" for n in range(TOTAL_COLUNAS)]
+    cabecalho[COLUNA_CODIGO] = "Código"
+    for n in range(COLUNAS_PRECO):
+        cabecalho[PRIMEIRA_COLUNA_PRECO + n] = f"Preço {n + 1}"
+    linhas.append(cabecalho)
+    for codigo in codigos:
+        linha = [""] * TOTAL_COLUNAS
+        linha[0] = f"Produto {codigo}"
+        linha[COLUNA_CODIGO] = codigo.lower() if aleatorio.random() < 0.1 else codigo
+        for n in range(COLUNAS_PRECO):
+            if aleatorio.random() < 0.9:
+                linha[PRIMEIRA_COLUNA_PRECO + n] = round(aleatorio.uniform(5, 500), 2)
+        linhas.append(linha)
+    engine = "odf" if caminho.lower().endswith(".ods") else None
+    # A primeira linha vira o cabeçalho do pandas, como na leitura
+    df = pd.DataFrame(linhas[1:], columns=linhas[0])
+    df.to_excel(caminho, index=False, engine=engine)
+
+def gerar_foto(caminho, codigo, tamanho, semente=0):
+    """
+    Gera uma foto de produto: fundo com gradiente, formas coloridas e o código.
+    O conteúdo varia com o código para que nenhuma foto seja igual a outra.
+    """
+    aleatorio = random.Random(f"{semente}-{codigo}")
+    largura, altura = tamanho
+    cor = tuple(aleatorio.randrange(40, 220) for _ in range(3))
+    fundo = Image.linear_gradient("L").resize(tamanho)
+    img = Image.merge("RGB", [fundo.point(lambda v, c=c: (v * c) // 255) for c in cor])
+    desenho = ImageDraw.Draw(img)
+    for _ in range(12):
+        x, y = aleatorio.randrange(largura), aleatorio.randrange(altura)
+        raio = aleatorio.randrange(max(2, min(tamanho) // 20), max(3, min(tamanho) // 4))
+        desenho.ellipse((x - raio, y - raio, x + raio, y + raio),
+                        fill=tuple(aleatorio.randrange(256) for _ in range(3)))
+    desenho.text((largura // 20, altura // 20), codigo, fill=(255, 255, 255))
+    if caminho.lower().endswith(".png"):
+        img.save(caminho, "PNG")
+    else:
+        img.save(caminho, "JPEG", quality=90)
+
+def gerar_fotos(pasta, codigos, tamanho=(1200, 1200), semente=0, capas=True, progresso=None):
+    """
+    Grava uma foto por código em pasta (CODIGO.jpg) e, com capas, uma capa
+    por prefixo ("PREFIXO000 capa.png"). Fotos já existentes são mantidas.
+    Retorna a lista de arquivos gerados ou existentes.
+    """
+    os.makedirs(pasta, exist_ok=True)
+    nomes = []
+    if capas:
+        prefixos = []
+        for codigo in codigos:
+            prefixo = codigo.split("-")[0] + "-"
+            if prefixo not in prefixos:
+                prefixos.append(prefixo)
+        nomes += [(f"{prefixo}000 capa.png", f"{prefixo}000") for prefixo in prefixos]
+    nomes += [(f"{codigo}.jpg", codigo) for codigo in codigos]
+    arquivos = []
+    for n, (nome, codigo) in enumerate(nomes, start=1):
+        caminho = os.path.join(pasta, nome)
+        if not os.path.exists(caminho):
+            gerar_foto(caminho, codigo, tamanho, semente)
+        arquivos.append(caminho)
+        if progresso is not None and n % 500 == 0:
+            progresso(n, len(nomes))
+    return arquivos
+
+def gerar_mascara(caminho, tamanho=(1200, 1200)):
+    """Grava uma máscara RGBA (moldura e marca d'água semitransparentes) para a ferramenta de máscara."""
+    largura, altura = tamanho
+    mascara = Image.new("RGBA", tamanho, (0, 0, 0, 0))
+    desenho = ImageDraw.Draw(mascara)
+    borda = max(4, min(tamanho) // 25)
+    desenho.rectangle((0, 0, largura - 1, altura - 1), outline=(255, 255, 255, 255), width=borda)
+    desenho.rectangle((largura // 4, altura * 3 // 4, largura * 3 // 4, altura * 3 // 4 + borda * 2),
+                      fill=(20, 20, 20, 140))
+    mascara.save(caminho, "PNG")
+
+def gerar_conjunto(pasta, produtos, tamanho=(1200, 1200), grupos_dict=None, xlsx=False, semente=0, progresso=None):
+    """
+    Gera (ou reaproveita, se os parâmetros forem os mesmos e houver produtos
+    suficientes) o catálogo sintético em pasta: planilha.ods (e planilha.xlsx),
+    imagens/ e mascara.png.
+    Retorna a descrição do conjunto (caminhos, grupos e códigos).
+    """
+    if grupos_dict is None:
+        grupos_dict = grupos_do_benchmark()
+    parametros = {"produtos": produtos, "tamanho": list(tamanho), "grupos": grupos_dict, "semente": semente}
+    caminho_descricao = os.path.join(pasta, DESCRICAO)
+    try:
+        with open(caminho_descricao, "r", encoding="utf-8") as f:
+            descricao = json.load(f)
+        anteriores = dict(descricao["parametros"], produtos=produtos)
+        # Os códigos de um conjunto menor são o início dos de um maior
+        suficiente = descricao["parametros"]["produtos"] >= produtos
+        if anteriores == parametros and suficiente and (not xlsx or os.path.exists(descricao["planilha_xlsx"])):
+            return descricao
+    except (OSError, ValueError, KeyError):
+        pass
+
+    os.makedirs(pasta, exist_ok=True)
+    codigos = codigos_sinteticos(grupos_dict, produtos)
+    descricao = {
+        "parametros": parametros,
+        "planilha": os.path.join(pasta, "planilha.ods"),
+        "planilha_xlsx": os.path.join(pasta, "planilha.xlsx"),
+        "imagens": os.path.join(pasta, "imagens"),
+        "mascara": os.path.join(pasta, "mascara.png"),
+        "codigos": codigos,
+    }
+    gerar_planilha(descricao["planilha"], codigos, semente)
+    if xlsx:
+        gerar_planilha(descricao["planilha_xlsx"], codigos, semente)
+    gerar_fotos(descricao["imagens"], codigos, tamanho, semente, progresso=progresso)
+    gerar_mascara(descricao["mascara"], tamanho)
+    with open(caminho_descricao, "w", encoding="utf-8") as f:
+        json.dump(descricao, f, ensure_ascii=False)
+    return descricao
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera um catálogo sintético (planilha e fotos)")
+    parser.add_argument("--pasta", required=True, help="Pasta de saída")
+    parser.add_argument("--produtos", type=int, default=100)
+    parser.add_argument("--largura", type=int, default=1200, help="Largura das fotos em pixels")
+    parser.add_argument("--altura", type=int, default=1200, help="Altura das fotos em pixels")
+    parser.add_argument("--xlsx", action="store_true", help="Também grava a planilha em .xlsx (requer openpyxl)")
+    parser.add_argument("--semente", type=int, default=0)
+    args = parser.parse_args(argv)
+    descricao = gerar_conjunto(args.pasta, args.produtos, (args.largura, args.altura), xlsx=args.xlsx,
+                               semente=args.semente,
+                               progresso=lambda atual, total: print(f"{atual}/{total} fotos", flush=True))
+    print(f"{len(descricao['codigos'])} produtos em {args.pasta}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+# src/benchmarks/memoria_pdf.py
+"""
+Compara o pico de memória (RSS) do FPDF com o do StreamingPDF conforme o
+número de páginas cresce. Cada medição roda em um processo separado, para
+que o pico de uma não contamine a outra.
+
+O escritor "retomada" mede a geração completa pelo caminho padrão (api.gerar
+com retomar=True): as páginas vão para os blocos do diário e os blocos são
+juntados no catálogo final. Usa um catálogo sintético (benchmarks.dados_sinteticos)
+com as fotos trocadas pelo mesmo JPEG com ruído dos outros escritores, gerado
+antes da medição, e um único processo, para que todo o pico fique nele.
+
+Uso (a partir da pasta src):
+    python -m benchmarks.memoria_pdf
+    python -m benchmarks.memoria_pdf --paginas 50 200 800 --lado 1600
+    python -m benchmarks.memoria_pdf --escritores retomada --dados /tmp/catalogo_sintetico
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+from io import BytesIO
+from PIL import Image
+from tracing import pico_memoria_mb
+
+ESCRITORES = ("fpdf", "streaming", "retomada")
+
+def jpeg_sintetico(lado):
+    """Gera um JPEG com ruído (comprime pouco, como uma foto de produto)."""
+    img = Image.effect_noise((lado, lado), 64).convert("RGB")
+    buffer = BytesIO()
+    img.save(buffer, format="JPEG", quality=85)
+    return buffer.getvalue()
+
+def jpeg_unico(base, indice):
+    """Insere um comentário (COM) no JPEG para que cada página tenha bytes diferentes."""
+    comentario = f"pagina {indice}".encode("ascii")
+    segmento = b"\xff\xfe" + (len(comentario) + 2).to_bytes(2, "big") + comentario
+    return base[:2] + segmento + base[2:]
+
+def medir_retomada(paginas, pasta_dados):
+    """Gera o catálogo sintético de pasta_dados com api.gerar (retomar=True) e retorna as métricas."""
+    import api
+    from benchmarks.dados_sinteticos import DESCRICAO
+    with open(os.path.join(pasta_dados, DESCRICAO), "r", encoding="utf-8") as f:
+        dados = json.load(f)
+    with tempfile.TemporaryDirectory() as pasta:
+        destino = os.path.join(pasta, "benchmark.pdf")
+        inicio = time.perf_counter()
+        api.gerar(destino, planilha=dados["planilha"], pasta_imagens=dados["imagens"],
+                  grupos_dict=dados["parametros"]["grupos"], workers=1, usar_cache=False, retomar=True)
+        return {
+            "escritor": "retomada",
+            "paginas": paginas,
+            "segundos": round(time.perf_counter() - inicio, 2),
+            "arquivo_mb": round(os.path.getsize(destino) / (1024 * 1024), 1),
+            "pico_mb": round(pico_memoria_mb(), 1),
+        }
+
+def medir(escritor, paginas, lado, pasta_dados=None):
+    """Gera um PDF com o escritor indicado e retorna as métricas da execução."""
+    if escritor == "retomada":
+        return medir_retomada(paginas, pasta_dados)
+    from pdf_utils import adicionar_pagina_com_jpeg
+    from pdf_stream import StreamingPDF
+    from catalogo import desenhar_tabela_personalizada
+
+    base = jpeg_sintetico(lado)
+    preco_colunas = ["P1", "P2", "P3"]
+    prices = {coluna: "12.50" for coluna in preco_colunas}
+    with tempfile.TemporaryDirectory() as pasta:
+        destino = os.path.join(pasta, "benchmark.pdf")
+        inicio = time.perf_counter()
+        pdf = StreamingPDF(destino) if escritor == "streaming" else None
+        for i in range(paginas):
+            pdf = adicionar_pagina_com_jpeg(pdf, lado, lado, jpeg_unico(base, i))
+            desenhar_tabela_personalizada(pdf, lado, lado, preco_colunas, prices)
+        pdf.output(destino)
+        return {
+            "escritor": escritor,
+            "paginas": paginas,
+            "segundos": round(time.perf_counter() - inicio, 2),
+            "arquivo_mb": round(os.path.getsize(destino) / (1024 * 1024), 1),
+            "pico_mb": round(pico_memoria_mb(), 1),
+        }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pico de memória do FPDF x StreamingPDF x geração retomável")
+    parser.add_argument("--paginas", type=int, nargs="+", default=[25, 100, 400])
+    parser.add_argument("--lado", type=int, default=1200, help="Lado das imagens em pixels")
+    parser.add_argument("--escritores", nargs="+", choices=ESCRITORES, default=list(ESCRITORES))
+    parser.add_argument("--dados", help="Pasta do catálogo sintético do escritor retomada "
+                                        "(padrão: uma pasta temporária, gerada a cada execução)")
+    parser.add_argument("--medir", nargs=2, metavar=("ESCRITOR", "PAGINAS"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.medir:
+        escritor, paginas = args.medir
+        print(json.dumps(medir(escritor, int(paginas), args.lado, args.dados)))
+        return 0
+
+    pasta_src = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with tempfile.TemporaryDirectory() as temporaria:
+        pasta_dados = args.dados or temporaria
+        print(f"{'escritor':<10} {'páginas':>8} {'tempo (s)':>10} {'arquivo (MB)':>13} {'pico RSS (MB)':>14}")
+        for paginas in args.paginas:
+            for escritor in args.escritores:
+                comando = [sys.executable, "-m", "benchmarks.memoria_pdf", "--lado", str(args.lado),
+                           "--medir", escritor, str(paginas)]
+                if escritor == "retomada":
+                    from benchmarks.dados_sinteticos import gerar_conjunto, GRUPOS_SINTETICOS
+                    pasta = os.path.join(pasta_dados, f"sintetico_{paginas}")
+                    dados = gerar_conjunto(pasta, paginas, tamanho=(args.lado, args.lado), grupos_dict=GRUPOS_SINTETICOS)
+                    base = jpeg_sintetico(args.lado)
+                    for i, codigo in enumerate(dados["codigos"][:paginas]):
+                        with open(os.path.join(dados["imagens"], f"{codigo}.jpg"), "wb") as f:
+                            f.write(jpeg_unico(base, i))
+                    comando += ["--dados", pasta]
+                saida = subprocess.run(comando, cwd=pasta_src, capture_output=True, text=True, check=True)
+                r = json.loads(saida.stdout.strip().splitlines()[-1])
+                print(f"{r['escritor']:<10} {r['paginas']:>8} {r['segundos']:>10} {r['arquivo_mb']:>13} {r['pico_mb']:>14}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
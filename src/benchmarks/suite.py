@@ -0,0 +1,255 @@
+# src/benchmarks/suite.py
+"""
+Mede as etapas do gerador com um catálogo sintético de vários tamanhos e grava
+os tempos em JSON, para comparar versões e detectar regressões.
+
+Etapas: carregamento da planilha (.ods e, com openpyxl, .xlsx), consulta de
+preços, preparação das imagens, escrita do PDF, máscara nas fotos e gravação do
+reorganizador.
+
+Uso (a partir da pasta src):
+    python -m benchmarks.suite --saida resultados.json
+    python -m benchmarks.suite --paginas 100 1000 --etapas planilha precos pdf
+    python -m benchmarks.suite --saida nova.json --comparar resultados.json --tolerancia 0.15
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import importlib.util
+
+TAMANHOS_PADRAO = [100, 1000, 10000]
+ETAPAS = ("planilha", "planilha_xlsx", "precos", "imagens", "pdf", "mascara", "reorganizador")
+VERSAO_RESULTADOS = 1
+
+def _cronometrar(funcao):
+    """Executa funcao() e retorna (segundos, resultado)."""
+    inicio = time.perf_counter()
+    resultado = funcao()
+    return time.perf_counter() - inicio, resultado
+
+def _carregar_planilha(caminho):
+    """carregar_planilha sem o snapshot, para medir sempre a leitura do arquivo."""
+    from catalogo import carregar_planilha
+    return carregar_planilha(caminho, usar_snapshot=False)
+
+def etapas_disponiveis():
+    """Etapas que podem rodar neste ambiente (planilha_xlsx requer openpyxl)."""
+    if importlib.util.find_spec("openpyxl") is None:
+        return tuple(etapa for etapa in ETAPAS if etapa != "planilha_xlsx")
+    return ETAPAS
+
+def medir_planilha(dados, paginas, pasta, workers=None, extensao=".ods"):
+    """Leitura da planilha (sem o snapshot), com paginas produtos."""
+    from benchmarks.dados_sinteticos import gerar_planilha
+    caminho = os.path.join(pasta, f"planilha_{paginas}{extensao}")
+    gerar_planilha(caminho, dados["codigos"][:paginas])
+    segundos, _ = _cronometrar(lambda: _carregar_planilha(caminho))
+    return segundos
+
+def medir_planilha_xlsx(dados, paginas, pasta, workers=None):
+    """Leitura da mesma planilha gravada em .xlsx (requer openpyxl)."""
+    return medir_planilha(dados, paginas, pasta, workers, extensao=".xlsx")
+
+def medir_precos(dados, paginas, pasta, workers=None):
+    """Montagem do PriceIndex e uma consulta por página."""
+    from price_index import PriceIndex
+    caminho = os.path.join(pasta, f"planilha_{paginas}.ods")
+    if not os.path.exists(caminho):
+        from benchmarks.dados_sinteticos import gerar_planilha
+        gerar_planilha(caminho, dados["codigos"][:paginas])
+    df, codigo_coluna, preco_colunas = _carregar_planilha(caminho)
+    codigos = dados["codigos"][:paginas]
+
+    def consultar():
+        price_index = PriceIndex(df, codigo_coluna, preco_colunas)
+        for codigo in codigos:
+            price_index.get(codigo)
+
+    segundos, _ = _cronometrar(consultar)
+    return segundos
+
+def _fotos(dados, paginas):
+    return [os.path.join(dados["imagens"], f"{codigo}.jpg") for codigo in dados["codigos"][:paginas]]
+
+def medir_imagens(dados, paginas, pasta, workers=None):
+    """Preparação das imagens das páginas (redimensionar e codificar em JPEG), sem cache."""
+    from image_pipeline import preparar_imagens
+    from catalogo import MAX_SIZE_PAGINA, QUALIDADE_JPEG
+    fotos = _fotos(dados, paginas)
+    segundos, _ = _cronometrar(lambda: sum(1 for _ in preparar_imagens(fotos, max_size=MAX_SIZE_PAGINA,
+                                                                        quality=QUALIDADE_JPEG, workers=workers)))
+    return segundos
+
+def _paginas_preparadas(dados, paginas, pasta, workers=None):
+    """Imagens das páginas já preparadas, guardadas em um ImageCache da pasta do benchmark."""
+    from image_cache import ImageCache
+    from image_pipeline import preparar_imagens
+    from catalogo import MAX_SIZE_PAGINA, QUALIDADE_JPEG
+    cache = ImageCache(os.path.join(pasta, "cache"))
+    for _, resultado in preparar_imagens(_fotos(dados, paginas), max_size=MAX_SIZE_PAGINA, quality=QUALIDADE_JPEG,
+                                         workers=workers, cache=cache):
+        yield resultado
+
+def _gerar_pdf(dados, paginas, pasta, destino, workers=None):
+    from pdf_stream import StreamingPDF
+    from pdf_utils import adicionar_pagina_com_jpeg
+    from catalogo import desenhar_tabela_personalizada
+    preco_colunas = [f"Preço {n + 1}" for n in range(3)]
+    prices = {coluna: "12,50" for coluna in preco_colunas}
+    preparadas = list(_paginas_preparadas(dados, paginas, pasta, workers))
+
+    def escrever():
+        pdf = StreamingPDF(destino)
+        for width, height, jpeg_bytes in preparadas:
+            adicionar_pagina_com_jpeg(pdf, width, height, jpeg_bytes)
+            desenhar_tabela_personalizada(pdf, width, height, preco_colunas, prices)
+        pdf.output()
+
+    segundos, _ = _cronometrar(escrever)
+    return segundos
+
+def medir_pdf(dados, paginas, pasta, workers=None):
+    """Escrita do PDF (páginas com as imagens já preparadas e a tabela de preços)."""
+    return _gerar_pdf(dados, paginas, pasta, os.path.join(pasta, f"catalogo_{paginas}.pdf"), workers)
+
+def medir_mascara(dados, paginas, pasta, workers=None):
+    """Aplicação da máscara em paginas fotos (ferramenta de máscara), gravando em outra pasta."""
+    from mask_compositor import compor_fotos
+    saida = os.path.join(pasta, f"mascara_{paginas}")
+    tarefas = [(foto, os.path.join(saida, os.path.basename(foto))) for foto in _fotos(dados, paginas)]
+    try:
+        segundos, erros = _cronometrar(
+            lambda: [erro for _, erro in compor_fotos(dados["mascara"], tarefas, workers=workers) if erro])
+    finally:
+        shutil.rmtree(saida, ignore_errors=True)
+    if erros:
+        raise RuntimeError(f"{len(erros)} fotos falharam: {erros[0]}")
+    return segundos
+
+def medir_reorganizador(dados, paginas, pasta, workers=None):
+    """
+    Gravação do reorganizador: o último grupo de páginas vai para o início e uma
+    a cada dez páginas é removida (montar_pdf, como em SalvarPDFThread).
+    """
+    from pdf_assembly import montar_pdf
+    origem = os.path.join(pasta, f"catalogo_{paginas}.pdf")
+    if not os.path.exists(origem):
+        _gerar_pdf(dados, paginas, pasta, origem, workers)
+    ordem = list(range(paginas))
+    corte = paginas - max(1, paginas // 10)
+    ordem = ordem[corte:] + ordem[:corte]
+    segmentos = [(origem, i) for n, i in enumerate(ordem) if n % 10 != 9]
+    destino = os.path.join(pasta, f"reorganizado_{paginas}.pdf")
+    try:
+        segundos, _ = _cronometrar(lambda: montar_pdf(segmentos, destino))
+    finally:
+        if os.path.exists(destino):
+            os.remove(destino)
+    return segundos
+
+MEDICOES = {
+    "planilha": medir_planilha,
+    "planilha_xlsx": medir_planilha_xlsx,
+    "precos": medir_precos,
+    "imagens": medir_imagens,
+    "pdf": medir_pdf,
+    "mascara": medir_mascara,
+    "reorganizador": medir_reorganizador,
+}
+
+def executar(dados, tamanhos, etapas=None, workers=None, progresso=None):
+    """Executa as etapas (padrão: etapas_disponiveis()) para cada tamanho e retorna a lista de resultados."""
+    if etapas is None:
+        etapas = etapas_disponiveis()
+    resultados = []
+    with tempfile.TemporaryDirectory(prefix="benchmark_catalogo_") as pasta:
+        for paginas in tamanhos:
+            for etapa in etapas:
+                segundos = MEDICOES[etapa](dados, paginas, pasta, workers=workers)
+                resultado = {
+                    "etapa": etapa,
+                    "paginas": paginas,
+                    "segundos": round(segundos, 4),
+                    "ms_por_pagina": round(segundos * 1000 / paginas, 4),
+                }
+                resultados.append(resultado)
+                if progresso is not None:
+                    progresso(resultado)
+    return resultados
+
+def comparar(resultados, anteriores, tolerancia=0.1):
+    """
+    Compara com uma execução anterior. Retorna [(etapa, paginas, antes, agora, variação)]
+    das medições que ficaram mais lentas que a tolerância (0.1 = 10%).
+    """
+    antes = {(r["etapa"], r["paginas"]): r["segundos"] for r in anteriores["resultados"]}
+    regressoes = []
+    for r in resultados:
+        anterior = antes.get((r["etapa"], r["paginas"]))
+        if not anterior:
+            continue
+        variacao = r["segundos"] / anterior - 1
+        if variacao > tolerancia:
+            regressoes.append((r["etapa"], r["paginas"], anterior, r["segundos"], variacao))
+    return regressoes
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark das etapas do gerador de catálogos")
+    parser.add_argument("--paginas", type=int, nargs="+", default=TAMANHOS_PADRAO, help="Tamanhos do catálogo")
+    parser.add_argument("--etapas", nargs="+", choices=ETAPAS, default=list(etapas_disponiveis()),
+                        help="Etapas a medir (padrão: todas; planilha_xlsx só com openpyxl instalado)")
+    parser.add_argument("--lado", type=int, default=1200, help="Lado das fotos sintéticas em pixels")
+    parser.add_argument("--dados", help="Pasta do catálogo sintético (reaproveitado entre execuções)")
+    parser.add_argument("--workers", type=int, help="Processos para imagens e máscara (padrão: núcleos)")
+    parser.add_argument("--saida", help="Arquivo JSON com os resultados")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior para detectar regressões")
+    parser.add_argument("--tolerancia", type=float, default=0.1, help="Variação aceita na comparação (0.1 = 10%%)")
+    args = parser.parse_args(argv)
+
+    from benchmarks.dados_sinteticos import gerar_conjunto
+    pasta_dados = args.dados or os.path.join(tempfile.gettempdir(), f"catalogo_sintetico_{args.lado}")
+    print(f"Preparando o catálogo sintético em {pasta_dados}...", flush=True)
+    dados = gerar_conjunto(pasta_dados, max(args.paginas), (args.lado, args.lado),
+                           progresso=lambda atual, total: print(f"  {atual}/{total} fotos", flush=True))
+
+    print(f"{'etapa':<14} {'páginas':>8} {'tempo (s)':>10} {'ms/página':>10}")
+
+    def imprimir(r):
+        print(f"{r['etapa']:<14} {r['paginas']:>8} {r['segundos']:>10.3f} {r['ms_por_pagina']:>10.3f}", flush=True)
+
+    resultados = executar(dados, sorted(args.paginas), args.etapas, args.workers, imprimir)
+    relatorio = {
+        "versao": VERSAO_RESULTADOS,
+        "data": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "ambiente": {
+            "python": platform.python_version(),
+            "sistema": platform.platform(),
+            "nucleos": os.cpu_count(),
+            "workers": args.workers,
+        },
+        "lado": args.lado,
+        "resultados": resultados,
+    }
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump(relatorio, f, ensure_ascii=False, indent=2)
+        print(f"Resultados gravados em {args.saida}")
+
+    if args.comparar:
+        with open(args.comparar, "r", encoding="utf-8") as f:
+            anteriores = json.load(f)
+        regressoes = comparar(resultados, anteriores, args.tolerancia)
+        for etapa, paginas, antes, agora, variacao in regressoes:
+            print(f"⚠ {etapa} ({paginas} páginas): {antes:.3f} s → {agora:.3f} s (+{variacao:.0%})", file=sys.stderr)
+        if regressoes:
+            return 1
+        print("Sem regressões em relação a", args.comparar)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+# src/build_journal.py
+import os
+import json
+import shutil
+from build_manifest import chave_pagina
+
+# Versão do formato do diário; incrementar ao mudar a forma como os blocos são gravados
+DIARIO_VERSAO = 1
+
+# Quantidade máxima de páginas por bloco (ponto de retomada) na geração em série
+PAGINAS_POR_BLOCO = 50
+
+def pasta_trabalho(output_file):
+    """Pasta em que os blocos já concluídos de uma geração ficam até o catálogo ser gravado."""
+    return output_file + ".retomada"
+
+def _sincronizar(caminho):
+    """Garante que o arquivo está gravado no disco antes de ser registrado."""
+    with open(caminho, "rb") as f:
+        os.fsync(f.fileno())
+
+class DiarioGeracao:
+    """
+    Diário de uma geração em andamento: cada bloco de páginas concluído é um PDF
+    completo na pasta de trabalho, registrado em diario.json com a chave
+    (chave_pagina) e as dimensões de cada página.
+
+    Se a geração for interrompida (imagem com erro, disco cheio, janela fechada),
+    a próxima execução com as mesmas entradas encontra as páginas em
+    paginas_recuperaveis() e gera apenas o restante. Como a chave inclui a
+    imagem (tamanho e data), os preços, o estilo e o perfil, uma página alterada
+    não é recuperada. concluir() apaga a pasta depois que o catálogo é gravado.
+    Com recuperar=False, os blocos de execuções anteriores são descartados.
+    """
+    def __init__(self, output_file, recuperar=True):
+        self.pasta = pasta_trabalho(output_file)
+        self.caminho = os.path.join(self.pasta, "diario.json")
+        self.blocos = self._carregar() if recuperar else []
+        self._proximo = max((int(bloco["arquivo"][6:11]) for bloco in self.blocos), default=-1) + 1
+        os.makedirs(self.pasta, exist_ok=True)
+        # Remove blocos que não chegaram a ser registrados (execução interrompida no meio deles)
+        registrados = {bloco["arquivo"] for bloco in self.blocos} | {"diario.json"}
+        for nome in os.listdir(self.pasta):
+            if nome not in registrados:
+                try:
+                    os.remove(os.path.join(self.pasta, nome))
+                except OSError:
+                    pass
+
+    def _carregar(self):
+        try:
+            with open(self.caminho, "r", encoding="utf-8") as f:
+                diario = json.load(f)
+        except (OSError, ValueError):
+            return []
+        if diario.get("versao") != DIARIO_VERSAO:
+            return []
+        blocos = []
+        for bloco in diario.get("blocos", []):
+            try:
+                if os.path.getsize(os.path.join(self.pasta, bloco["arquivo"])) == bloco["tamanho"]:
+                    blocos.append(bloco)
+            except (OSError, KeyError):
+                pass
+        return blocos
+
+    def _gravar(self):
+        temporario = self.caminho + ".tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump({"versao": DIARIO_VERSAO, "blocos": self.blocos}, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporario, self.caminho)
+
+    def novo_bloco(self):
+        """Caminho para o PDF de um novo bloco (registrado com registrar() depois de gravado)."""
+        caminho = os.path.join(self.pasta, f"bloco_{self._proximo:05d}.pdf")
+        self._proximo += 1
+        return caminho
+
+    def registrar(self, arquivo, entradas):
+        """Registra um bloco já gravado com as páginas descritas por entradas (com largura e altura)."""
+        _sincronizar(arquivo)
+        self.blocos.append({
+            "arquivo": os.path.basename(arquivo),
+            "tamanho": os.path.getsize(arquivo),
+            "paginas": [[chave_pagina(e), e["largura"], e["altura"]] for e in entradas],
+        })
+        self._gravar()
+
+    def quantidade_paginas(self, arquivo):
+        """Quantidade de páginas de um bloco registrado (None se não for um bloco do diário)."""
+        for bloco in self.blocos:
+            if os.path.join(self.pasta, bloco["arquivo"]) == arquivo:
+                return len(bloco["paginas"])
+        return None
+
+    def paginas_recuperaveis(self):
+        """Retorna {chave da página: (arquivo do bloco, índice, largura, altura)}."""
+        indice = {}
+        for bloco in self.blocos:
+            arquivo = os.path.join(self.pasta, bloco["arquivo"])
+            for n, (chave, largura, altura) in enumerate(bloco["paginas"]):
+                indice.setdefault(chave, (arquivo, n, largura, altura))
+        return indice
+
+    def concluir(self):
+        """Apaga a pasta de trabalho (o catálogo final já foi gravado)."""
+        shutil.rmtree(self.pasta, ignore_errors=True)
+        self.blocos = []
@@ -0,0 +1,83 @@
+# src/build_manifest.py
+import os
+import json
+
+# Versão do formato do manifesto; incrementar ao mudar a forma como as páginas são desenhadas
+MANIFESTO_VERSAO = 1
+
+# Campos de uma página que determinam o seu conteúdo no PDF
+CAMPOS_CHAVE = ("imagem", "precos", "colunas", "style", "position", "max_size", "quality")
+
+def caminho_manifesto(output_file):
+    """Caminho do manifesto gravado ao lado do catálogo gerado."""
+    return output_file + ".manifest.json"
+
+def impressao_digital_imagem(caminho, stat):
+    """Identifica uma versão da imagem pelo caminho, tamanho e data de modificação."""
+    return [os.path.normcase(os.path.abspath(caminho)), stat.st_size, stat.st_mtime_ns]
+
+def descrever_pagina(grupo, imagem, preco_colunas, prices, style, position, max_size, quality):
+    """Monta a entrada do manifesto de uma página (sem as dimensões, conhecidas após o preparo)."""
+    return {
+        "grupo": grupo,
+        "arquivo": imagem.nome,
+        "imagem": impressao_digital_imagem(imagem.caminho, imagem.stat),
+        "precos": [prices[col] for col in preco_colunas],
+        "colunas": [str(col) for col in preco_colunas],
+        "style": style,
+        "position": position,
+        "max_size": list(max_size),
+        "quality": quality,
+    }
+
+def chave_pagina(entrada):
+    """Chave textual das entradas que determinam o conteúdo da página."""
+    return json.dumps({campo: entrada.get(campo) for campo in CAMPOS_CHAVE}, sort_keys=True, ensure_ascii=False)
+
+def _estado_pdf(output_file):
+    stat = os.stat(output_file)
+    return [stat.st_size, stat.st_mtime_ns]
+
+def carregar_manifesto(output_file):
+    """
+    Lê o manifesto do catálogo anterior. Retorna a lista de entradas das páginas,
+    ou None se não houver manifesto ou se o PDF foi alterado depois de gerado.
+    """
+    try:
+        with open(caminho_manifesto(output_file), "r", encoding="utf-8") as f:
+            manifesto = json.load(f)
+        estado = _estado_pdf(output_file)
+    except (OSError, ValueError):
+        return None
+    if manifesto.get("versao") != MANIFESTO_VERSAO or manifesto.get("pdf") != estado:
+        return None
+    return manifesto.get("paginas")
+
+def indexar_manifesto(paginas):
+    """Retorna {chave da página: índice da página no PDF anterior}."""
+    indice = {}
+    for i, entrada in enumerate(paginas or []):
+        indice.setdefault(chave_pagina(entrada), i)
+    return indice
+
+def gravar_manifesto(output_file, paginas):
+    """Grava o manifesto do catálogo recém-gerado (chamar após gravar o PDF)."""
+    caminho = caminho_manifesto(output_file)
+    temporario = caminho + ".tmp"
+    try:
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump({
+                "versao": MANIFESTO_VERSAO,
+                "pdf": _estado_pdf(output_file),
+                "paginas": paginas,
+            }, f, ensure_ascii=False)
+        os.replace(temporario, caminho)
+    except OSError as e:
+        print("Erro ao gravar manifesto do catálogo:", e)
+
+def remover_manifesto(output_file):
+    """Remove o manifesto (ex.: quando o PDF foi regravado sem ele)."""
+    try:
+        os.remove(caminho_manifesto(output_file))
+    except OSError:
+        pass
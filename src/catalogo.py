@@ -1,11 +1,44 @@
 import os
-import re
+import gc
+import pickle
+import tempfile
+import hashlib
 import pandas as pd
 from fpdf import FPDF
-from tkinter import messagebox
-from pdf_utils import processar_imagem, adicionar_pagina_com_imagem_simples
-from catalog_groups import GRUPOS_PRINCIPAL, GRUPOS_SECUNDARIO
+from pdf_utils import processar_imagem, adicionar_pagina_com_imagem_simples, adicionar_pagina_com_jpeg
+from image_pipeline import preparar_imagens_perfis
+from output_profiles import PERFIL_PADRAO, TAMANHO_PAGINA_REFERENCIA, caminho_do_perfil
+from image_cache import ImageCache
+from image_index import indexar_imagens, agrupar_imagens
+from build_manifest import descrever_pagina, chave_pagina, carregar_manifesto, indexar_manifesto, gravar_manifesto
+from build_journal import DiarioGeracao, PAGINAS_POR_BLOCO
+from pdf_assembly import montar_pdf_em_fluxo
+from pdf_stream import StreamingPDF
+from pdf_shards import dividir_em_lotes, executar_lotes
+from price_overlay import abrir_pdf, limpar_regiao, desenhar_tabela_sobreposta
+from price_index import PriceIndex, normalizar_codigo
 from utils import get_base_path  # Função para obter o caminho base
+from tracing import etapa, cronometrado, tamanho_arquivo
+from job_control import OperacaoCancelada, verificar, verificar_operacao_atual
+
+class CatalogoError(Exception):
+    """Erro ao carregar a planilha ou gerar um catálogo."""
+
+def notificar(progresso, mensagem, log_type="default", atual=None, total=None):
+    """
+    Envia uma mensagem de andamento ao callback progresso(mensagem, log_type, atual, total),
+    se houver. log_type segue as categorias da caixa de status
+    ("default", "informacao", "sucesso", "alerta", "erro", "processamento").
+    """
+    if progresso:
+        progresso(mensagem, log_type, atual, total)
+
+# Tamanho máximo (em pixels) e qualidade JPEG das imagens das páginas (perfil padrão)
+MAX_SIZE_PAGINA = PERFIL_PADRAO.max_size
+QUALIDADE_JPEG = PERFIL_PADRAO.quality
+
+# Versão do formato do snapshot da planilha; incrementar ao mudar o processamento
+SNAPSHOT_PLANILHA_VERSAO = 1
 
 def get_documents_folder():
     """
@@ -25,44 +58,144 @@ def get_user_data_folder():
     os.makedirs(data_folder, exist_ok=True)
     return data_folder
 
-def carregar_planilha(excel_file):
+def get_image_cache_folder():
+    """
+    Retorna o caminho da pasta de cache das imagens de página já preparadas.
+    Se a pasta não existir, ela será criada.
+    """
+    cache_folder = os.path.join(get_documents_folder(), "cache", "paginas")
+    os.makedirs(cache_folder, exist_ok=True)
+    return cache_folder
+
+def _caminho_snapshot_planilha(excel_file):
+    """Caminho do snapshot binário (pickle) correspondente à planilha."""
+    nome = hashlib.sha1(os.path.normcase(os.path.abspath(excel_file)).encode("utf-8")).hexdigest()
+    return os.path.join(get_user_data_folder(), "cache", f"planilha_{nome}.pkl")
+
+def _origem_planilha(excel_file):
+    """Identifica a versão da planilha pelo tamanho e data de modificação."""
+    stat = os.stat(excel_file)
+    return stat.st_size, stat.st_mtime_ns
+
+def _ler_snapshot_planilha(excel_file):
+    """
+    Retorna (df, codigo_coluna, preco_colunas) do snapshot se ele corresponder
+    à versão atual da planilha; caso contrário, None.
+    """
+    caminho = _caminho_snapshot_planilha(excel_file)
+    try:
+        origem = _origem_planilha(excel_file)
+        with open(caminho, "rb") as f:
+            snapshot = pickle.load(f)
+    except Exception:
+        # Snapshot ilegível (corrompido ou gravado por outra versão do pandas/numpy):
+        # lê a planilha novamente e o snapshot é regravado
+        return None
+    if not isinstance(snapshot, dict):
+        return None
+    if snapshot.get("versao") != SNAPSHOT_PLANILHA_VERSAO or snapshot.get("origem") != origem:
+        return None
+    return snapshot["df"], snapshot["codigo_coluna"], snapshot["preco_colunas"]
+
+def _gravar_snapshot_planilha(excel_file, origem, df, codigo_coluna, preco_colunas):
+    """Grava o snapshot binário da planilha já processada."""
+    caminho = _caminho_snapshot_planilha(excel_file)
+    temporario = None
+    try:
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        # Temporário único por gravação: o carregamento em segundo plano da GUI,
+        # a linha de comando e o servidor da fila podem gravar o mesmo snapshot juntos
+        fd, temporario = tempfile.mkstemp(prefix=os.path.basename(caminho) + ".", suffix=".tmp",
+                                          dir=os.path.dirname(caminho))
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump({
+                "versao": SNAPSHOT_PLANILHA_VERSAO,
+                "origem": origem,
+                "df": df,
+                "codigo_coluna": codigo_coluna,
+                "preco_colunas": preco_colunas,
+            }, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporario, caminho)
+    except Exception as e:
+        print("Erro ao gravar snapshot da planilha:", e)
+        if temporario is not None:
+            try:
+                os.remove(temporario)
+            except OSError:
+                pass
+
+def load_catalog_groups():
+    """
+    Tenta carregar o arquivo persistente de modelos em Documents.
+    Se existir, retorna os valores carregados; caso contrário,
+    retorna os valores padrão do módulo catalog_groups em src.
+    """
+    persistent_path = os.path.join(get_documents_folder(), "catalog_groups.py")
+    if os.path.exists(persistent_path):
+        try:
+            import importlib.util
+            spec = importlib.util.spec_from_file_location("catalog_groups", persistent_path)
+            cg_module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(cg_module)
+            return cg_module.GRUPOS_PRINCIPAL, cg_module.GRUPOS_SECUNDARIO
+        except Exception as e:
+            print("Erro ao carregar catalog_groups do Documents:", e)
+    try:
+        from catalog_groups import GRUPOS_PRINCIPAL as default_principal, GRUPOS_SECUNDARIO as default_secundario
+    except ImportError:
+        default_principal, default_secundario = {}, {}
+    return default_principal, default_secundario
+
+def _motor_planilha(excel_file):
+    """Motor do pandas para ler a planilha: odfpy para .ods; nos demais (.xlsx), o padrão do pandas."""
+    return "odf" if os.path.splitext(excel_file)[1].lower() == ".ods" else None
+
+def carregar_planilha(excel_file, usar_snapshot=True):
+    """
+    Carrega a primeira aba da planilha (.ods ou .xlsx, este com openpyxl) e
+    retorna (df, codigo_coluna, preco_colunas).
+    Com usar_snapshot, reaproveita um snapshot binário gravado na última leitura
+    enquanto a planilha não mudar (mesmo tamanho e data de modificação),
+    evitando interpretar o arquivo novamente.
+    """
     excel_file = os.path.normpath(excel_file)
     # Se o arquivo não existir no caminho informado, tenta buscar na pasta de dados do usuário
     if not os.path.exists(excel_file):
         data_folder = get_user_data_folder()
         excel_file = os.path.join(data_folder, "Planilha_Catalogo_2025.ods")
     try:
-        sheets = pd.read_excel(excel_file, sheet_name=None, engine="odf")
-        df = sheets[list(sheets.keys())[0]]
+        if usar_snapshot:
+            with etapa("planilha.snapshot"):
+                carregado = _ler_snapshot_planilha(excel_file)
+            if carregado is not None:
+                return carregado
+        origem = _origem_planilha(excel_file)
+        # Apenas a primeira aba é usada, então só ela é interpretada
+        with etapa("planilha.ler", bytes_lidos=tamanho_arquivo(excel_file)):
+            df = pd.read_excel(excel_file, sheet_name=0, engine=_motor_planilha(excel_file))
         df.columns = df.iloc[3].astype(str).str.strip()
         df = df.iloc[4:].reset_index(drop=True)
         codigo_coluna = df.columns[4]
 
-          # Debug: imprime os códigos únicos lidos da planilha
         df[codigo_coluna] = df[codigo_coluna].astype(str).str.strip().str.upper()
-        print("Códigos únicos da planilha:", df[codigo_coluna].unique())
 
         preco_colunas = df.columns[12:19].tolist()
+        if usar_snapshot:
+            _gravar_snapshot_planilha(excel_file, origem, df, codigo_coluna, preco_colunas)
         return df, codigo_coluna, preco_colunas
     except FileNotFoundError:
-        messagebox.showerror("Erro", f"Erro: O arquivo {excel_file} não foi encontrado.")
-        return None, None, None
+        raise CatalogoError(f"Erro: O arquivo {excel_file} não foi encontrado.")
     except Exception as e:
-        messagebox.showerror("Erro", f"Erro ao carregar planilha: {str(e)}")
-        return None, None, None
+        raise CatalogoError(f"Erro ao carregar planilha: {str(e)}") from e
 
+@cronometrado("precos.consultar")
 def get_prices_for_code(df, codigo_coluna, preco_colunas, code):
-    # Normaliza o código de busca: remove espaços e converte para maiúsculas.
-    search_code = str(code).strip().upper()
-    
-    # Normaliza a coluna de código da planilha
-    df[codigo_coluna] = df[codigo_coluna].astype(str).str.strip().str.upper()
-    
-    # Cria uma expressão regular para casar o início do valor com o código procurado
-    regex = re.compile(f"^{re.escape(search_code)}$")
-    
-    # Filtra as linhas onde o código começa com o search_code
-    row = df[df[codigo_coluna].apply(lambda x: bool(regex.match(x)))]
+    """
+    Consulta avulsa de preços de um código. Para gerar catálogos use PriceIndex,
+    que indexa a planilha uma única vez.
+    """
+    search_code = normalizar_codigo(code)
+    row = df[df[codigo_coluna].astype(str).str.strip().str.upper() == search_code]
     
     if row.empty:
         return {col: "N/A" for col in preco_colunas}
@@ -99,181 +232,593 @@ def desenhar_linhas_tabela(pdf, table_x, cell_height, cell_width_left, cell_widt
         pdf.ln(cell_height)
         fill = not fill
 
-def gerar_catalogo(catalogo, image_folder, output_file, df, codigo_coluna, preco_colunas, position="left", status_text=None):
+def layout_tabela_personalizada(width, height, n_linhas, position="left", style="personalizado"):
+    """
+    Calcula a posição, as medidas e as cores da tabela de preços de uma página
+    do catálogo personalizado (rodapé à esquerda ou à direita conforme position).
+    n_linhas é a quantidade de colunas de preço exibidas.
+    """
+    cell_height = 25
+    cell_width_left = 120
+    cell_width_right = 80
+    if style == "principal":
+        header_fill_color = (32, 32, 32)         # Fundo escuro
+        header_text_color = (242, 211, 119)        # Texto dourado (#F2D377)
+        offset_vertical = 0
+    else:  # style "personalizado" ou outro valor
+        header_fill_color = (77, 79, 89)           # Fundo: cor das lâminas (#333333)
+        header_text_color = (255, 255, 255)          # Texto: vermelho (#BF2B2B)
+        offset_vertical = 40
+    return {
+        "table_x": 0 if position == "left" else width - 280,
+        "table_y": height - ((n_linhas + 1) * cell_height) - offset_vertical,
+        "cell_height": cell_height,
+        "cell_width_left": cell_width_left,
+        "cell_width_right": cell_width_right,
+        "total_width": cell_width_left + cell_width_right,
+        "header_fill_color": header_fill_color,
+        "header_text_color": header_text_color,
+    }
+
+@cronometrado("pdf.tabela")
+def desenhar_tabela_personalizada(pdf, width, height, preco_colunas, prices, position="left", style="personalizado"):
+    """
+    Desenha a tabela de preços de uma página do catálogo personalizado,
+    posicionada no rodapé à esquerda ou à direita conforme position.
+    """
+    layout = layout_tabela_personalizada(width, height, len(preco_colunas), position, style)
+    desenhar_cabecalho(pdf, layout["table_x"], layout["table_y"], layout["total_width"], layout["cell_height"],
+                       header_fill_color=layout["header_fill_color"],
+                       header_text_color=layout["header_text_color"])
+    desenhar_linhas_tabela(pdf, layout["table_x"], layout["cell_height"], layout["cell_width_left"],
+                           layout["cell_width_right"], preco_colunas, prices)
+
+def remover_temporarios(arquivos):
+    """Remove os arquivos temporários da geração que ainda existirem."""
+    for arquivo in arquivos:
+        if os.path.exists(arquivo):
+            os.remove(arquivo)
+
+def renderizar_lote(tarefa):
+    """
+    Gera os PDFs parciais de um lote, um por perfil (executada em outro processo).
+    tarefa traz os arquivos de saída (um por perfil), as páginas (caminho, stat,
+    preços), as colunas de preço, os perfis [(max_size, quality)], a posição, o
+    estilo e a pasta do cache de imagens (ou None).
+    Retorna, para cada página do lote, as dimensões (largura, altura) em cada perfil.
+    """
+    preco_colunas = tarefa["preco_colunas"]
+    caminhos = [caminho for caminho, _, _ in tarefa["paginas"]]
+    cache = ImageCache(tarefa["pasta_cache"]) if tarefa["pasta_cache"] else None
+    preparadas = preparar_imagens_perfis(caminhos, tarefa["perfis"], referencia=TAMANHO_PAGINA_REFERENCIA, workers=1,
+                                         cache=cache, stats={caminho: stat for caminho, stat, _ in tarefa["paginas"]})
+    pdfs = [StreamingPDF(arquivo) for arquivo in tarefa["arquivos"]]
+    dimensoes = []
+    try:
+        for (_, _, precos), (_, variantes) in zip(tarefa["paginas"], preparadas):
+            verificar_operacao_atual()
+            prices = dict(zip(preco_colunas, precos))
+            for pdf, (width, height, jpeg_bytes) in zip(pdfs, variantes):
+                adicionar_pagina_com_jpeg(pdf, width, height, jpeg_bytes)
+                if not all(value == "N/A" for value in prices.values()):
+                    desenhar_tabela_personalizada(pdf, width, height, preco_colunas, prices,
+                                                  tarefa["position"], tarefa["style"])
+            dimensoes.append([(width, height) for width, height, _ in variantes])
+        for pdf in pdfs:
+            pdf.output()
+    finally:
+        for pdf in pdfs:
+            pdf.descartar()
+    return dimensoes
+
+def gravar_pdf(pdf, destino):
+    """
+    Grava o PDF (FPDF ou StreamingPDF) sem apagar o destino antes: o conteúdo vai
+    para um temporário que então substitui o destino (os.replace), de modo que uma
+    falha no meio da gravação mantém o arquivo anterior intacto.
+    """
+    with etapa("pdf.output") as medicao:
+        if isinstance(pdf, StreamingPDF):
+            pdf.output(destino)  # grava em destino.parcial e substitui no final
+        else:
+            temporario = destino + ".tmp"
+            try:
+                pdf.output(temporario)
+                os.replace(temporario, destino)
+            finally:
+                if os.path.exists(temporario):
+                    os.remove(temporario)
+        medicao.adicionar(bytes_gravados=tamanho_arquivo(destino))
+
+def descartar_pdf(pdf):
+    """Remove o arquivo parcial de um StreamingPDF não finalizado (sem efeito para FPDF)."""
+    if isinstance(pdf, StreamingPDF):
+        pdf.descartar()
+
+@cronometrado("catalogo.gerar")
+def gerar_catalogo(catalogo, image_folder, output_file, df, codigo_coluna, preco_colunas, position="left", progresso=None,
+                   price_index=None, confirmar_sobrescrita=None, streaming=False, operacao=None):
     """
     Gera o catálogo principal.
     Cabeçalho: fundo escuro e título em dourado (#F2D377).
+    Se price_index não for informado, o índice de preços é construído a partir de df.
+    Com streaming, as páginas são gravadas no disco à medida que são geradas.
+    operacao (job_control.Operacao) permite pausar ou cancelar a geração entre as páginas.
     """
     pdf = None
+    if price_index is None:
+        price_index = PriceIndex(df, codigo_coluna, preco_colunas)
     image_folder = os.path.normpath(image_folder)
     image_files = sorted(
         [f for f in os.listdir(image_folder) if f.lower().endswith((".jpg", ".png"))]
     )
     total_images = len(image_files)
     if not image_files:
-        messagebox.showwarning("Aviso", f"Nenhuma imagem encontrada em {image_folder}.")
+        notificar(progresso, f"Nenhuma imagem encontrada em {image_folder}.", "alerta")
         return False
 
-    if status_text:
-        status_text.config(state="normal")
-        status_text.insert("end", f"📄 Iniciando geração do catálogo: {catalogo} ({total_images} imagens)\n")
-        status_text.config(state="disabled")
-        status_text.see("end")
-
-    for index, image_file in enumerate(image_files, start=1):
-        image_path = os.path.normpath(os.path.join(image_folder, image_file))
-        product_code = os.path.splitext(image_file)[0].split(' ')[0]
-        if "capa" in product_code.lower():
-            prices = {col: "N/A" for col in preco_colunas}
-        else:
-            prices = get_prices_for_code(df, codigo_coluna, preco_colunas, product_code)
-        if os.path.exists(image_path):
-            if status_text:
-                status_text.config(state="normal")
-                status_text.insert("end", f"🔄 [{index}/{total_images}] Processando {image_file}\n")
-                status_text.config(state="disabled")
-                status_text.see("end")
-            img = processar_imagem(image_path)
-            width, height = img.size
-            cell_height = 26
-            table_x = 0 if position == "left" else width - 0
-            offset_vertical = 0
-            table_y = 0
-            cell_width_left = 135
-            cell_width_right = 80
-            total_width = cell_width_left + cell_width_right
-
-            # Adiciona a página com a imagem sem cabeçalho
-            pdf = adicionar_pagina_com_imagem_simples(pdf, img)
-            # Apenas desenha a tabela se pelo menos um valor for diferente de "N/A"
-            if not all(value == "N/A" for value in prices.values()):
-                desenhar_cabecalho(pdf, table_x, table_y, total_width, cell_height,
-                                   header_fill_color=(32, 32, 32),         # Fundo escuro
-                                   header_text_color=(242, 211, 119))       # Texto dourado (#F2D377)
-                desenhar_linhas_tabela(pdf, table_x, cell_height, cell_width_left, cell_width_right, preco_colunas, prices)
     if not output_file:
         output_file = os.path.join(get_documents_folder(), f"{catalogo}.pdf")
     
     output_dir_for_file = os.path.dirname(output_file)
     os.makedirs(output_dir_for_file, exist_ok=True)
-    
-    if os.path.exists(output_file):
-        if not messagebox.askyesno("Arquivo existente", f"O arquivo {output_file} já existe. Deseja sobrescrevê-lo?"):
-            return False
+
+    notificar(progresso, f"📄 Iniciando geração do catálogo: {catalogo} ({total_images} imagens)")
+
+    if streaming:
+        pdf = StreamingPDF(output_file)
+    for index, image_file in enumerate(image_files, start=1):
         try:
-            os.remove(output_file)
-        except Exception as e:
-            messagebox.showerror("Erro", f"Não foi possível remover o arquivo existente:\n{e}")
+            verificar(operacao)
+        except OperacaoCancelada as e:
+            descartar_pdf(pdf)
+            notificar_falha_geracao(progresso, e, retomar=False)
+            return False
+        with etapa("pagina", arquivo=image_file):
+            image_path = os.path.normpath(os.path.join(image_folder, image_file))
+            product_code = os.path.splitext(image_file)[0].split(' ')[0]
+            if "capa" in product_code.lower():
+                prices = price_index.vazio()
+            else:
+                prices = price_index.get(product_code)
+            if os.path.exists(image_path):
+                notificar(progresso, f"🔄 [{index}/{total_images}] Processando {image_file}", atual=index, total=total_images)
+                img = processar_imagem(image_path)
+                width, height = img.size
+                cell_height = 26
+                table_x = 0 if position == "left" else width - 0
+                offset_vertical = 0
+                table_y = 0
+                cell_width_left = 135
+                cell_width_right = 80
+                total_width = cell_width_left + cell_width_right
+
+                # Adiciona a página com a imagem sem cabeçalho
+                pdf = adicionar_pagina_com_imagem_simples(pdf, img)
+                # Apenas desenha a tabela se pelo menos um valor for diferente de "N/A"
+                if not all(value == "N/A" for value in prices.values()):
+                    desenhar_cabecalho(pdf, table_x, table_y, total_width, cell_height,
+                                       header_fill_color=(32, 32, 32),         # Fundo escuro
+                                       header_text_color=(242, 211, 119))       # Texto dourado (#F2D377)
+                    desenhar_linhas_tabela(pdf, table_x, cell_height, cell_width_left, cell_width_right, preco_colunas, prices)
+
+    if os.path.exists(output_file):
+        if confirmar_sobrescrita is not None and not confirmar_sobrescrita(output_file):
+            descartar_pdf(pdf)
             return False
 
-    pdf.output(output_file)
-    if status_text:
-        status_text.config(state="normal")
-        status_text.insert("end", f"✅ Catálogo {catalogo} gerado com sucesso!\n")
-        status_text.config(state="disabled")
-        status_text.see("end")
+    try:
+        gravar_pdf(pdf, output_file)
+    except Exception as e:
+        notificar(progresso, f"Não foi possível gravar o catálogo:\n{e}", "erro")
+        descartar_pdf(pdf)
+        return False
+    notificar(progresso, f"✅ Catálogo {catalogo} gerado com sucesso!")
     return True
 
+@cronometrado("catalogo.gerar")
 def gerar_catalogo_personalizado(catalogo, image_folder, output_file, df, codigo_coluna, preco_colunas,
-                                  grupos_ordenados, grupos_dict, position="left", style="personalizado", status_text=None):
+                                  grupos_ordenados, grupos_dict, position="left", style="personalizado", progresso=None,
+                                  price_index=None, workers=None, usar_cache=True, incremental=True,
+                                  confirmar_sobrescrita=None, streaming=False, em_lotes=False,
+                                  paginas_por_lote=None, perfis=None, retomar=True, operacao=None):
     """
     Gera o catálogo personalizado.
     Se style == "personalizado", utiliza cabeçalho com fundo das lâminas (#333333) e título em vermelho (#BF2B2B);
     se style == "principal", utiliza outro conjunto (ex.: fundo escuro e título dourado).
+    Se price_index não for informado, o índice de preços é construído a partir de df.
+    As imagens são preparadas em paralelo por `workers` processos (padrão: número de núcleos)
+    e, com usar_cache, reaproveitadas do cache em disco entre execuções.
+    Com incremental, um manifesto gravado ao lado do PDF permite copiar do catálogo
+    anterior as páginas cujas entradas (imagem, preços, estilo) não mudaram.
+    Com streaming, as páginas são gravadas no disco à medida que são geradas
+    (StreamingPDF), mantendo o uso de memória constante em catálogos grandes.
+    Com em_lotes, cada grupo (ou trecho de paginas_por_lote páginas) é gerado em um
+    PDF parcial por outro processo, inclusive a escrita do PDF, e os lotes são
+    concatenados na ordem com o PyMuPDF.
+    perfis (PerfilSaida, padrão: só o perfil padrão) permite gerar várias versões
+    do catálogo na mesma execução (ex.: impressão e web), cada uma no arquivo
+    caminho_do_perfil(output_file, perfil); cada imagem é decodificada uma única vez.
+    Com retomar, as páginas são gravadas em blocos (um por grupo ou a cada
+    PAGINAS_POR_BLOCO páginas, ou um por lote) registrados em um diário na pasta
+    <saida>.retomada; se a geração for interrompida, a próxima execução com as
+    mesmas entradas aproveita os blocos concluídos. O catálogo final é sempre
+    gravado em um temporário que substitui o arquivo anterior só no final.
+    operacao (job_control.Operacao) permite pausar ou cancelar a geração entre
+    as páginas; ao cancelar, o catálogo existente fica intacto.
     """
-    pdf = None
-    total_imagens = 0
+    if perfis is None:
+        perfis = [PERFIL_PADRAO]
+    if price_index is None:
+        price_index = PriceIndex(df, codigo_coluna, preco_colunas)
     image_folder = os.path.normpath(image_folder)
-    
+    if not output_file:
+        output_file = os.path.join(get_documents_folder(), f"{catalogo}.pdf")
+
+    # Lista as páginas (grupo, arquivo) na ordem em que serão geradas,
+    # com uma única varredura da pasta
+    with etapa("imagens.indexar", pasta=image_folder):
+        imagens_por_grupo = agrupar_imagens(indexar_imagens(image_folder), grupos_ordenados, grupos_dict)
+    paginas = []
     for grupo in grupos_ordenados:
-        prefixos = grupos_dict.get(grupo, [])
-        imagens = sorted([
-            f for f in os.listdir(image_folder)
-            if f.lower().endswith((".jpg", ".png")) and any(f.startswith(pref) for pref in prefixos)
-        ])
-        total_imagens += len(imagens)
+        for imagem in imagens_por_grupo[grupo]:
+            paginas.append((grupo, imagem))
+    total_imagens = len(paginas)
     
     if total_imagens == 0:
-        messagebox.showwarning("Aviso", f"Nenhuma imagem encontrada em {image_folder} para os grupos selecionados.")
+        notificar(progresso, f"Nenhuma imagem encontrada em {image_folder} para os grupos selecionados.", "alerta")
         return False
 
-    if status_text:
-        status_text.config(state="normal")
-        status_text.insert("end", f"📄 Iniciando geração do catálogo: {catalogo} (total {total_imagens} imagens, organizadas por grupos)\n")
-        status_text.config(state="disabled")
-        status_text.see("end")
+    notificar(progresso, f"📄 Iniciando geração do catálogo: {catalogo} (total {total_imagens} imagens, organizadas por grupos)")
 
-    cont_imagens = 0
-    for grupo in grupos_ordenados:
-        prefixos = grupos_dict.get(grupo, [])
-        imagens = sorted([
-            f for f in os.listdir(image_folder)
-            if f.lower().endswith((".jpg", ".png")) and any(f.startswith(pref) for pref in prefixos)
-        ])
-        for image_file in imagens:
-            cont_imagens += 1
-            image_path = os.path.normpath(os.path.join(image_folder, image_file))
-            if os.path.exists(image_path):
-                if status_text:
-                    status_text.config(state="normal")
-                    status_text.insert("end", f"🔄 [{cont_imagens}/{total_imagens}] Processando {image_file} (Grupo: {grupo})\n")
-                    status_text.config(state="disabled")
-                    status_text.see("end")
-                    product_code = os.path.splitext(image_file)[0].split(' ')[0]
-                    if "capa" in product_code.lower():
-                        prices = {col: "N/A" for col in preco_colunas}
-                    else:
-                        prices = get_prices_for_code(df, codigo_coluna, preco_colunas, product_code)
-                img = processar_imagem(image_path)
-                width, height = img.size
-                cell_height = 25
-                table_x = 0 if position == "left" else width - 280
-                table_y = height - ((len(preco_colunas) + 1) * cell_height)
-                cell_width_left = 120
-                cell_width_right = 80
-                total_width = cell_width_left + cell_width_right
+    # Descreve cada página para o manifesto de cada perfil e identifica as que podem ser reaproveitadas
+    precos_por_pagina = []
+    for grupo, imagem in paginas:
+        product_code = os.path.splitext(imagem.nome)[0].split(' ')[0]
+        if "capa" in product_code.lower():
+            precos_por_pagina.append(price_index.vazio())
+        else:
+            precos_por_pagina.append(price_index.get(product_code))
+    saidas = [preparar_saida_catalogo(caminho_do_perfil(output_file, perfil), perfil, paginas, precos_por_pagina,
+                                      preco_colunas, style, position, incremental, retomar)
+              for perfil in perfis]
+    # A imagem de uma página é decodificada uma vez para todos os perfis: a página é
+    # gerada de novo em todos se algum perfil não puder reaproveitá-la
+    a_renderizar = [i for i in range(total_imagens)
+                    if any(i not in saida["reaproveitadas"] and i not in saida["recuperadas"] for saida in saidas)]
+    for saida in saidas:
+        for i in a_renderizar:
+            saida["reaproveitadas"].pop(i, None)
+            saida["recuperadas"].pop(i, None)
+        for i, pagina_anterior in saida["reaproveitadas"].items():
+            saida["entradas"][i]["largura"] = saida["anteriores"][pagina_anterior]["largura"]
+            saida["entradas"][i]["altura"] = saida["anteriores"][pagina_anterior]["altura"]
+        for i, (bloco, n, largura, altura) in saida["recuperadas"].items():
+            saida["entradas"][i]["largura"], saida["entradas"][i]["altura"] = largura, altura
+            saida["origem_nova"][i] = (bloco, n)
+    n_reaproveitadas = total_imagens - len(a_renderizar)
+    n_recuperadas = len(saidas[0]["recuperadas"])
+
+    if n_reaproveitadas - n_recuperadas:
+        notificar(progresso, f"♻ {n_reaproveitadas - n_recuperadas} páginas sem alterações serão copiadas do catálogo anterior",
+                  atual=n_reaproveitadas, total=total_imagens)
+    if n_recuperadas:
+        notificar(progresso, f"⏯ {n_recuperadas} páginas recuperadas da geração interrompida anteriormente",
+                  atual=n_reaproveitadas, total=total_imagens)
+    if len(perfis) > 1:
+        notificar(progresso, f"🖨 Perfis de saída: {', '.join(perfil.nome for perfil in perfis)}")
+
+    parametros_perfis = [(perfil.max_size, perfil.quality) for perfil in perfis]
+    if em_lotes and a_renderizar:
+        lotes = dividir_em_lotes(a_renderizar, [grupo for grupo, _ in paginas], paginas_por_lote)
+        tarefas = []
+        for n, lote in enumerate(lotes):
+            if retomar:
+                # Cada lote concluído é um bloco do diário
+                arquivos = [saida["diario"].novo_bloco() for saida in saidas]
+            else:
+                arquivos = [f"{saida['arquivo']}.lote{n}.tmp" for saida in saidas]
+                for saida, lote_file in zip(saidas, arquivos):
+                    saida["temporarios"].append(lote_file)
+            tarefas.append({
+                "arquivos": arquivos,
+                "paginas": [(paginas[i][1].caminho, paginas[i][1].stat, saidas[0]["entradas"][i]["precos"]) for i in lote],
+                "preco_colunas": list(preco_colunas),
+                "perfis": parametros_perfis,
+                "position": position,
+                "style": style,
+                "pasta_cache": get_image_cache_folder() if usar_cache else None,
+            })
+        notificar(progresso, f"🧩 Gerando {len(a_renderizar)} páginas em {len(lotes)} lotes paralelos")
+        n_renderizadas = 0
+        try:
+            for n, dimensoes in executar_lotes(renderizar_lote, tarefas, workers, operacao):
+                for j, (i, dimensoes_perfis) in enumerate(zip(lotes[n], dimensoes)):
+                    for saida, lote_file, (width, height) in zip(saidas, tarefas[n]["arquivos"], dimensoes_perfis):
+                        saida["entradas"][i]["largura"], saida["entradas"][i]["altura"] = width, height
+                        saida["origem_nova"][i] = (lote_file, j)
+                if retomar:
+                    for saida, lote_file in zip(saidas, tarefas[n]["arquivos"]):
+                        saida["diario"].registrar(lote_file, [saida["entradas"][i] for i in lotes[n]])
+                n_renderizadas += len(lotes[n])
+                notificar(progresso, f"🔄 Lote {n + 1}/{len(lotes)} pronto ({paginas[lotes[n][0]][0]})",
+                          atual=n_reaproveitadas + n_renderizadas, total=total_imagens)
+        except Exception as e:
+            for saida in saidas:
+                remover_temporarios(saida["temporarios"])
+            notificar_falha_geracao(progresso, e, retomar)
+            return False
+        if usar_cache:
+            ImageCache(get_image_cache_folder()).podar()
+    else:
+        cache = ImageCache(get_image_cache_folder()) if usar_cache and a_renderizar else None
+        preparadas = preparar_imagens_perfis([paginas[i][1].caminho for i in a_renderizar], parametros_perfis,
+                                             referencia=TAMANHO_PAGINA_REFERENCIA, workers=workers, cache=cache,
+                                             stats={paginas[i][1].caminho: paginas[i][1].stat for i in a_renderizar})
+        if retomar:
+            # Cada bloco (grupo ou trecho de PAGINAS_POR_BLOCO páginas) vira um ponto de retomada
+            blocos = dividir_em_lotes(a_renderizar, [grupo for grupo, _ in paginas], PAGINAS_POR_BLOCO)
+        else:
+            blocos = [a_renderizar] if a_renderizar else []
+        inicio_bloco = {bloco[0] for bloco in blocos}
+        fim_bloco = {bloco[-1] for bloco in blocos}
+        try:
+            for n_renderizadas, (i, (_, variantes)) in enumerate(zip(a_renderizar, preparadas), start=1):
+                verificar(operacao)
+                with etapa("pagina", indice=i, arquivo=paginas[i][1].nome):
+                    grupo, imagem = paginas[i]
+                    notificar(progresso, f"🔄 [{i + 1}/{total_imagens}] Processando {imagem.nome} (Grupo: {grupo})",
+                              atual=n_reaproveitadas + n_renderizadas, total=total_imagens)
+                    if i in inicio_bloco:
+                        for saida in saidas:
+                            abrir_bloco(saida, streaming)
+                    prices = dict(zip(preco_colunas, saidas[0]["entradas"][i]["precos"]))
+                    for saida, (width, height, jpeg_bytes) in zip(saidas, variantes):
+                        saida["entradas"][i]["largura"], saida["entradas"][i]["altura"] = width, height
+                        saida["origem_nova"][i] = (saida["bloco"], len(saida["paginas_bloco"]))
+                        saida["paginas_bloco"].append(i)
+
+                        # Adiciona a página com a imagem sem cabeçalho
+                        saida["pdf"] = adicionar_pagina_com_jpeg(saida["pdf"], width, height, jpeg_bytes)
+
+                        # Apenas desenha a tabela se houver dados válidos (não todos "N/A")
+                        if not all(value == "N/A" for value in prices.values()):
+                            desenhar_tabela_personalizada(saida["pdf"], width, height, preco_colunas, prices, position, style)
+                    if retomar and i in fim_bloco:
+                        for saida in saidas:
+                            fechar_bloco(saida)
+        except Exception as e:
+            # Encerra o pool de imagens sem esperar as que ainda estão na fila
+            preparadas.close()
+            for saida in saidas:
+                descartar_pdf(saida["pdf"])
+                remover_temporarios(saida["temporarios"])
+            notificar_falha_geracao(progresso, e, retomar)
+            return False
+        if cache is not None:
+            cache.podar()
+
+    resultados = [gravar_saida_catalogo(saida, total_imagens, confirmar_sobrescrita, progresso) for saida in saidas]
+    if False in resultados:
+        return False
+    if all(resultado == "atualizado" for resultado in resultados):
+        notificar(progresso, f"✅ Catálogo {catalogo} já está atualizado.")
+        return True
+    if len(saidas) > 1:
+        notificar(progresso, "📁 Arquivos: " + ", ".join(os.path.basename(saida["arquivo"]) for saida in saidas))
+    notificar(progresso, f"✅ Catálogo {catalogo} gerado com sucesso!")
+    return True
+
+def preparar_saida_catalogo(arquivo, perfil, paginas, precos_por_pagina, preco_colunas, style, position, incremental,
+                            retomar=False):
+    """
+    Monta o estado de uma saída (um perfil) do catálogo personalizado: entradas do
+    manifesto de cada página, manifesto anterior e páginas que podem ser copiadas
+    dele e, com retomar, o diário da geração e as páginas recuperáveis dos seus blocos.
+    """
+    entradas = [descrever_pagina(grupo, imagem, preco_colunas, prices, style, position, perfil.max_size, perfil.quality)
+                for (grupo, imagem), prices in zip(paginas, precos_por_pagina)]
+    anteriores = carregar_manifesto(arquivo) if incremental else None
+    indice_anterior = indexar_manifesto(anteriores)
+    reaproveitadas = {}
+    for i, entrada in enumerate(entradas):
+        pagina_anterior = indice_anterior.get(chave_pagina(entrada))
+        if pagina_anterior is not None:
+            reaproveitadas[i] = pagina_anterior
+    diario = DiarioGeracao(arquivo, recuperar=incremental) if retomar else None
+    recuperadas = {}
+    if diario is not None:
+        indice_blocos = diario.paginas_recuperaveis()
+        for i, entrada in enumerate(entradas):
+            if i not in reaproveitadas and chave_pagina(entrada) in indice_blocos:
+                recuperadas[i] = indice_blocos[chave_pagina(entrada)]
+    novas_file = arquivo + ".novas.tmp"
+    return {
+        "arquivo": arquivo,
+        "perfil": perfil,
+        "entradas": entradas,
+        "anteriores": anteriores,
+        "reaproveitadas": reaproveitadas,  # i -> página no PDF anterior
+        "recuperadas": recuperadas,        # i -> (bloco, página, largura, altura) de uma geração interrompida
+        "origem_nova": {},                 # i -> (PDF temporário ou bloco, página) das páginas novas
+        "diario": diario,
+        "novas_file": novas_file,
+        "temporarios": [novas_file],
+        "pdf": None,
+        "bloco": None,                     # PDF em que as páginas estão sendo gravadas
+        "paginas_bloco": [],
+    }
+
+def abrir_bloco(saida, streaming=False):
+    """
+    Começa um bloco de páginas da saída: um bloco novo do diário ou, sem retomada,
+    o PDF temporário das páginas novas / o próprio catálogo. Sem streaming o FPDF é
+    criado na primeira página (adicionar_pagina_com_jpeg).
+    """
+    if saida["diario"] is not None:
+        saida["bloco"] = saida["diario"].novo_bloco()
+        if streaming:
+            saida["pdf"] = StreamingPDF(saida["bloco"])
+    else:
+        saida["bloco"] = saida["novas_file"]
+        if streaming:
+            saida["pdf"] = StreamingPDF(saida["novas_file"] if saida["reaproveitadas"] else saida["arquivo"])
+    saida["paginas_bloco"] = []
+
+def fechar_bloco(saida):
+    """Grava o bloco atual da saída e o registra no diário (passa a ser um ponto de retomada)."""
+    pdf, saida["pdf"] = saida["pdf"], None
+    gravar_pdf(pdf, saida["bloco"])
+    if not isinstance(pdf, StreamingPDF):
+        # O FPDF tem referências circulares: sem a coleta, as imagens dos blocos já
+        # gravados ficariam em memória até a próxima coleta completa
+        del pdf
+        gc.collect()
+    saida["diario"].registrar(saida["bloco"], [saida["entradas"][i] for i in saida["paginas_bloco"]])
+
+def notificar_falha_geracao(progresso, erro, retomar):
+    """Informa que a geração foi interrompida por erro ou cancelada pelo usuário (OperacaoCancelada)."""
+    if isinstance(erro, OperacaoCancelada):
+        mensagem, log_type = "⏹ Geração cancelada. O catálogo existente não foi alterado.", "informacao"
+    else:
+        mensagem, log_type = f"Não foi possível gerar as páginas:\n{erro}", "erro"
+    if retomar:
+        mensagem += "\nAs páginas já concluídas serão aproveitadas na próxima geração."
+    notificar(progresso, mensagem, log_type)
+
+@cronometrado("catalogo.gravar")
+def gravar_saida_catalogo(saida, total_imagens, confirmar_sobrescrita=None, progresso=None):
+    """
+    Grava o PDF de uma saída do catálogo personalizado (gerado direto ou montado com
+    as páginas copiadas do PDF anterior) e o seu manifesto.
+    Retorna True, "atualizado" (nada mudou) ou False (cancelado ou erro).
+    """
+    output_file = saida["arquivo"]
+    pdf = saida["pdf"]
+    diario = saida["diario"]
+    reaproveitadas = saida["reaproveitadas"]
+    anteriores = saida["anteriores"]
+    entradas = saida["entradas"]
+    temporarios = saida["temporarios"]
 
-                # Adiciona a página com a imagem sem cabeçalho
-                pdf = adicionar_pagina_com_imagem_simples(pdf, img)
-                
-                # Apenas desenha a tabela se houver dados válidos (não todos "N/A")
-                if not all(value == "N/A" for value in prices.values()):
-                    if style == "principal":
-                        header_fill_color = (32, 32, 32)         # Fundo escuro
-                        header_text_color = (242, 211, 119)        # Texto dourado (#F2D377)
-                        offset_vertical = 0
-                        table_y = height - ((len(preco_colunas) + 1) * cell_height) - offset_vertical
-
-                    else:  # style "personalizado" ou outro valor
-                        header_fill_color = (77, 79, 89)           # Fundo: cor das lâminas (#333333)
-                        header_text_color = (255, 255, 255)          # Texto: vermelho (#BF2B2B)
-                        offset_vertical = 40
-                        table_y = height - ((len(preco_colunas) + 1) * cell_height) - offset_vertical
-
-                    
-                    desenhar_cabecalho(pdf, table_x, table_y, total_width, cell_height,
-                                       header_fill_color=header_fill_color,
-                                       header_text_color=header_text_color)
-                    desenhar_linhas_tabela(pdf, table_x, cell_height, cell_width_left, cell_width_right, preco_colunas, prices)
-    if not output_file:
-        output_file = os.path.join(get_documents_folder(), f"{catalogo}.pdf")
-    
     output_dir_for_file = os.path.dirname(output_file)
     os.makedirs(output_dir_for_file, exist_ok=True)
+
+    # Nada mudou: o catálogo anterior já corresponde exatamente às entradas atuais
+    if anteriores is not None and [chave_pagina(e) for e in anteriores] == [chave_pagina(e) for e in entradas]:
+        descartar_pdf(pdf)
+        remover_temporarios(temporarios)
+        if diario is not None:
+            diario.concluir()
+        return "atualizado"
     
     if os.path.exists(output_file):
-        if not messagebox.askyesno("Arquivo existente", f"O arquivo {output_file} já existe. Deseja sobrescrevê-lo?"):
+        if confirmar_sobrescrita is not None and not confirmar_sobrescrita(output_file):
+            descartar_pdf(pdf)
+            remover_temporarios(temporarios)
             return False
+
+    segmentos = [
+        (output_file, reaproveitadas[i]) if i in reaproveitadas else saida["origem_nova"][i]
+        for i in range(total_imagens)
+    ]
+    bloco_unico = segmentos[0][0]
+    if not reaproveitadas and pdf is not None:
         try:
-            os.remove(output_file)
+            gravar_pdf(pdf, output_file)
         except Exception as e:
-            messagebox.showerror("Erro", f"Não foi possível remover o arquivo existente:\n{e}")
+            notificar(progresso, f"Não foi possível gravar o catálogo:\n{e}", "erro")
+            descartar_pdf(pdf)
             return False
+    elif (diario is not None and diario.quantidade_paginas(bloco_unico) == total_imagens
+          and segmentos == [(bloco_unico, n) for n in range(total_imagens)]):
+        # Todas as páginas estão, na ordem, em um único bloco: ele já é o catálogo
+        os.replace(bloco_unico, output_file)
+    else:
+        # Monta o catálogo com as páginas copiadas do PDF anterior e as recém-geradas
+        montado_file = output_file + ".tmp"
+        temporarios.append(montado_file)
+        try:
+            if pdf is not None:
+                gravar_pdf(pdf, saida["novas_file"])
+            montar_pdf_em_fluxo(segmentos, montado_file)
+            os.replace(montado_file, output_file)
+        except Exception as e:
+            notificar(progresso, f"Não foi possível gravar o catálogo:\n{e}", "erro")
+            return False
+        finally:
+            descartar_pdf(pdf)
+            remover_temporarios(temporarios)
+    gravar_manifesto(output_file, entradas)
+    if diario is not None:
+        diario.concluir()
+    return True
+
+@cronometrado("catalogo.atualizar_precos")
+def atualizar_precos_catalogo(catalogo_pdf, df, codigo_coluna, preco_colunas, price_index=None, progresso=None):
+    """
+    Atualiza apenas as tabelas de preços de um catálogo já gerado, sem tocar nas imagens.
+    Usa o manifesto gravado por gerar_catalogo_personalizado para saber o código,
+    o estilo e a posição de cada página; em cada página cujos preços mudaram, a tabela
+    anterior é apagada e a nova é desenhada por cima, em vetor.
+    """
+    if price_index is None:
+        price_index = PriceIndex(df, codigo_coluna, preco_colunas)
+    catalogo_pdf = os.path.normpath(catalogo_pdf)
+    entradas = carregar_manifesto(catalogo_pdf)
+    if entradas is None:
+        notificar(progresso, f"O catálogo {catalogo_pdf} não possui manifesto válido "
+                             "(foi alterado ou gerado por uma versão anterior). Gere o catálogo novamente.", "alerta")
+        return False
+
+    colunas = [str(col) for col in preco_colunas]
+    alteradas = 0
+    doc = abrir_pdf(catalogo_pdf)
+    try:
+        if len(doc) != len(entradas):
+            notificar(progresso, f"O catálogo {catalogo_pdf} não corresponde ao seu manifesto.", "alerta")
+            return False
+        for i, entrada in enumerate(entradas):
+            product_code = os.path.splitext(entrada["arquivo"])[0].split(' ')[0]
+            if "capa" in product_code.lower():
+                prices = price_index.vazio()
+            else:
+                prices = price_index.get(product_code)
+            novos = [prices[col] for col in preco_colunas]
+            if novos == entrada["precos"] and colunas == entrada["colunas"]:
+                continue
+            page = doc[i]
+            width, height = entrada["largura"], entrada["altura"]
+            if not all(value == "N/A" for value in entrada["precos"]):
+                antigo = layout_tabela_personalizada(width, height, len(entrada["colunas"]),
+                                                     entrada["position"], entrada["style"])
+                limpar_regiao(page, antigo["table_x"], antigo["table_y"], antigo["total_width"],
+                              (len(entrada["colunas"]) + 1) * antigo["cell_height"])
+            if not all(value == "N/A" for value in novos):
+                layout = layout_tabela_personalizada(width, height, len(preco_colunas),
+                                                     entrada["position"], entrada["style"])
+                desenhar_tabela_sobreposta(page, layout, preco_colunas, prices)
+            entrada["precos"] = novos
+            entrada["colunas"] = colunas
+            alteradas += 1
+            notificar(progresso, f"💲 [{i + 1}/{len(entradas)}] Preços atualizados: {entrada['arquivo']}",
+                      atual=i + 1, total=len(entradas))
+
+        if alteradas:
+            temporario = catalogo_pdf + ".tmp"
+            try:
+                doc.save(temporario, garbage=3, deflate=True)
+                doc.close()
+                os.replace(temporario, catalogo_pdf)
+            except Exception as e:
+                notificar(progresso, f"Não foi possível gravar o catálogo:\n{e}", "erro")
+                if os.path.exists(temporario):
+                    os.remove(temporario)
+                return False
+            gravar_manifesto(catalogo_pdf, entradas)
+    finally:
+        if not doc.is_closed:
+            doc.close()
 
-    pdf.output(output_file)
-    if status_text:
-        status_text.config(state="normal")
-        status_text.insert("end", f"✅ Catálogo {catalogo} gerado com sucesso!\n")
-        status_text.config(state="disabled")
-        status_text.see("end")
+    notificar(progresso, f"✅ {alteradas} de {len(entradas)} páginas com preços atualizados.")
     return True
@@ -0,0 +1,135 @@
+# src/cli.py
+"""
+Linha de comando do gerador de catálogos (sem interface gráfica).
+
+Exemplos (a partir da pasta src):
+    python -m cli gerar --catalogo principal --saida Catalogo_Principal.pdf
+    python -m cli gerar --catalogo secundario --grupos "Times,Celebridades" --saida sec.pdf
+    python -m cli gerar --catalogo principal --saida Catalogo.pdf --perfis impressao,web
+    python -m cli precos Catalogo_Principal.pdf
+    python -m cli otimizar Catalogo_Principal.pdf --alvo-mb 15
+    python -m cli --trace trace.json gerar --catalogo principal --saida Catalogo_Principal.pdf
+"""
+import sys
+import time
+import argparse
+import multiprocessing
+import api
+import tracing
+from catalogo import CatalogoError
+from pdf_optimizer import resumo_otimizacao
+from output_profiles import PERFIS, obter_perfis
+
+def imprimir_progresso(mensagem, log_type="default", atual=None, total=None):
+    """Callback de progresso que escreve no terminal."""
+    destino = sys.stderr if log_type in ("alerta", "erro") else sys.stdout
+    print(mensagem, file=destino, flush=True)
+
+def perfis_argumento(valor):
+    """Converte "padrao,web" na lista de perfis de saída (para o argparse)."""
+    try:
+        return obter_perfis([nome.strip() for nome in valor.split(",") if nome.strip()])
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+def imprimir_resumo_trace(resumo):
+    """Mostra as etapas medidas, da que levou mais tempo para a que levou menos."""
+    etapas = sorted(resumo["etapas"].items(), key=lambda item: item[1]["total_ms"], reverse=True)
+    print(f"{'etapa':<26} {'chamadas':>9} {'total (ms)':>11} {'média (ms)':>11} {'máx (ms)':>10}")
+    for nome, dados in etapas:
+        print(f"{nome:<26} {dados['chamadas']:>9} {dados['total_ms']:>11.1f} "
+              f"{dados['media_ms']:>11.2f} {dados['max_ms']:>10.1f}")
+    print(f"Pico de memória: {resumo['pico_memoria_mb']:.0f} MB")
+
+def criar_parser():
+    parser = argparse.ArgumentParser(prog="cli", description="Gerador de catálogos em PDF")
+    parser.add_argument("--trace", metavar="ARQUIVO",
+                        help="Mede cada etapa e grava um trace do Chrome (e ARQUIVO.resumo.json); "
+                             "também pode ser ativado pela variável CATALOGO_TRACE")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    gerar = sub.add_parser("gerar", help="Gera um catálogo completo")
+    gerar.add_argument("--catalogo", choices=sorted(api.CATALOGOS), default="principal",
+                       help="Configuração de catálogo a usar (padrão: principal)")
+    gerar.add_argument("--saida", required=True, help="Arquivo PDF de saída")
+    gerar.add_argument("--planilha", help="Planilha .ods ou .xlsx (padrão: pasta de dados do usuário)")
+    gerar.add_argument("--imagens", help="Pasta de imagens (padrão: pasta do catálogo nos Documentos)")
+    gerar.add_argument("--grupos", help="Grupos na ordem desejada, separados por vírgula (padrão: todos)")
+    gerar.add_argument("--estilo", help="Estilo da tabela (principal, personalizado, secundario...)")
+    gerar.add_argument("--posicao", choices=("left", "right"), help="Posição da tabela de preços")
+    gerar.add_argument("--workers", type=int, help="Processos para preparar as imagens (padrão: núcleos)")
+    gerar.add_argument("--sem-cache", action="store_true", help="Não usa o cache de imagens em disco")
+    gerar.add_argument("--completo", action="store_true", help="Regera todas as páginas (sem modo incremental)")
+    gerar.add_argument("--streaming", action="store_true",
+                       help="Grava as páginas no disco durante a geração (memória constante)")
+    gerar.add_argument("--lotes", action="store_true",
+                       help="Gera cada grupo em um PDF parcial em paralelo e junta no final")
+    gerar.add_argument("--paginas-por-lote", type=int, help="Divide os grupos grandes em lotes deste tamanho")
+    gerar.add_argument("--perfis", type=perfis_argumento,
+                       help=f"Perfis de saída gerados juntos, separados por vírgula ({', '.join(PERFIS)}); "
+                            "cada um vai para <saida><sufixo>.pdf")
+    gerar.add_argument("--sem-retomada", action="store_true",
+                       help="Não guarda as páginas concluídas para retomar uma geração interrompida")
+    gerar.add_argument("--nao-sobrescrever", action="store_true", help="Não substitui um PDF existente")
+
+    precos = sub.add_parser("precos", help="Atualiza apenas os preços de um catálogo já gerado")
+    precos.add_argument("catalogo_pdf", help="Catálogo PDF gerado anteriormente")
+    precos.add_argument("--planilha", help="Planilha .ods ou .xlsx (padrão: pasta de dados do usuário)")
+
+    otimizar = sub.add_parser("otimizar", help="Gera uma versão menor (web) de um PDF")
+    otimizar.add_argument("pdf", help="PDF a otimizar")
+    otimizar.add_argument("--saida", help="Arquivo de saída (padrão: <pdf>_web.pdf)")
+    otimizar.add_argument("--alvo-mb", type=float, help="Tamanho máximo desejado, em MB")
+    otimizar.add_argument("--dpi", type=int, help="Resolução máxima das imagens na página")
+    otimizar.add_argument("--max-lado", type=int, help="Lado máximo das imagens, em pixels")
+    otimizar.add_argument("--qualidade", type=int, help="Qualidade JPEG das imagens recomprimidas")
+    return parser
+
+def main(argv=None):
+    args = criar_parser().parse_args(argv)
+    if args.trace:
+        tracing.ativar(args.trace)
+    else:
+        tracing.ativar_pelo_ambiente()
+    inicio = time.perf_counter()
+    try:
+        if args.comando == "gerar":
+            grupos = [g.strip() for g in args.grupos.split(",") if g.strip()] if args.grupos else None
+            ok = api.gerar(
+                args.saida,
+                catalogo=args.catalogo,
+                planilha=args.planilha,
+                pasta_imagens=args.imagens,
+                grupos_ordenados=grupos,
+                style=args.estilo,
+                position=args.posicao,
+                progresso=imprimir_progresso,
+                sobrescrever=not args.nao_sobrescrever,
+                workers=args.workers,
+                usar_cache=not args.sem_cache,
+                incremental=not args.completo,
+                streaming=args.streaming,
+                em_lotes=args.lotes or args.paginas_por_lote is not None,
+                paginas_por_lote=args.paginas_por_lote,
+                perfis=args.perfis,
+                retomar=not args.sem_retomada,
+            )
+        elif args.comando == "precos":
+            ok = api.atualizar_precos(args.catalogo_pdf, planilha=args.planilha, progresso=imprimir_progresso)
+        else:
+            relatorio = api.otimizar(args.pdf, saida=args.saida, alvo_mb=args.alvo_mb, dpi=args.dpi,
+                                     max_lado=args.max_lado, qualidade=args.qualidade, progresso=imprimir_progresso)
+            print(resumo_otimizacao(relatorio))
+            ok = True
+    except CatalogoError as e:
+        print(e, file=sys.stderr)
+        return 1
+    print(f"Tempo total: {time.perf_counter() - inicio:.2f} s")
+    if tracing.ativo():
+        imprimir_resumo_trace(tracing.exportar(limpar=True))
+        print(f"Trace gravado em {tracing.caminho_trace()}")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
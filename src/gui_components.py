@@ -1,8 +1,12 @@
 import os
 import sys
+import time
+import queue
+import threading
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 import tkinter as tk  # Necessário para PhotoImage
+from tkinter import messagebox
 
 def resource_path(relative_path: str) -> str:
     """
@@ -22,7 +26,7 @@ def criar_janela():
     """Cria a janela principal da aplicação."""
     root = ttk.Window(themename="darkly")
     root.title("Gerador de Catálogo")
-    root.geometry("700x500")
+    root.geometry("700x610")
     root.resizable(False, False)
     return root
 
@@ -35,12 +39,221 @@ def criar_layout(root):
 
     return frame_menu, frame_main
 
+class StatusBox:
+    """
+    Caixa de status/logs com barra de progresso.
+
+    publicar() e progresso() podem ser chamados de qualquer thread: as mensagens vão
+    para uma fila que o loop principal do Tk esvazia periodicamente, inserindo-as em
+    lote. O histórico é limitado a max_linhas para que a caixa não fique lenta.
+    Os botões Pausar/Cancelar controlam as operações registradas com acompanhar().
+    """
+    CORES = {
+        "processamento": "#F5F5F5",
+        "sucesso": "#58D68D",
+        "erro": "#E74C3C",
+        "informacao": "#3498DB",
+        "alerta": "#F1C40F",
+        "default": "#FFFFFF",
+    }
+
+    def __init__(self, frame_main, intervalo_ms=100, max_linhas=2000):
+        self.intervalo_ms = intervalo_ms
+        self.max_linhas = max_linhas
+        self.fila = queue.Queue()
+        self._inicio = None
+        self._base = 0
+        self._ultimo = (0, 0)
+        self._operacoes = []
+
+        frame_progresso = ttk.Frame(frame_main, bootstyle="dark")
+        frame_progresso.pack(side=BOTTOM, fill=X, padx=10, pady=(0, 10))
+        self.barra = ttk.Progressbar(frame_progresso, mode="determinate", bootstyle="success-striped")
+        self.barra.pack(fill=X)
+        frame_controles = ttk.Frame(frame_progresso, bootstyle="dark")
+        frame_controles.pack(fill=X, pady=(4, 0))
+        self.botao_cancelar = ttk.Button(frame_controles, text="⏹ Cancelar", command=self._cancelar,
+                                         bootstyle="danger-outline", state="disabled")
+        self.botao_cancelar.pack(side=RIGHT)
+        self.botao_pausar = ttk.Button(frame_controles, text="⏸ Pausar", command=self._alternar_pausa,
+                                       bootstyle="warning-outline", state="disabled")
+        self.botao_pausar.pack(side=RIGHT, padx=(0, 5))
+        self.rotulo = ttk.Label(frame_controles, text="", bootstyle="inverse-dark")
+        self.rotulo.pack(side=LEFT, fill=X, expand=True)
+
+        self.text = ttk.Text(frame_main, height=15, wrap="word",
+                             state="disabled", background="#222", foreground="white")
+        self.text.pack(fill=BOTH, expand=True, padx=10, pady=10)
+        for tag, cor in self.CORES.items():
+            self.text.tag_config(tag, foreground=cor)
+        self.text.after(self.intervalo_ms, self._drenar)
+
+    def publicar(self, mensagem, log_type="default"):
+        """Enfileira uma linha de log (thread-safe)."""
+        self.fila.put(("log", mensagem, log_type))
+
+    def progresso(self, atual, total):
+        """Enfileira o andamento atual/total (thread-safe). total None: quantidade ainda desconhecida."""
+        self.fila.put(("progresso", atual, total))
+
+    def avisar(self, titulo, mensagem, tipo="alerta"):
+        """Exibe uma janela de aviso (tipo "alerta") ou de erro (tipo "erro") pelo loop do Tk (thread-safe)."""
+        self.fila.put(("aviso", titulo, mensagem, tipo))
+
+    def acompanhar(self, operacao):
+        """Liga os botões Pausar/Cancelar à operação (job_control.Operacao) até liberar() (thread-safe)."""
+        self.fila.put(("operacao", operacao, True))
+
+    def liberar(self, operacao):
+        """Desliga os botões da operação que terminou (thread-safe)."""
+        self.fila.put(("operacao", operacao, False))
+
+    def perguntar(self, titulo, mensagem):
+        """
+        Faz uma pergunta sim/não ao usuário e retorna a resposta.
+        Chamada de outra thread, aguarda o loop do Tk exibir a pergunta.
+        """
+        if threading.current_thread() is threading.main_thread():
+            return messagebox.askyesno(titulo, mensagem)
+        resposta = {}
+        respondida = threading.Event()
+        self.fila.put(("pergunta", titulo, mensagem, resposta, respondida))
+        respondida.wait()
+        return resposta.get("sim", False)
+
+    def _drenar(self):
+        linhas = []
+        progresso = None
+        try:
+            while True:
+                item = self.fila.get_nowait()
+                if item[0] == "log":
+                    linhas.append(item[1:])
+                elif item[0] == "progresso":
+                    progresso = item[1:]
+                elif item[0] == "operacao":
+                    self._registrar_operacao(*item[1:])
+                else:
+                    # Janelas modais: primeiro mostra o que já foi registrado antes delas
+                    if linhas:
+                        self._inserir(linhas)
+                        linhas = []
+                    self._exibir_janela(item)
+        except queue.Empty:
+            pass
+        if linhas:
+            self._inserir(linhas)
+        if progresso is not None:
+            self._atualizar_progresso(*progresso)
+        self.text.after(self.intervalo_ms, self._drenar)
+
+    def _registrar_operacao(self, operacao, ativa):
+        if ativa:
+            self._operacoes.append(operacao)
+        elif operacao in self._operacoes:
+            self._operacoes.remove(operacao)
+        self._atualizar_botoes()
+
+    def _atualizar_botoes(self):
+        ativas = [operacao for operacao in self._operacoes if not operacao.cancelada]
+        estado = "normal" if ativas else "disabled"
+        pausada = any(operacao.pausada for operacao in ativas)
+        self.botao_pausar.configure(state=estado, text="▶ Continuar" if pausada else "⏸ Pausar")
+        self.botao_cancelar.configure(state=estado)
+
+    def _alternar_pausa(self):
+        ativas = [operacao for operacao in self._operacoes if not operacao.cancelada]
+        if any(operacao.pausada for operacao in ativas):
+            for operacao in ativas:
+                operacao.continuar()
+            self._inserir([("▶ Continuando...", "informacao")])
+        else:
+            for operacao in ativas:
+                operacao.pausar()
+            self._inserir([("⏸ Pausado (a página em andamento é concluída antes de parar).", "alerta")])
+        self._atualizar_botoes()
+
+    def _cancelar(self):
+        for operacao in self._operacoes:
+            operacao.cancelar()
+        self._inserir([("⏹ Cancelando...", "alerta")])
+        self._atualizar_botoes()
+
+    def _exibir_janela(self, item):
+        if item[0] == "aviso":
+            _, titulo, mensagem, tipo = item
+            if tipo == "erro":
+                messagebox.showerror(titulo, mensagem)
+            else:
+                messagebox.showwarning(titulo, mensagem)
+        else:
+            _, titulo, mensagem, resposta, respondida = item
+            try:
+                resposta["sim"] = messagebox.askyesno(titulo, mensagem)
+            finally:
+                respondida.set()
+
+    def _inserir(self, linhas):
+        self.text.config(state="normal")
+        # Agrupa linhas consecutivas do mesmo tipo em uma única inserção
+        bloco, tipo_bloco = [], None
+        for mensagem, log_type in linhas + [(None, None)]:
+            if log_type != tipo_bloco and bloco:
+                self.text.insert("end", "".join(bloco), tipo_bloco)
+                bloco = []
+            if mensagem is not None:
+                bloco.append(mensagem + "\n")
+                tipo_bloco = log_type
+        excedente = int(self.text.index("end-1c").split(".")[0]) - 1 - self.max_linhas
+        if excedente > 0:
+            self.text.delete("1.0", f"{excedente + 1}.0")
+        self.text.config(state="disabled")
+        self.text.see("end")
+
+    def _atualizar_progresso(self, atual, total):
+        agora = time.monotonic()
+        if total is None:
+            # Total desconhecido (arquivos ainda sendo encontrados): mostra só a contagem e a taxa
+            if self._inicio is None or self._ultimo[1] is not None or atual < self._ultimo[0]:
+                self._inicio, self._base = agora, atual
+            self._ultimo = (atual, total)
+            self.barra.configure(maximum=1, value=0)
+            decorrido = agora - self._inicio
+            texto = f"{atual}"
+            if atual > self._base and decorrido > 0:
+                texto += f"  •  {(atual - self._base) / decorrido:.1f} imagens/s"
+            self.rotulo.configure(text=texto)
+            return
+        if self._inicio is None or total != self._ultimo[1] or atual < self._ultimo[0]:
+            self._inicio, self._base = agora, atual
+        self._ultimo = (atual, total)
+        self.barra.configure(maximum=max(total, 1), value=atual)
+        decorrido = agora - self._inicio
+        feitos = atual - self._base
+        texto = f"{atual}/{total}"
+        if feitos > 0 and decorrido > 0:
+            taxa = feitos / decorrido
+            texto += f"  •  {taxa:.1f} imagens/s"
+            if atual < total:
+                texto += f"  •  restante ~{formatar_duracao((total - atual) / taxa)}"
+        if atual >= total:
+            texto += "  •  concluído"
+        self.rotulo.configure(text=texto)
+
+def formatar_duracao(segundos):
+    """Formata uma duração em segundos como "1h02m", "3m05s" ou "12s"."""
+    segundos = int(round(segundos))
+    horas, resto = divmod(segundos, 3600)
+    minutos, segundos = divmod(resto, 60)
+    if horas:
+        return f"{horas}h{minutos:02d}m"
+    if minutos:
+        return f"{minutos}m{segundos:02d}s"
+    return f"{segundos}s"
+
 def criar_status_box(frame_main):
-    """Cria a caixa de status/logs."""
-    status_text = ttk.Text(frame_main, height=15, wrap="word",
-                           state="disabled", background="#222", foreground="white")
-    status_text.pack(fill=BOTH, expand=True, padx=10, pady=10)
-    return status_text
+    """Cria a caixa de status/logs com a barra de progresso."""
+    return StatusBox(frame_main)
 
 def criar_botoes(frame_menu, callbacks):
     """
@@ -82,6 +295,14 @@ def criar_botoes(frame_menu, callbacks):
         width=30,
     ).pack(pady=8)
 
+    ttk.Button(
+        frame_top,
+        text="$ Atualizar Preços do Catálogo",
+        command=callbacks["atualizar_precos"],
+        bootstyle="primary-outline",
+        width=30,
+    ).pack(pady=8)
+
     ttk.Button(
         frame_top,
         text="⧉ Abrir Planilha",
@@ -98,6 +319,14 @@ def criar_botoes(frame_menu, callbacks):
         width=30
     ).pack(pady=8)
 
+    ttk.Button(
+        frame_top,
+        text="🗜 Gerar Versão Web do PDF",
+        command=callbacks["otimizar_pdf"],
+        bootstyle="warning-outline",
+        width=30
+    ).pack(pady=8)
+
     ttk.Button(
         frame_top,
         text="✎ Gerenciar Modelos",
@@ -4,10 +4,18 @@ import threading
 import platform
 import subprocess
 import pprint
-import glob
+import tracing
+from contextlib import contextmanager
 import ttkbootstrap as ttk
 from tkinter import filedialog, messagebox, Toplevel, Listbox, Scrollbar, simpledialog
-from catalogo import carregar_planilha, gerar_catalogo, gerar_catalogo_personalizado
+from catalogo import (carregar_planilha, gerar_catalogo, gerar_catalogo_personalizado, atualizar_precos_catalogo,
+                      load_catalog_groups, CatalogoError)
+from price_index import PriceIndex
+from mask_compositor import compor_fotos, fotos_pendentes
+from job_control import Operacao, OperacaoCancelada
+from pdf_optimizer import resumo_otimizacao
+from api import otimizar, caminho_versao_web
+from job_server import ClienteFila, FilaIndisponivel, endereco_configurado
 from gui_components import criar_janela, criar_layout, criar_status_box, criar_botoes
 from utils import get_base_path
 
@@ -28,54 +36,141 @@ excel_file = os.path.join(user_docs, "data", "Planilha_Catalogo_2025.ods")
 output_dir = os.path.join(os.path.expanduser("~"), "Desktop", "Catálogos")
 os.makedirs(output_dir, exist_ok=True)
 
-# Carrega a planilha
-df, codigo_coluna, preco_colunas = carregar_planilha(excel_file)
+# Planilha carregada em segundo plano (ver carregar_planilha_em_segundo_plano)
+df, codigo_coluna, preco_colunas = None, None, None
+# Índice de preços construído uma única vez e compartilhado pelos geradores
+price_index = None
+planilha_pronta = threading.Event()
 
-def load_catalog_groups():
+# Carrega os modelos persistentes (ou os padrões, se não existir o arquivo persistente)
+GRUPOS_PRINCIPAL, GRUPOS_SECUNDARIO = load_catalog_groups()
+
+def atualizar_status(status_text, mensagem, log_type="default"):
     """
-    Tenta carregar o arquivo persistente de modelos em Documents.
-    Se existir, retorna os valores carregados; caso contrário,
-    retorna os valores padrão do módulo catalog_groups em src.
+    Envia uma mensagem para a área de status/logs na interface gráfica.
+    Pode ser chamada de qualquer thread: a StatusBox insere as mensagens pelo loop do Tk.
+    """
+    if status_text:
+        status_text.publicar(mensagem, log_type)
+
+def carregar_planilha_em_segundo_plano(status_text):
     """
-    persistent_path = os.path.join(user_docs, "catalog_groups.py")
-    if os.path.exists(persistent_path):
+    Carrega a planilha e monta o índice de preços em uma thread, para que a
+    janela apareça imediatamente. planilha_pronta é sinalizado ao terminar.
+    """
+    def carregar():
+        global df, codigo_coluna, preco_colunas, price_index
+        atualizar_status(status_text, "📊 Carregando planilha...", "informacao")
         try:
-            import importlib.util
-            spec = importlib.util.spec_from_file_location("catalog_groups", persistent_path)
-            cg_module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(cg_module)
-            return cg_module.GRUPOS_PRINCIPAL, cg_module.GRUPOS_SECUNDARIO
-        except Exception as e:
-            print("Erro ao carregar catalog_groups do Documents:", e)
+            df_carregado, codigo, precos = carregar_planilha(excel_file)
+            price_index = PriceIndex(df_carregado, codigo, precos)
+            df, codigo_coluna, preco_colunas = df_carregado, codigo, precos
+            atualizar_status(status_text, f"✅ Planilha carregada ({len(price_index)} códigos).", "sucesso")
+        except CatalogoError as e:
+            status_text.avisar("Erro", str(e), "erro")
+            atualizar_status(status_text, "⚠ Não foi possível carregar a planilha.", "erro")
+        finally:
+            planilha_pronta.set()
+    planilha_pronta.clear()
+    threading.Thread(target=carregar, daemon=True).start()
+
+def aguardar_planilha(status_text):
+    """Aguarda o carregamento da planilha; retorna False se ela não pôde ser carregada."""
+    if not planilha_pronta.is_set():
+        atualizar_status(status_text, "⏳ Aguardando o carregamento da planilha...", "informacao")
+        planilha_pronta.wait()
+    if df is None:
+        atualizar_status(status_text, "⚠ Planilha indisponível: geração cancelada.", "erro")
+        return False
+    return True
+
+def progresso_status(status_text):
+    """
+    Cria o callback de progresso dos geradores, que escreve na caixa de status.
+    Alertas e erros também são exibidos em uma janela de aviso.
+    """
+    def progresso(mensagem, log_type="default", atual=None, total=None):
+        atualizar_status(status_text, mensagem, log_type)
+        if status_text and atual is not None and total:
+            status_text.progresso(atual, total)
+        if status_text and log_type in ("alerta", "erro"):
+            status_text.avisar("Aviso" if log_type == "alerta" else "Erro", mensagem, log_type)
+    return progresso
+
+def exportar_medicoes(status_text):
+    """Com a medição ativa (CATALOGO_TRACE), grava o trace da operação que acabou de terminar."""
+    if tracing.ativo():
+        tracing.exportar(limpar=True)
+        atualizar_status(status_text, f"⏱ Medições gravadas em {tracing.caminho_trace()}", "informacao")
+
+@contextmanager
+def operacao_na_interface(status_text, nome):
+    """
+    Cria a Operacao de uma tarefa em segundo plano, controlada pelos botões
+    Pausar/Cancelar da caixa de status enquanto o bloco estiver em execução.
+    """
+    operacao = Operacao(nome)
+    if status_text:
+        status_text.acompanhar(operacao)
     try:
-        from catalog_groups import GRUPOS_PRINCIPAL as default_principal, GRUPOS_SECUNDARIO as default_secundario
-    except ImportError:
-        default_principal, default_secundario = {}, {}
-    return default_principal, default_secundario
+        yield operacao
+    finally:
+        if status_text:
+            status_text.liberar(operacao)
 
-# Carrega os modelos persistentes (ou os padrões, se não existir o arquivo persistente)
-GRUPOS_PRINCIPAL, GRUPOS_SECUNDARIO = load_catalog_groups()
+def executar_na_fila(status_text, tipo, parametros, descricao):
+    """
+    Com a fila configurada (CATALOGO_FILA), envia o trabalho ao servidor e acompanha
+    o andamento na caixa de status; Pausar/Cancelar controlam o trabalho no servidor.
+    Retorna o estado final do trabalho, ou None se não houver fila ou ela estiver
+    indisponível (a operação então é executada neste computador).
+    """
+    endereco = endereco_configurado()
+    if not endereco:
+        return None
+    cliente = ClienteFila(endereco)
+    try:
+        trabalho = cliente.enviar(tipo, parametros)
+    except FilaIndisponivel as e:
+        atualizar_status(status_text, f"⚠ {e}. Executando neste computador.", "alerta")
+        return None
+    if trabalho["duplicado"]:
+        atualizar_status(status_text, f"♻ {descricao}: um trabalho idêntico já estava na fila.", "informacao")
+    else:
+        atualizar_status(status_text, f"📨 {descricao} enviado para a fila ({endereco}).", "informacao")
+    with operacao_na_interface(status_text, tipo) as operacao:
+        try:
+            return cliente.acompanhar(trabalho["id"], progresso_status(status_text), operacao)
+        except FilaIndisponivel as e:
+            atualizar_status(status_text, f"⚠ Conexão com a fila perdida: {e}", "erro")
+            return {"estado": "falhou", "erro": str(e), "resultado": None}
 
-def atualizar_status(status_text, mensagem, log_type="default"):
-    """Atualiza a área de status/logs na interface gráfica com cores definidas."""
-    if status_text:
-        if "processamento" not in status_text.tag_names():
-            status_text.tag_config("processamento", foreground="#F5F5F5")
-        if "sucesso" not in status_text.tag_names():
-            status_text.tag_config("sucesso", foreground="#58D68D")
-        if "erro" not in status_text.tag_names():
-            status_text.tag_config("erro", foreground="#E74C3C")
-        if "informacao" not in status_text.tag_names():
-            status_text.tag_config("informacao", foreground="#3498DB")
-        if "alerta" not in status_text.tag_names():
-            status_text.tag_config("alerta", foreground="#F1C40F")
-        if "default" not in status_text.tag_names():
-            status_text.tag_config("default", foreground="#FFFFFF")
-        
-        status_text.config(state="normal")
-        status_text.insert("end", mensagem + "\n", log_type)
-        status_text.config(state="disabled")
-        status_text.see("end")
+def gerar_na_fila(status_text, catalogo, output_path, ordem_grupos, grupos_dict):
+    """
+    Envia a geração do catálogo ("principal" ou "secundario") para a fila, se configurada.
+    Retorna o resultado (True/False), ou None para gerar neste computador.
+    """
+    if not endereco_configurado():
+        return None
+    if os.path.exists(output_path) and not confirmar_sobrescrita_status(status_text)(output_path):
+        return False
+    trabalho = executar_na_fila(status_text, "gerar", {
+        "saida": output_path,
+        "catalogo": catalogo,
+        "planilha": excel_file,
+        "pasta_imagens": image_folders[f"catalogo_{catalogo}"],
+        "grupos_ordenados": ordem_grupos,
+        "grupos_dict": grupos_dict,
+    }, f"Catálogo {catalogo}")
+    if trabalho is None:
+        return None
+    return trabalho["estado"] == "concluido"
+
+def confirmar_sobrescrita_status(status_text):
+    """Cria o callback que pergunta ao usuário se o arquivo existente pode ser sobrescrito."""
+    def confirmar_sobrescrita(output_file):
+        return status_text.perguntar("Arquivo existente", f"O arquivo {output_file} já existe. Deseja sobrescrevê-lo?")
+    return confirmar_sobrescrita
 
 def escolher_caminho_padrao(nome_padrao):
     """Cria uma janela para escolher onde salvar o arquivo, com o caminho padrão em output_dir."""
@@ -341,9 +436,9 @@ def gerenciar_modelos(status_text):
 def converter_fotos_interativo(status_text):
     """
     Permite selecionar interativamente uma imagem base (máscara) e um diretório com imagens a serem editadas.
-    As imagens resultantes serão salvas em um subdiretório "saida" dentro do diretório selecionado.
+    As imagens resultantes serão salvas em um subdiretório "saida" dentro do diretório selecionado,
+    mantendo as subpastas. Aceita .jpg, .jpeg e .png; fotos já processadas e não alteradas são puladas.
     """
-    from PIL import Image
     # Seleciona a máscara
     caminho_mascara = filedialog.askopenfilename(
         title="Selecione a imagem de máscara",
@@ -364,39 +459,54 @@ def converter_fotos_interativo(status_text):
     if not os.path.exists(pasta_saida):
         os.makedirs(pasta_saida)
 
+    trabalho = executar_na_fila(status_text, "mascara",
+                                {"mascara": caminho_mascara, "pasta": pasta_imagens, "pasta_saida": pasta_saida},
+                                "Máscara nas fotos")
+    if trabalho is not None:
+        if trabalho["estado"] == "concluido":
+            r = trabalho["resultado"]
+            atualizar_status(status_text, f"Processamento concluído: {r['processadas']} processada(s), "
+                                          f"{r['ignoradas']} sem alterações, {r['erros']} erro(s).",
+                             "alerta" if r["erros"] else "sucesso")
+        elif trabalho["estado"] == "cancelado":
+            atualizar_status(status_text, "⏹ Processamento cancelado.", "informacao")
+        else:
+            atualizar_status(status_text, f"Erro no processamento: {trabalho['erro']}", "erro")
+        return
+
     atualizar_status(status_text, f"Iniciando processamento de imagens na pasta: {pasta_imagens}", "informacao")
 
     try:
-        # Abre a máscara original (em RGBA)
-        mascara_original = Image.open(caminho_mascara).convert("RGBA")
-
-        # Obtém os arquivos com extensões .JPG e .jpg
-        arquivos = []
-        for ext in ("*.JPG", "*.jpg"):
-            arquivos.extend(glob.glob(os.path.join(pasta_imagens, ext)))
-        if not arquivos:
+        # As fotos (inclusive nas subpastas) vão para os workers à medida que são encontradas;
+        # fotos cuja saída já é mais nova que a origem e usou a mesma máscara são puladas
+        ignoradas = 0
+        def ao_ignorar(_):
+            nonlocal ignoradas
+            ignoradas += 1
+        tarefas = fotos_pendentes(pasta_imagens, pasta_saida, caminho_mascara, ao_ignorar=ao_ignorar)
+        processadas = 0
+        erros = 0
+        with operacao_na_interface(status_text, "mascara") as operacao:
+            fotos = compor_fotos(caminho_mascara, tarefas, operacao=operacao)
+            for processadas, (caminho_imagem, erro) in enumerate(fotos, start=1):
+                nome_arquivo = os.path.relpath(caminho_imagem, pasta_imagens)
+                if erro:
+                    erros += 1
+                    atualizar_status(status_text, f"Erro em {nome_arquivo}: {erro}", "erro")
+                else:
+                    atualizar_status(status_text, f"Processado: {nome_arquivo} ({processadas})", "informacao")
+                status_text.progresso(processadas, None)
+        if processadas == 0 and ignoradas == 0:
             atualizar_status(status_text, "Nenhuma imagem encontrada no diretório selecionado.", "alerta")
             return
-
-        total = len(arquivos)
-        contador = 0
-        for caminho_imagem in arquivos:
-            imagem = Image.open(caminho_imagem).convert("RGBA")
-            if imagem.size != mascara_original.size:
-                try:
-                    mascara = mascara_original.resize(imagem.size, Image.Resampling.LANCZOS)
-                except AttributeError:
-                    mascara = mascara_original.resize(imagem.size, Image.ANTIALIAS)
-            else:
-                mascara = mascara_original
-            imagem_resultante = Image.alpha_composite(imagem, mascara)
-            imagem_resultante = imagem_resultante.convert("RGB")
-            nome_arquivo = os.path.basename(caminho_imagem)
-            caminho_saida_final = os.path.join(pasta_saida, nome_arquivo)
-            imagem_resultante.save(caminho_saida_final, "JPEG")
-            contador += 1
-            atualizar_status(status_text, f"Processado: {nome_arquivo} ({contador}/{total})", "informacao")
-        atualizar_status(status_text, "Processamento concluído.", "sucesso")
+        resumo = f"{processadas} processada(s), {ignoradas} sem alterações"
+        if erros:
+            atualizar_status(status_text, f"Processamento concluído com {erros} erro(s): {resumo}.", "alerta")
+        else:
+            atualizar_status(status_text, f"Processamento concluído: {resumo}.", "sucesso")
+    except OperacaoCancelada:
+        atualizar_status(status_text, f"⏹ Processamento cancelado após {processadas} foto(s); "
+                                      "as fotos restantes serão processadas na próxima execução.", "informacao")
     except Exception as e:
         atualizar_status(status_text, f"Erro no processamento: {e}", "erro")
 
@@ -408,18 +518,28 @@ def gerar_principal_interativo(status_text):
     atualizar_status(status_text, f"📁 Caminho para salvar definido: {output_path}", "informacao")
     def ao_confirmar(ordem_grupos):
         def processar():
-            from catalogo import gerar_catalogo_personalizado
-            result = gerar_catalogo_personalizado(
-                "catalogo_principal",
-                image_folders["catalogo_principal"],
-                output_path,
-                df, codigo_coluna, preco_colunas,
-                grupos_ordenados=ordem_grupos,
-                grupos_dict=GRUPOS_PRINCIPAL,
-                position="left",
-                style="principal",   # Especifica o estilo para catálogo principal (dourado)
-                status_text=status_text
-            )
+            result = gerar_na_fila(status_text, "principal", output_path, ordem_grupos, GRUPOS_PRINCIPAL)
+            if result is None:
+                from catalogo import gerar_catalogo_personalizado
+                if not aguardar_planilha(status_text):
+                    return
+                with operacao_na_interface(status_text, "gerar") as operacao:
+                    result = gerar_catalogo_personalizado(
+                        "catalogo_principal",
+                        image_folders["catalogo_principal"],
+                        output_path,
+                        df, codigo_coluna, preco_colunas,
+                        grupos_ordenados=ordem_grupos,
+                        grupos_dict=GRUPOS_PRINCIPAL,
+                        position="left",
+                        style="principal",   # Especifica o estilo para catálogo principal (dourado)
+                        progresso=progresso_status(status_text),
+                        price_index=price_index,
+                        confirmar_sobrescrita=confirmar_sobrescrita_status(status_text),
+                        streaming=True,
+                        operacao=operacao
+                    )
+                exportar_medicoes(status_text)
             if result:
                 atualizar_status(status_text, "✅ Catálogo Principal gerado com sucesso!", "sucesso")
             else:
@@ -435,18 +555,28 @@ def gerar_secundario_interativo(status_text):
     atualizar_status(status_text, f"📁 Caminho para salvar definido: {output_path}", "informacao")
     def ao_confirmar(ordem_grupos):
         def processar():
-            from catalogo import gerar_catalogo_personalizado
-            result = gerar_catalogo_personalizado(
-                "catalogo_secundario",
-                image_folders["catalogo_secundario"],
-                output_path,
-                df, codigo_coluna, preco_colunas,
-                grupos_ordenados=ordem_grupos,
-                grupos_dict=GRUPOS_SECUNDARIO,
-                position="right",
-                style="secundario",   # Especifica o estilo para catálogo secundário (vermelho esperado)
-                status_text=status_text
-            )
+            result = gerar_na_fila(status_text, "secundario", output_path, ordem_grupos, GRUPOS_SECUNDARIO)
+            if result is None:
+                from catalogo import gerar_catalogo_personalizado
+                if not aguardar_planilha(status_text):
+                    return
+                with operacao_na_interface(status_text, "gerar") as operacao:
+                    result = gerar_catalogo_personalizado(
+                        "catalogo_secundario",
+                        image_folders["catalogo_secundario"],
+                        output_path,
+                        df, codigo_coluna, preco_colunas,
+                        grupos_ordenados=ordem_grupos,
+                        grupos_dict=GRUPOS_SECUNDARIO,
+                        position="right",
+                        style="secundario",   # Especifica o estilo para catálogo secundário (vermelho esperado)
+                        progresso=progresso_status(status_text),
+                        price_index=price_index,
+                        confirmar_sobrescrita=confirmar_sobrescrita_status(status_text),
+                        streaming=True,
+                        operacao=operacao
+                    )
+                exportar_medicoes(status_text)
             if result:
                 atualizar_status(status_text, "✅ Catálogo Secundário gerado com sucesso!", "sucesso")
             else:
@@ -454,6 +584,65 @@ def gerar_secundario_interativo(status_text):
         threading.Thread(target=processar, daemon=True).start()
     abrir_janela_de_ordenacao(GRUPOS_SECUNDARIO, ao_confirmar)
 
+def atualizar_precos_interativo(status_text):
+    """
+    Atualiza apenas os preços de um catálogo já gerado, a partir da planilha atual,
+    sem reprocessar as imagens.
+    """
+    caminho_pdf = filedialog.askopenfilename(
+        title="Selecione o catálogo a atualizar",
+        initialdir=output_dir,
+        filetypes=[("PDF Files", "*.pdf")]
+    )
+    if not caminho_pdf:
+        atualizar_status(status_text, "Operação cancelada: catálogo não selecionado.", "alerta")
+        return
+    atualizar_status(status_text, f"💲 Atualizando preços de: {caminho_pdf}", "processamento")
+    def processar():
+        if not aguardar_planilha(status_text):
+            return
+        result = atualizar_precos_catalogo(
+            caminho_pdf,
+            df, codigo_coluna, preco_colunas,
+            price_index=price_index,
+            progresso=progresso_status(status_text)
+        )
+        exportar_medicoes(status_text)
+        if result:
+            atualizar_status(status_text, "✅ Preços do catálogo atualizados com sucesso!", "sucesso")
+        else:
+            atualizar_status(status_text, "Operação cancelada.", "alerta")
+    threading.Thread(target=processar, daemon=True).start()
+
+def otimizar_pdf_interativo(status_text):
+    """
+    Gera a versão "web" (menor) de um catálogo para envio por e-mail/WhatsApp:
+    remove imagens duplicadas e recomprime as imagens até o tamanho escolhido.
+    """
+    caminho_pdf = filedialog.askopenfilename(
+        title="Selecione o PDF a otimizar",
+        initialdir=output_dir,
+        filetypes=[("PDF Files", "*.pdf")]
+    )
+    if not caminho_pdf:
+        atualizar_status(status_text, "Operação cancelada: PDF não selecionado.", "alerta")
+        return
+    alvo_mb = simpledialog.askfloat(
+        "Versão web",
+        "Tamanho máximo desejado (MB):\n(deixe em branco para apenas remover imagens duplicadas)",
+        minvalue=0.1
+    )
+    saida = caminho_versao_web(caminho_pdf)
+    atualizar_status(status_text, f"🗜 Otimizando: {caminho_pdf}", "processamento")
+    def processar():
+        try:
+            relatorio = otimizar(caminho_pdf, saida=saida, alvo_mb=alvo_mb, progresso=progresso_status(status_text))
+        except Exception as e:
+            atualizar_status(status_text, f"Erro ao otimizar o PDF: {e}", "erro")
+            return
+        atualizar_status(status_text, f"✅ Versão web salva em {saida}: {resumo_otimizacao(relatorio)}", "sucesso")
+    threading.Thread(target=processar, daemon=True).start()
+
 def abrir_planilha(status_text):
     """Abre a planilha no programa padrão do sistema."""
     if os.path.exists(excel_file):
@@ -491,12 +680,15 @@ def iniciar_interface():
     callbacks = {
         "principal": lambda: gerar_principal_interativo(status_text),
         "secundario": lambda: gerar_secundario_interativo(status_text),
+        "atualizar_precos": lambda: atualizar_precos_interativo(status_text),
         "abrir_planilha": lambda: abrir_planilha(status_text),
         "reorganizar_pdf": lambda: abrir_reorganizador_pdf(status_text),
+        "otimizar_pdf": lambda: otimizar_pdf_interativo(status_text),
         "gerenciar_modelos": lambda: gerenciar_modelos(status_text),
         "converter_fotos": lambda: threading.Thread(target=converter_fotos_interativo, args=(status_text,), daemon=True).start()
     }
     criar_botoes(frame_menu, callbacks)
+    carregar_planilha_em_segundo_plano(status_text)
     root.mainloop()
 
 if __name__ == "__main__":
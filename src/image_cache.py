@@ -0,0 +1,116 @@
+# src/image_cache.py
+import os
+import tempfile
+import struct
+import hashlib
+
+# Cabeçalho de cada entrada: largura e altura da imagem (uint32 little-endian)
+_CABECALHO = struct.Struct("<II")
+
+class ImageCache:
+    """
+    Cache em disco das imagens de página já preparadas (JPEG final).
+
+    A chave combina o caminho do arquivo, tamanho, data de modificação e os
+    parâmetros de preparo (max_size, quality); uma foto alterada gera uma nova
+    chave e a entrada antiga acaba removida pela poda. O tamanho total é
+    limitado por limite_bytes, removendo primeiro as entradas usadas há mais tempo (LRU).
+    """
+    def __init__(self, pasta, limite_bytes=512 * 1024 * 1024):
+        self.pasta = pasta
+        self.limite_bytes = limite_bytes
+        self.acertos = 0
+        self.faltas = 0
+        os.makedirs(self.pasta, exist_ok=True)
+
+    def chave(self, image_path, max_size=(1024, 1024), quality=85, stat=None):
+        """Calcula a chave da imagem; retorna None se o arquivo não puder ser lido."""
+        image_path = os.path.abspath(os.path.normpath(image_path))
+        try:
+            if stat is None:
+                stat = os.stat(image_path)
+        except OSError:
+            return None
+        texto = f"{os.path.normcase(image_path)}|{stat.st_size}|{stat.st_mtime_ns}|{tuple(max_size)}|{quality}"
+        return hashlib.sha1(texto.encode("utf-8")).hexdigest()
+
+    def _caminho(self, chave):
+        return os.path.join(self.pasta, chave[:2], chave + ".bin")
+
+    def obter(self, chave):
+        """Retorna (largura, altura, bytes_jpeg) ou None se a entrada não existir."""
+        if chave is None:
+            return None
+        caminho = self._caminho(chave)
+        try:
+            with open(caminho, "rb") as f:
+                dados = f.read()
+        except OSError:
+            self.faltas += 1
+            return None
+        if len(dados) <= _CABECALHO.size:
+            self.faltas += 1
+            return None
+        width, height = _CABECALHO.unpack_from(dados)
+        try:
+            # Atualiza a data de modificação, usada como "último uso" na poda LRU
+            os.utime(caminho, None)
+        except OSError:
+            pass
+        self.acertos += 1
+        return width, height, dados[_CABECALHO.size:]
+
+    def gravar(self, chave, resultado):
+        """Grava uma imagem preparada (largura, altura, bytes_jpeg) no cache."""
+        if chave is None:
+            return
+        width, height, jpeg_bytes = resultado
+        caminho = self._caminho(chave)
+        temporario = None
+        try:
+            os.makedirs(os.path.dirname(caminho), exist_ok=True)
+            # Temporário único por gravação: processos e threads (ex.: trabalhos
+            # simultâneos do servidor da fila) podem gravar a mesma chave juntos
+            fd, temporario = tempfile.mkstemp(prefix=os.path.basename(caminho) + ".", suffix=".tmp",
+                                              dir=os.path.dirname(caminho))
+            with os.fdopen(fd, "wb") as f:
+                f.write(_CABECALHO.pack(width, height))
+                f.write(jpeg_bytes)
+            os.replace(temporario, caminho)
+        except OSError as e:
+            print("Erro ao gravar imagem no cache:", e)
+            if temporario is not None:
+                try:
+                    os.remove(temporario)
+                except OSError:
+                    pass
+
+    def podar(self):
+        """Remove as entradas menos usadas até o cache ficar abaixo do limite. Retorna os bytes liberados."""
+        entradas = []
+        total = 0
+        for raiz, _, arquivos in os.walk(self.pasta):
+            for nome in arquivos:
+                if not nome.endswith(".bin"):
+                    continue
+                caminho = os.path.join(raiz, nome)
+                try:
+                    st = os.stat(caminho)
+                except OSError:
+                    continue
+                entradas.append((st.st_mtime_ns, st.st_size, caminho))
+                total += st.st_size
+        liberados = 0
+        if total <= self.limite_bytes:
+            return liberados
+        entradas.sort()
+        for _, tamanho, caminho in entradas:
+            if total <= self.limite_bytes:
+                break
+            try:
+                os.remove(caminho)
+            except OSError:
+                continue
+            total -= tamanho
+            liberados += tamanho
+        return liberados
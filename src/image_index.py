@@ -0,0 +1,115 @@
+# src/image_index.py
+import os
+from collections import namedtuple
+
+# Extensões aceitas como imagens de produto
+EXTENSOES_IMAGEM = (".jpg", ".png")
+
+# Imagem encontrada na pasta, com o stat obtido durante a varredura
+ImagemIndexada = namedtuple("ImagemIndexada", ["nome", "caminho", "stat"])
+
+def indexar_imagens(image_folder, extensoes=EXTENSOES_IMAGEM):
+    """
+    Varre a pasta uma única vez (os.scandir) e retorna as imagens ordenadas por nome,
+    já com o stat de cada arquivo (tamanho e data de modificação).
+    """
+    image_folder = os.path.normpath(image_folder)
+    imagens = []
+    with os.scandir(image_folder) as entradas:
+        for entrada in entradas:
+            if not entrada.name.lower().endswith(extensoes):
+                continue
+            try:
+                if not entrada.is_file():
+                    continue
+                stat = entrada.stat()
+            except OSError:
+                continue
+            imagens.append(ImagemIndexada(entrada.name, os.path.normpath(entrada.path), stat))
+    imagens.sort(key=lambda imagem: imagem.nome)
+    return imagens
+
+def percorrer_imagens(pasta, extensoes=EXTENSOES_IMAGEM, recursivo=True, ignorar=()):
+    """
+    Percorre a pasta (e as subpastas, se recursivo) com os.scandir, gerando cada
+    imagem assim que é encontrada, sem montar a lista completa antes.
+    As extensões não diferenciam maiúsculas de minúsculas. O nome de cada
+    ImagemIndexada é o caminho relativo à pasta; as pastas em ignorar (ex.: a
+    pasta de saída dentro da pasta de entrada) não são visitadas.
+    Dentro de cada pasta, os arquivos saem em ordem de nome, antes das subpastas.
+    """
+    pasta = os.path.normpath(pasta)
+    ignorar = {os.path.normcase(os.path.abspath(p)) for p in ignorar}
+    pendentes = [(pasta, "")]
+    while pendentes:
+        atual, relativo = pendentes.pop()
+        try:
+            with os.scandir(atual) as iterador:
+                entradas = sorted(iterador, key=lambda entrada: entrada.name)
+        except OSError:
+            continue
+        subpastas = []
+        for entrada in entradas:
+            try:
+                if entrada.is_dir(follow_symlinks=False):
+                    if recursivo and os.path.normcase(os.path.abspath(entrada.path)) not in ignorar:
+                        subpastas.append((entrada.path, os.path.join(relativo, entrada.name)))
+                    continue
+                if not entrada.name.lower().endswith(extensoes) or not entrada.is_file():
+                    continue
+                stat = entrada.stat()
+            except OSError:
+                continue
+            yield ImagemIndexada(os.path.join(relativo, entrada.name), os.path.normpath(entrada.path), stat)
+        pendentes.extend(reversed(subpastas))
+
+class PrefixTrie:
+    """
+    Árvore de prefixos: associa valores a prefixos e, para um texto, devolve os
+    valores de todos os prefixos que o iniciam, percorrendo o texto uma única vez.
+    """
+    def __init__(self):
+        self._raiz = {}
+        self._valores_raiz = []
+
+    def adicionar(self, prefixo, valor):
+        if not prefixo:
+            self._valores_raiz.append(valor)
+            return
+        no = self._raiz
+        for caractere in prefixo:
+            no = no.setdefault(caractere, {})
+        no.setdefault(None, []).append(valor)
+
+    def correspondencias(self, texto):
+        """Retorna os valores dos prefixos de texto, do mais curto para o mais longo."""
+        encontrados = list(self._valores_raiz)
+        no = self._raiz
+        for caractere in texto:
+            no = no.get(caractere)
+            if no is None:
+                break
+            encontrados.extend(no.get(None, ()))
+        return encontrados
+
+def agrupar_imagens(imagens, grupos_ordenados, grupos_dict):
+    """
+    Distribui as imagens entre os grupos em uma única passada, usando uma
+    PrefixTrie com os prefixos de cada grupo. Uma imagem entra em todos os grupos
+    cujos prefixos ela satisfaz. Retorna {grupo: [ImagemIndexada, ...]} na ordem das imagens.
+    """
+    trie = PrefixTrie()
+    por_grupo = {}
+    for grupo in grupos_ordenados:
+        if grupo in por_grupo:
+            continue
+        por_grupo[grupo] = []
+        for prefixo in grupos_dict.get(grupo, []):
+            trie.adicionar(prefixo, grupo)
+    for imagem in imagens:
+        vistos = set()
+        for grupo in trie.correspondencias(imagem.nome):
+            if grupo not in vistos:
+                vistos.add(grupo)
+                por_grupo[grupo].append(imagem)
+    return por_grupo
@@ -0,0 +1,103 @@
+# src/image_pipeline.py
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pdf_utils import preparar_imagem_perfis
+from tracing import etapa
+
+def numero_de_workers(workers=None):
+    """Retorna a quantidade de processos a usar (padrão: número de núcleos)."""
+    if workers is None:
+        workers = os.cpu_count() or 1
+    return max(1, int(workers))
+
+def preparar_imagens(image_paths, max_size=(1024, 1024), quality=85, workers=None, max_em_andamento=None, cache=None,
+                     stats=None):
+    """
+    Prepara as imagens das páginas em um pool de processos, entregando os
+    resultados na mesma ordem de image_paths.
+
+    Gera tuplas (image_path, (largura, altura, bytes_jpeg)). No máximo
+    max_em_andamento imagens ficam em processamento/espera ao mesmo tempo
+    (padrão: 2 por worker), de modo que a memória não cresce com o total de imagens.
+    Com workers == 1 tudo é feito no processo atual.
+    Se um ImageCache for informado, imagens já preparadas em execuções
+    anteriores são lidas do disco e as novas são gravadas nele; stats pode trazer
+    {caminho: os.stat_result} já obtidos na varredura da pasta, evitando novo stat.
+    """
+    for image_path, variantes in preparar_imagens_perfis(image_paths, [(max_size, quality)], workers=workers,
+                                                         max_em_andamento=max_em_andamento, cache=cache, stats=stats):
+        yield image_path, variantes[0]
+
+def preparar_imagens_perfis(image_paths, perfis, referencia=None, workers=None, max_em_andamento=None, cache=None,
+                            stats=None):
+    """
+    Como preparar_imagens, mas para vários perfis [(max_size, quality), ...] de
+    uma vez: cada imagem é decodificada uma única vez e gera uma versão por perfil
+    (ver preparar_imagem_perfis). Gera (image_path, [(largura, altura, bytes_jpeg), ...]).
+    O cache é consultado por perfil; a imagem só é aberta se faltar algum deles.
+    """
+    workers = numero_de_workers(workers)
+    perfis = [(tuple(max_size), quality) for max_size, quality in perfis]
+
+    def consultar_cache(image_path):
+        """Retorna (chaves, variantes do cache, índices dos perfis que faltam)."""
+        if cache is None:
+            return None, [None] * len(perfis), list(range(len(perfis)))
+        stat = stats.get(image_path) if stats else None
+        chaves = [cache.chave(image_path, max_size, quality, stat=stat) for max_size, quality in perfis]
+        variantes = [cache.obter(chave) for chave in chaves]
+        return chaves, variantes, [n for n, variante in enumerate(variantes) if variante is None]
+
+    def completar(chaves, variantes, faltantes, preparadas):
+        for n, resultado in zip(faltantes, preparadas):
+            variantes[n] = resultado
+            if cache is not None:
+                cache.gravar(chaves[n], resultado)
+        return variantes
+
+    if workers == 1:
+        for image_path in image_paths:
+            chaves, variantes, faltantes = consultar_cache(image_path)
+            if faltantes:
+                preparadas = preparar_imagem_perfis(image_path, [perfis[n] for n in faltantes], referencia)
+                completar(chaves, variantes, faltantes, preparadas)
+            yield image_path, variantes
+        return
+
+    if max_em_andamento is None:
+        max_em_andamento = workers * 2
+    max_em_andamento = max(1, max_em_andamento)
+
+    caminhos = iter(image_paths)
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        # Cada item é (caminho, chaves, variantes, perfis que faltam, futuro ou None)
+        pendentes = deque()
+
+        def enviar_proximo():
+            image_path = next(caminhos, None)
+            if image_path is None:
+                return False
+            chaves, variantes, faltantes = consultar_cache(image_path)
+            futuro = None
+            if faltantes:
+                futuro = executor.submit(preparar_imagem_perfis, image_path,
+                                         [perfis[n] for n in faltantes], referencia)
+            pendentes.append((image_path, chaves, variantes, faltantes, futuro))
+            return True
+
+        while len(pendentes) < max_em_andamento and enviar_proximo():
+            pass
+        while pendentes:
+            image_path, chaves, variantes, faltantes, futuro = pendentes.popleft()
+            if futuro is not None:
+                # Com workers, o tempo visível no processo principal é a espera pelo resultado
+                with etapa("imagem.aguardar"):
+                    preparadas = futuro.result()
+                completar(chaves, variantes, faltantes, preparadas)
+            # Mantém o pool ocupado antes de devolver o resultado ao escritor do PDF
+            enviar_proximo()
+            yield image_path, variantes
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
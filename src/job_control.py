@@ -0,0 +1,81 @@
+# src/job_control.py
+import threading
+import multiprocessing
+from contextlib import contextmanager
+
+class OperacaoCancelada(Exception):
+    """Levantada por Operacao.verificar() quando o usuário cancela a operação."""
+
+class Operacao:
+    """
+    Controle de uma operação longa (geração de catálogo, máscara nas fotos),
+    usado para cancelá-la ou pausá-la a partir de outra thread (ex.: botões da
+    interface).
+
+    Os geradores chamam verificar() entre as páginas/fotos: com a operação
+    pausada ela bloqueia até continuar() ou cancelar(); com a operação cancelada
+    levanta OperacaoCancelada, e quem a chamou descarta o que estava incompleto.
+    Os sinais são eventos do multiprocessing, então a operação pode ser
+    repassada aos processos de um pool na criação deles (ver iniciar_worker).
+    """
+    def __init__(self, nome=""):
+        self.nome = nome
+        self._cancelada = multiprocessing.Event()
+        self._liberada = multiprocessing.Event()
+        self._liberada.set()
+
+    def cancelar(self):
+        self._cancelada.set()
+        # Acorda quem estiver esperando em uma pausa
+        self._liberada.set()
+
+    def pausar(self):
+        if not self._cancelada.is_set():
+            self._liberada.clear()
+
+    def continuar(self):
+        self._liberada.set()
+
+    @property
+    def cancelada(self):
+        return self._cancelada.is_set()
+
+    @property
+    def pausada(self):
+        return not self._liberada.is_set()
+
+    def verificar(self):
+        """Aguarda enquanto a operação estiver pausada e levanta OperacaoCancelada se ela foi cancelada."""
+        self._liberada.wait()
+        if self._cancelada.is_set():
+            raise OperacaoCancelada(self.nome)
+
+def verificar(operacao):
+    """Operacao.verificar() que aceita operacao None (operação sem controle)."""
+    if operacao is not None:
+        operacao.verificar()
+
+# Operação da thread atual: definida em cada processo de um pool (iniciar_worker)
+# ou por em_operacao quando o trabalho roda no próprio processo
+_local = threading.local()
+
+def iniciar_worker(operacao):
+    """Initializer do ProcessPoolExecutor: registra a operação no processo do worker."""
+    _local.operacao = operacao
+
+def operacao_atual():
+    return getattr(_local, "operacao", None)
+
+@contextmanager
+def em_operacao(operacao):
+    """Define a operação da thread atual durante o bloco (ver verificar_operacao_atual)."""
+    anterior = operacao_atual()
+    _local.operacao = operacao
+    try:
+        yield operacao
+    finally:
+        _local.operacao = anterior
+
+def verificar_operacao_atual():
+    """verificar() da operação da thread atual, para funções executadas nos workers."""
+    verificar(operacao_atual())
@@ -0,0 +1,353 @@
+# src/job_queue.py
+"""
+Fila de trabalhos do servidor (ver job_server): geração de catálogos, máscara
+nas fotos e reorganização de PDFs, descritos em JSON e executados por um número
+configurável de trabalhos simultâneos.
+
+- O próximo trabalho é o pendente de maior prioridade (e, entre iguais, o mais antigo).
+- Um trabalho idêntico (mesmo tipo e parâmetros) a outro ainda pendente não é
+  enfileirado de novo: o pendente é devolvido, com a maior das duas prioridades.
+- Dois trabalhos que gravam no mesmo destino nunca rodam ao mesmo tempo.
+- Cada trabalho tem uma Operacao (job_control) para ser pausado ou cancelado.
+"""
+import os
+import json
+import time
+import uuid
+import hashlib
+import threading
+from collections import deque
+from job_control import Operacao, OperacaoCancelada, verificar
+
+PENDENTE = "pendente"
+EXECUTANDO = "executando"
+CONCLUIDO = "concluido"
+FALHOU = "falhou"
+CANCELADO = "cancelado"
+ESTADOS_FINAIS = (CONCLUIDO, FALHOU, CANCELADO)
+
+# Mensagens de andamento guardadas por trabalho e trabalhos finalizados mantidos no histórico
+MAX_MENSAGENS = 500
+MAX_FINALIZADOS = 200
+
+# Parâmetros aceitos por tipo de trabalho: (obrigatórios, opcionais)
+PARAMETROS = {
+    "gerar": (("saida",),
+              ("catalogo", "planilha", "pasta_imagens", "grupos_ordenados", "grupos_dict", "style", "position",
+               "sobrescrever", "workers", "usar_cache", "incremental", "streaming", "em_lotes", "paginas_por_lote",
+               "perfis", "retomar")),
+    "mascara": (("mascara", "pasta"), ("pasta_saida", "apenas_alteradas", "workers")),
+    "reorganizar": (("saida", "paginas"), ()),
+}
+
+class TrabalhoInvalido(ValueError):
+    """Descrição de trabalho com tipo ou parâmetros inválidos."""
+
+def validar(tipo, parametros):
+    if tipo not in PARAMETROS:
+        raise TrabalhoInvalido(f"Tipo de trabalho desconhecido: {tipo} (disponíveis: {', '.join(PARAMETROS)})")
+    if not isinstance(parametros, dict):
+        raise TrabalhoInvalido("parametros deve ser um objeto JSON")
+    obrigatorios, opcionais = PARAMETROS[tipo]
+    faltando = [nome for nome in obrigatorios if nome not in parametros]
+    if faltando:
+        raise TrabalhoInvalido(f"Parâmetros obrigatórios ausentes para {tipo}: {', '.join(faltando)}")
+    desconhecidos = [nome for nome in parametros if nome not in obrigatorios and nome not in opcionais]
+    if desconhecidos:
+        raise TrabalhoInvalido(f"Parâmetros desconhecidos para {tipo}: {', '.join(desconhecidos)}")
+
+def chave_trabalho(tipo, parametros):
+    """Identifica trabalhos idênticos (mesmo tipo e parâmetros, em qualquer ordem)."""
+    texto = json.dumps([tipo, parametros], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(texto.encode("utf-8")).hexdigest()
+
+def destino_trabalho(tipo, parametros):
+    """Arquivo ou pasta gravado pelo trabalho (dois trabalhos com o mesmo destino não rodam juntos)."""
+    if tipo == "mascara":
+        destino = parametros.get("pasta_saida") or os.path.join(parametros["pasta"], "saida")
+    else:
+        destino = parametros["saida"]
+    return os.path.normcase(os.path.abspath(destino))
+
+def dentro_das_raizes(caminho, raizes):
+    """Indica se caminho (resolvidos os links e "..") fica dentro de uma das pastas raizes."""
+    caminho = os.path.normcase(os.path.realpath(caminho))
+    for raiz in raizes:
+        raiz = os.path.normcase(os.path.realpath(raiz))
+        try:
+            if os.path.commonpath([raiz, caminho]) == raiz:
+                return True
+        except ValueError:  # unidades diferentes no Windows
+            pass
+    return False
+
+def validar_destino(tipo, parametros, raizes):
+    """Levanta TrabalhoInvalido se o trabalho gravaria fora das pastas permitidas (raizes)."""
+    destino = destino_trabalho(tipo, parametros)
+    if not dentro_das_raizes(destino, raizes):
+        raise TrabalhoInvalido(f"Destino fora das pastas permitidas no servidor: {destino} "
+                               f"(permitidas: {', '.join(raizes)})")
+
+class Trabalho:
+    """Um trabalho da fila, com o estado e o andamento informados aos clientes."""
+    def __init__(self, tipo, parametros, prioridade=0, origem=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.tipo = tipo
+        self.parametros = parametros
+        self.prioridade = prioridade
+        self.origem = origem
+        self.chave = chave_trabalho(tipo, parametros)
+        self.destino = destino_trabalho(tipo, parametros)
+        self.estado = PENDENTE
+        self.criado_em = time.time()
+        self.iniciado_em = None
+        self.finalizado_em = None
+        self.atual = None
+        self.total = None
+        self.resultado = None
+        self.erro = None
+        self.operacao = Operacao(self.id)
+        self.mensagens = deque(maxlen=MAX_MENSAGENS)
+        self._sequencia = 0
+
+    def progresso(self, mensagem, log_type="default", atual=None, total=None):
+        """Callback de progresso dos geradores (mesma assinatura usada em api)."""
+        self._sequencia += 1
+        self.mensagens.append((self._sequencia, mensagem, log_type, atual, total))
+        if atual is not None:
+            self.atual, self.total = atual, total
+
+    def como_dict(self, desde=None):
+        """
+        Estado do trabalho em JSON; com desde, inclui as mensagens com número
+        maior que desde, como [número, mensagem, log_type, atual, total].
+        """
+        dados = {
+            "id": self.id,
+            "tipo": self.tipo,
+            "prioridade": self.prioridade,
+            "origem": self.origem,
+            "estado": self.estado,
+            "pausado": self.estado == EXECUTANDO and self.operacao.pausada,
+            "criado_em": self.criado_em,
+            "iniciado_em": self.iniciado_em,
+            "finalizado_em": self.finalizado_em,
+            "atual": self.atual,
+            "total": self.total,
+            "resultado": self.resultado,
+            "erro": self.erro,
+            "ultima_mensagem": self._sequencia,
+        }
+        if desde is not None:
+            dados["parametros"] = self.parametros
+            dados["mensagens"] = [list(m) for m in list(self.mensagens) if m[0] > desde]
+        return dados
+
+def executar_gerar(trabalho, workers=None):
+    import api
+    from output_profiles import obter_perfis
+    opcoes = dict(trabalho.parametros)
+    saida = opcoes.pop("saida")
+    if opcoes.get("perfis"):
+        opcoes["perfis"] = obter_perfis(opcoes["perfis"])
+    opcoes.setdefault("workers", workers)
+    opcoes.setdefault("streaming", True)
+    return api.gerar(saida, progresso=trabalho.progresso, operacao=trabalho.operacao, **opcoes)
+
+def executar_mascara(trabalho, workers=None):
+    from mask_compositor import compor_fotos, fotos_pendentes
+    parametros = trabalho.parametros
+    pasta = parametros["pasta"]
+    pasta_saida = parametros.get("pasta_saida") or os.path.join(pasta, "saida")
+    ignoradas = 0
+
+    def ao_ignorar(_):
+        nonlocal ignoradas
+        ignoradas += 1
+
+    tarefas = fotos_pendentes(pasta, pasta_saida, parametros["mascara"],
+                              apenas_alteradas=parametros.get("apenas_alteradas", True), ao_ignorar=ao_ignorar)
+    processadas = erros = 0
+    fotos = compor_fotos(parametros["mascara"], tarefas, workers=parametros.get("workers", workers),
+                         operacao=trabalho.operacao)
+    for processadas, (caminho, erro) in enumerate(fotos, start=1):
+        nome = os.path.relpath(caminho, pasta)
+        if erro:
+            erros += 1
+            trabalho.progresso(f"Erro em {nome}: {erro}", "erro", atual=processadas)
+        else:
+            trabalho.progresso(f"Processado: {nome} ({processadas})", "informacao", atual=processadas)
+    return {"processadas": processadas, "ignoradas": ignoradas, "erros": erros}
+
+def executar_reorganizar(trabalho, workers=None):
+    from pdf_assembly import montar_pdf
+    saida = trabalho.parametros["saida"]
+    segmentos = [(caminho, indice) for caminho, indice in trabalho.parametros["paginas"]]
+    temporario = saida + ".tmp"
+
+    def progresso(atual, total):
+        trabalho.progresso(f"📄 {atual}/{total} páginas copiadas", atual=atual, total=total)
+        verificar(trabalho.operacao)
+
+    try:
+        montar_pdf(segmentos, temporario, progresso=progresso)
+        os.replace(temporario, saida)
+    finally:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+    return True
+
+EXECUTORES = {
+    "gerar": executar_gerar,
+    "mascara": executar_mascara,
+    "reorganizar": executar_reorganizar,
+}
+
+class FilaTrabalhos:
+    """
+    Fila com simultaneos threads executando os trabalhos. workers é o número de
+    processos repassado a cada trabalho que não informar o seu (padrão: núcleos).
+    Com raizes (lista de pastas), só são aceitos trabalhos que gravam dentro delas.
+    """
+    def __init__(self, simultaneos=1, workers=None, executores=None, raizes=None):
+        self.simultaneos = max(1, int(simultaneos))
+        self.workers = workers
+        self.raizes = list(raizes) if raizes is not None else None
+        self.executores = executores or EXECUTORES
+        self.trabalhos = {}
+        self._pendentes = []
+        self._contador = 0
+        self._condicao = threading.Condition()
+        self._encerrando = False
+        self._threads = []
+
+    def iniciar(self):
+        for n in range(self.simultaneos):
+            thread = threading.Thread(target=self._executar, name=f"fila-{n}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def encerrar(self, cancelar=True, esperar=True):
+        """Para as threads; com cancelar, os trabalhos em execução são cancelados."""
+        with self._condicao:
+            self._encerrando = True
+            if cancelar:
+                for trabalho in self.trabalhos.values():
+                    if trabalho.estado == EXECUTANDO:
+                        trabalho.operacao.cancelar()
+            self._condicao.notify_all()
+        if esperar:
+            for thread in self._threads:
+                thread.join()
+
+    def enviar(self, tipo, parametros, prioridade=0, origem=None):
+        """
+        Enfileira um trabalho (levanta TrabalhoInvalido). Retorna (trabalho, duplicado):
+        duplicado indica que um trabalho pendente idêntico foi reaproveitado.
+        """
+        validar(tipo, parametros)
+        if self.raizes is not None:
+            validar_destino(tipo, parametros, self.raizes)
+        novo = Trabalho(tipo, parametros, int(prioridade), origem)
+        with self._condicao:
+            for _, trabalho in self._pendentes:
+                if trabalho.chave == novo.chave:
+                    trabalho.prioridade = max(trabalho.prioridade, novo.prioridade)
+                    return trabalho, True
+            self._contador += 1
+            self._pendentes.append((self._contador, novo))
+            self.trabalhos[novo.id] = novo
+            self._podar_historico()
+            self._condicao.notify()
+        return novo, False
+
+    def obter(self, trabalho_id):
+        return self.trabalhos.get(trabalho_id)
+
+    def listar(self):
+        with self._condicao:
+            return sorted(self.trabalhos.values(), key=lambda trabalho: trabalho.criado_em)
+
+    def cancelar(self, trabalho_id):
+        """Cancela um trabalho pendente (sai da fila) ou em execução. Retorna o trabalho ou None."""
+        with self._condicao:
+            trabalho = self.trabalhos.get(trabalho_id)
+            if trabalho is None:
+                return None
+            if trabalho.estado == PENDENTE:
+                self._pendentes = [(n, t) for n, t in self._pendentes if t is not trabalho]
+                self._finalizar(trabalho, CANCELADO)
+            elif trabalho.estado == EXECUTANDO:
+                trabalho.operacao.cancelar()
+            return trabalho
+
+    def pausar(self, trabalho_id):
+        trabalho = self.trabalhos.get(trabalho_id)
+        if trabalho is not None:
+            trabalho.operacao.pausar()
+        return trabalho
+
+    def continuar(self, trabalho_id):
+        trabalho = self.trabalhos.get(trabalho_id)
+        if trabalho is not None:
+            trabalho.operacao.continuar()
+        return trabalho
+
+    def _finalizar(self, trabalho, estado):
+        trabalho.estado = estado
+        trabalho.finalizado_em = time.time()
+
+    def _podar_historico(self):
+        finalizados = [t for t in self.trabalhos.values() if t.estado in ESTADOS_FINAIS]
+        finalizados.sort(key=lambda trabalho: trabalho.finalizado_em)
+        for trabalho in finalizados[:max(0, len(finalizados) - MAX_FINALIZADOS)]:
+            del self.trabalhos[trabalho.id]
+
+    def _proximo(self):
+        """Pendente de maior prioridade cujo destino não está em uso (None se não houver)."""
+        ocupados = {t.destino for t in self.trabalhos.values() if t.estado == EXECUTANDO}
+        candidatos = [(-t.prioridade, n, t) for n, t in self._pendentes if t.destino not in ocupados]
+        if not candidatos:
+            return None
+        _, n, trabalho = min(candidatos, key=lambda candidato: candidato[:2])
+        self._pendentes = [(m, t) for m, t in self._pendentes if m != n]
+        return trabalho
+
+    def _executar(self):
+        while True:
+            with self._condicao:
+                trabalho = None
+                while not self._encerrando:
+                    trabalho = self._proximo()
+                    if trabalho is not None:
+                        break
+                    self._condicao.wait()
+                if trabalho is None:
+                    return
+                trabalho.estado = EXECUTANDO
+                trabalho.iniciado_em = time.time()
+            trabalho.progresso(f"▶ Trabalho {trabalho.tipo} iniciado", "processamento")
+            try:
+                resultado = self.executores[trabalho.tipo](trabalho, workers=self.workers)
+            except OperacaoCancelada:
+                estado = CANCELADO
+            except Exception as e:
+                trabalho.erro = str(e)
+                trabalho.progresso(f"Erro no trabalho: {e}", "erro")
+                estado = FALHOU
+            else:
+                trabalho.resultado = resultado
+                if trabalho.operacao.cancelada:
+                    estado = CANCELADO
+                elif resultado is False:
+                    # Os geradores informam o motivo pelo progresso (ex.: nenhuma imagem encontrada)
+                    avisos = [m[1] for m in trabalho.mensagens if m[2] in ("alerta", "erro")]
+                    trabalho.erro = avisos[-1] if avisos else "O trabalho não foi concluído."
+                    estado = FALHOU
+                else:
+                    estado = CONCLUIDO
+            with self._condicao:
+                self._finalizar(trabalho, estado)
+                # Um destino foi liberado: outro trabalho pode estar esperando por ele
+                self._condicao.notify_all()
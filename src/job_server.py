@@ -0,0 +1,311 @@
+# src/job_server.py
+"""
+Servidor local da fila de trabalhos (job_queue) e o cliente usado pela
+interface gráfica. Com vários computadores gerando catálogos na mesma pasta de
+imagens, um único servidor executa os trabalhos em ordem de prioridade, sem
+que cada cópia da interface sature a pasta compartilhada ao mesmo tempo.
+
+Uso (a partir da pasta src):
+    python -m job_server servir --porta 8765 --simultaneos 1 --workers 4 --raiz C:/Catalogos
+    python -m job_server enviar gerar '{"saida": "C:/Catalogos/Principal.pdf"}' --prioridade 5 --aguardar
+    python -m job_server listar
+    python -m job_server cancelar <id>
+
+Para que a interface envie a geração e a máscara ao servidor, defina a variável
+de ambiente CATALOGO_FILA=127.0.0.1:8765 antes de abri-la. Os caminhos dos
+trabalhos são lidos no computador do servidor.
+
+Todas as requisições precisam do token do servidor no cabeçalho
+"Authorization: Bearer <token>" (401 sem ele) e os POST precisam de
+"Content-Type: application/json" (415 sem ele), o que impede que uma página
+aberta no navegador envie trabalhos à fila. O token vem de --token ou da
+variável CATALOGO_FILA_TOKEN, nos dois lados; sem ele o servidor gera um e o
+mostra ao iniciar. Os trabalhos só podem gravar dentro das pastas --raiz
+(padrão: Documentos/GeradorCatalogo e Área de Trabalho/Catálogos do servidor).
+
+API HTTP (JSON):
+    POST /trabalhos                    {"tipo", "parametros", "prioridade"} -> trabalho (+ "duplicado")
+    GET  /trabalhos                    -> {"trabalhos": [...]}
+    GET  /trabalhos/<id>?desde=N       -> trabalho com as mensagens de andamento após N
+    POST /trabalhos/<id>/cancelar      (também /pausar e /continuar)
+"""
+import os
+import sys
+import hmac
+import json
+import time
+import secrets
+import argparse
+import urllib.error
+import urllib.request
+from urllib.parse import urlsplit, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from job_queue import FilaTrabalhos, ESTADOS_FINAIS, PARAMETROS
+
+VARIAVEL_AMBIENTE = "CATALOGO_FILA"
+VARIAVEL_TOKEN = "CATALOGO_FILA_TOKEN"
+PORTA_PADRAO = 8765
+
+class FilaIndisponivel(Exception):
+    """O servidor da fila não respondeu (ou recusou o pedido)."""
+
+class ManipuladorFila(BaseHTTPRequestHandler):
+    """Traduz as requisições HTTP em chamadas à FilaTrabalhos do servidor."""
+    server_version = "FilaCatalogo/1"
+
+    @property
+    def fila(self):
+        return self.server.fila
+
+    def log_message(self, formato, *args):
+        if self.server.verboso:
+            super().log_message(formato, *args)
+
+    def _responder(self, status, dados):
+        corpo = json.dumps(dados, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def _autorizado(self):
+        """Confere o token; responde 401 e retorna False se ele estiver ausente ou errado."""
+        recebido = self.headers.get("Authorization") or ""
+        if hmac.compare_digest(recebido.encode("utf-8"), f"Bearer {self.server.token}".encode("utf-8")):
+            return True
+        self._responder(401, {"erro": "Token da fila ausente ou inválido"})
+        return False
+
+    def _partes(self):
+        url = urlsplit(self.path)
+        return [parte for parte in url.path.split("/") if parte], parse_qs(url.query)
+
+    def do_GET(self):
+        if not self._autorizado():
+            return
+        partes, consulta = self._partes()
+        if partes == ["trabalhos"]:
+            self._responder(200, {"trabalhos": [t.como_dict() for t in self.fila.listar()]})
+        elif len(partes) == 2 and partes[0] == "trabalhos":
+            trabalho = self.fila.obter(partes[1])
+            if trabalho is None:
+                self._responder(404, {"erro": f"Trabalho {partes[1]} não encontrado"})
+                return
+            try:
+                desde = int(consulta.get("desde", ["0"])[0])
+            except ValueError:
+                desde = 0
+            self._responder(200, trabalho.como_dict(desde=desde))
+        else:
+            self._responder(404, {"erro": "Caminho desconhecido"})
+
+    def do_POST(self):
+        if not self._autorizado():
+            return
+        tipo_conteudo = (self.headers.get("Content-Type") or "").split(";")[0].strip().lower()
+        if tipo_conteudo != "application/json":
+            self._responder(415, {"erro": "Use Content-Type: application/json"})
+            return
+        partes, _ = self._partes()
+        if partes == ["trabalhos"]:
+            try:
+                tamanho = int(self.headers.get("Content-Length") or 0)
+                pedido = json.loads(self.rfile.read(tamanho) or b"{}")
+                trabalho, duplicado = self.fila.enviar(pedido.get("tipo"), pedido.get("parametros", {}),
+                                                       pedido.get("prioridade", 0), origem=self.client_address[0])
+            except (ValueError, TypeError, AttributeError) as e:
+                self._responder(400, {"erro": str(e)})
+                return
+            self._responder(200 if duplicado else 201, dict(trabalho.como_dict(), duplicado=duplicado))
+        elif len(partes) == 3 and partes[0] == "trabalhos" and partes[2] in ("cancelar", "pausar", "continuar"):
+            trabalho = getattr(self.fila, partes[2])(partes[1])
+            if trabalho is None:
+                self._responder(404, {"erro": f"Trabalho {partes[1]} não encontrado"})
+            else:
+                self._responder(200, trabalho.como_dict())
+        else:
+            self._responder(404, {"erro": "Caminho desconhecido"})
+
+def raizes_padrao():
+    """Pastas em que os trabalhos podem gravar quando o servidor não recebe --raiz."""
+    inicio = os.path.expanduser("~")
+    return [os.path.join(inicio, "Documents", "GeradorCatalogo"), os.path.join(inicio, "Desktop", "Catálogos")]
+
+def criar_servidor(host="127.0.0.1", porta=PORTA_PADRAO, simultaneos=1, workers=None, verboso=False,
+                   token=None, raizes=None):
+    """
+    Cria o servidor HTTP com a sua FilaTrabalhos já iniciada (use serve_forever()).
+    Sem token, um aleatório é gerado (em servidor.token); sem raizes, usa raizes_padrao().
+    """
+    servidor = ThreadingHTTPServer((host, porta), ManipuladorFila)
+    servidor.daemon_threads = True
+    servidor.verboso = verboso
+    servidor.token = token or secrets.token_urlsafe(24)
+    raizes = [os.path.abspath(raiz) for raiz in (raizes or raizes_padrao())]
+    servidor.fila = FilaTrabalhos(simultaneos=simultaneos, workers=workers, raizes=raizes).iniciar()
+    return servidor
+
+def endereco_configurado():
+    """Endereço do servidor definido em CATALOGO_FILA (None se a fila não for usada)."""
+    return os.environ.get(VARIAVEL_AMBIENTE) or None
+
+def token_configurado():
+    """Token da fila definido em CATALOGO_FILA_TOKEN (ou None)."""
+    return os.environ.get(VARIAVEL_TOKEN) or None
+
+class ClienteFila:
+    """
+    Cliente da API do servidor; endereco é "host:porta" ou uma URL http://.
+    token padrão: variável CATALOGO_FILA_TOKEN.
+    """
+    def __init__(self, endereco, timeout=10, token=None):
+        if "://" not in endereco:
+            endereco = f"http://{endereco}"
+        self.url = endereco.rstrip("/")
+        self.timeout = timeout
+        self.token = token or token_configurado()
+
+    def _requisitar(self, metodo, caminho, dados=None):
+        corpo = json.dumps(dados).encode("utf-8") if dados is not None else None
+        cabecalhos = {"Content-Type": "application/json"}
+        if self.token:
+            cabecalhos["Authorization"] = f"Bearer {self.token}"
+        pedido = urllib.request.Request(self.url + caminho, data=corpo, method=metodo, headers=cabecalhos)
+        try:
+            with urllib.request.urlopen(pedido, timeout=self.timeout) as resposta:
+                return json.loads(resposta.read())
+        except urllib.error.HTTPError as e:
+            try:
+                mensagem = json.loads(e.read()).get("erro", str(e))
+            except ValueError:
+                mensagem = str(e)
+            raise FilaIndisponivel(mensagem) from e
+        except (urllib.error.URLError, OSError) as e:
+            raise FilaIndisponivel(f"Servidor da fila indisponível em {self.url}: {e}") from e
+
+    def enviar(self, tipo, parametros, prioridade=0):
+        return self._requisitar("POST", "/trabalhos", {"tipo": tipo, "parametros": parametros,
+                                                       "prioridade": prioridade})
+
+    def listar(self):
+        return self._requisitar("GET", "/trabalhos")["trabalhos"]
+
+    def consultar(self, trabalho_id, desde=0):
+        return self._requisitar("GET", f"/trabalhos/{trabalho_id}?desde={desde}")
+
+    def cancelar(self, trabalho_id):
+        return self._requisitar("POST", f"/trabalhos/{trabalho_id}/cancelar")
+
+    def pausar(self, trabalho_id):
+        return self._requisitar("POST", f"/trabalhos/{trabalho_id}/pausar")
+
+    def continuar(self, trabalho_id):
+        return self._requisitar("POST", f"/trabalhos/{trabalho_id}/continuar")
+
+    def acompanhar(self, trabalho_id, progresso=None, operacao=None, intervalo=0.5):
+        """
+        Consulta o trabalho até ele terminar, repassando as mensagens para
+        progresso(mensagem, log_type, atual, total). Pausar/cancelar a operacao
+        local (job_control.Operacao) pausa/cancela o trabalho no servidor.
+        Retorna o estado final do trabalho.
+        """
+        desde = 0
+        pausado = cancelado = False
+        while True:
+            if operacao is not None:
+                if operacao.cancelada:
+                    if not cancelado:
+                        self.cancelar(trabalho_id)
+                        cancelado = True
+                elif operacao.pausada != pausado:
+                    pausado = operacao.pausada
+                    (self.pausar if pausado else self.continuar)(trabalho_id)
+            trabalho = self.consultar(trabalho_id, desde)
+            for numero, mensagem, log_type, atual, total in trabalho["mensagens"]:
+                if progresso is not None:
+                    progresso(mensagem, log_type, atual, total)
+                desde = numero
+            if trabalho["estado"] in ESTADOS_FINAIS:
+                return trabalho
+            time.sleep(intervalo)
+
+def imprimir_trabalho(trabalho):
+    andamento = f" {trabalho['atual']}/{trabalho['total'] or '?'}" if trabalho["atual"] is not None else ""
+    pausa = " (pausado)" if trabalho.get("pausado") else ""
+    print(f"{trabalho['id']}  {trabalho['tipo']:<12} {trabalho['estado']:<11}{pausa} prioridade {trabalho['prioridade']}"
+          f"{andamento}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="job_server", description="Fila de trabalhos do gerador de catálogos")
+    parser.add_argument("--endereco", default=endereco_configurado() or f"127.0.0.1:{PORTA_PADRAO}",
+                        help=f"Servidor usado pelos comandos de cliente (padrão: ${VARIAVEL_AMBIENTE})")
+    parser.add_argument("--token", default=token_configurado(),
+                        help=f"Token de acesso à fila (padrão: ${VARIAVEL_TOKEN}; o servidor gera um se faltar)")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    servir = sub.add_parser("servir", help="Inicia o servidor da fila")
+    servir.add_argument("--host", default="127.0.0.1",
+                        help="Interface de rede (0.0.0.0 para aceitar outros computadores da rede)")
+    servir.add_argument("--porta", type=int, default=PORTA_PADRAO)
+    servir.add_argument("--simultaneos", type=int, default=1, help="Trabalhos executados ao mesmo tempo")
+    servir.add_argument("--workers", type=int, help="Processos de cada trabalho (padrão: núcleos)")
+    servir.add_argument("--raiz", action="append",
+                        help="Pasta em que os trabalhos podem gravar (repita para várias; "
+                             "padrão: Documentos/GeradorCatalogo e Área de Trabalho/Catálogos)")
+    servir.add_argument("--verboso", action="store_true", help="Registra cada requisição no terminal")
+
+    enviar = sub.add_parser("enviar", help="Envia um trabalho ao servidor")
+    enviar.add_argument("tipo", choices=tuple(PARAMETROS))
+    enviar.add_argument("parametros", help="Parâmetros do trabalho em JSON")
+    enviar.add_argument("--prioridade", type=int, default=0, help="Maior prioridade é executada antes")
+    enviar.add_argument("--aguardar", action="store_true", help="Acompanha o trabalho até terminar")
+
+    sub.add_parser("listar", help="Lista os trabalhos do servidor")
+    for comando in ("cancelar", "pausar", "continuar"):
+        sub.add_parser(comando, help=f"{comando.capitalize()} um trabalho").add_argument("id")
+    args = parser.parse_args(argv)
+
+    if args.comando == "servir":
+        servidor = criar_servidor(args.host, args.porta, args.simultaneos, args.workers, args.verboso,
+                                  args.token, args.raiz)
+        print(f"Fila de trabalhos em http://{args.host}:{args.porta} ({args.simultaneos} simultâneo(s))")
+        print("Pastas permitidas:", ", ".join(servidor.fila.raizes))
+        if not args.token:
+            print(f"Token gerado: {servidor.token} (defina {VARIAVEL_TOKEN} com ele nos computadores que usam a fila)")
+        sys.stdout.flush()
+        try:
+            servidor.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            servidor.server_close()
+            servidor.fila.encerrar()
+        return 0
+
+    cliente = ClienteFila(args.endereco, token=args.token)
+    try:
+        if args.comando == "enviar":
+            trabalho = cliente.enviar(args.tipo, json.loads(args.parametros), args.prioridade)
+            if trabalho["duplicado"]:
+                print("Trabalho idêntico já estava na fila:", end=" ")
+            imprimir_trabalho(trabalho)
+            if args.aguardar:
+                trabalho = cliente.acompanhar(trabalho["id"], lambda mensagem, *_: print(mensagem, flush=True))
+                imprimir_trabalho(trabalho)
+                return 0 if trabalho["estado"] == "concluido" else 1
+        elif args.comando == "listar":
+            for trabalho in cliente.listar():
+                imprimir_trabalho(trabalho)
+        else:
+            imprimir_trabalho(getattr(cliente, args.comando)(args.id))
+    except (FilaIndisponivel, ValueError) as e:
+        print(e, file=sys.stderr)
+        return 2
+    return 0
+
+if __name__ == "__main__":
+    import multiprocessing
+    # Necessário para o pool de processos no executável congelado (PyInstaller/Nuitka)
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -1,4 +1,9 @@
-from gui_logic import iniciar_interface
+import multiprocessing
 
 if __name__ == "__main__":
+    # Necessário para o pool de processos no executável congelado (PyInstaller/Nuitka)
+    multiprocessing.freeze_support()
+    import tracing
+    tracing.ativar_pelo_ambiente()
+    from gui_logic import iniciar_interface
     iniciar_interface()
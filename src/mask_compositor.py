@@ -0,0 +1,226 @@
+# src/mask_compositor.py
+import os
+import json
+import hashlib
+import tempfile
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from PIL import Image
+from image_pipeline import numero_de_workers
+from image_index import percorrer_imagens
+from job_control import verificar
+
+# Formatos de foto aceitos pela ferramenta de máscara (sem diferenciar maiúsculas)
+EXTENSOES_FOTOS = (".jpg", ".jpeg", ".png")
+
+# Registro, na pasta de saída, da máscara com que as saídas foram geradas
+REGISTRO_MASCARA = ".mascara_aplicada.json"
+
+# Quantos tamanhos de máscara redimensionada cada processo mantém em memória
+MASCARAS_EM_CACHE = 4
+
+try:
+    LANCZOS = Image.Resampling.LANCZOS
+except AttributeError:  # Pillow antigo
+    LANCZOS = Image.ANTIALIAS
+
+class MascaraPreparada:
+    """
+    Máscara RGBA pronta para ser aplicada sobre fotos RGB.
+
+    Para cada tamanho de foto a máscara é redimensionada (LANCZOS) uma única vez
+    e guardada já pré-multiplicada: (255 - alfa) e cor * alfa. A composição
+    fica foto * (255 - alfa) + cor * alfa, em inteiros de 16 bits, direto nos
+    dados RGB (sem converter a foto para RGBA e de volta) e apenas no retângulo
+    em que a máscara não é transparente. Fotos com transparência (PNG com alfa)
+    seguem pelo Image.alpha_composite, como na versão original da ferramenta.
+    """
+    def __init__(self, mascara, max_tamanhos=MASCARAS_EM_CACHE):
+        self.mascara = mascara.convert("RGBA")
+        self.max_tamanhos = max_tamanhos
+        self._por_tamanho = OrderedDict()
+
+    @classmethod
+    def abrir(cls, caminho, max_tamanhos=MASCARAS_EM_CACHE):
+        with Image.open(caminho) as mascara:
+            return cls(mascara, max_tamanhos)
+
+    def para_tamanho(self, tamanho):
+        """
+        Retorna (caixa, inverso_alfa, cor_pre_multiplicada) para o tamanho (largura, altura).
+        caixa é o retângulo (esquerda, topo, direita, base) com alfa > 0, ou None.
+        """
+        preparada = self._por_tamanho.get(tamanho)
+        if preparada is not None:
+            self._por_tamanho.move_to_end(tamanho)
+            return preparada
+        mascara = self.mascara if self.mascara.size == tamanho else self.mascara.resize(tamanho, LANCZOS)
+        caixa = mascara.getchannel("A").getbbox()
+        if caixa is None:
+            preparada = (None, None, None)
+        else:
+            rgba = np.asarray(mascara.crop(caixa), dtype=np.uint16)
+            alfa = rgba[:, :, 3:4]
+            # O +128 do arredondamento da divisão por 255 já fica somado à cor
+            preparada = (caixa, 255 - alfa, rgba[:, :, :3] * alfa + 128)
+        self._por_tamanho[tamanho] = preparada
+        if len(self._por_tamanho) > self.max_tamanhos:
+            self._por_tamanho.popitem(last=False)
+        return preparada
+
+    def aplicar(self, imagem):
+        """Aplica a máscara sobre a imagem e retorna uma nova imagem RGB."""
+        if imagem.mode not in ("RGB", "L"):
+            # Paleta, LA, RGBA...: só segue pelo caminho rápido se não houver transparência
+            imagem = imagem.convert("RGBA")
+            if imagem.getchannel("A").getextrema()[0] < 255:
+                return self._aplicar_com_transparencia(imagem)
+        if imagem.mode != "RGB":
+            imagem = imagem.convert("RGB")
+        caixa, inverso_alfa, cor = self.para_tamanho(imagem.size)
+        if caixa is None:
+            return imagem.copy()
+        esquerda, topo, direita, base = caixa
+        pixels = np.array(imagem)
+        regiao = pixels[topo:base, esquerda:direita]
+        resultado = np.multiply(regiao, inverso_alfa, dtype=np.uint16)
+        resultado += cor
+        # Divisão por 255 com arredondamento, sem ponto flutuante
+        resultado += resultado >> 8
+        resultado >>= 8
+        regiao[...] = resultado
+        return Image.fromarray(pixels, "RGB")
+
+    def _aplicar_com_transparencia(self, imagem):
+        """Composição da foto RGBA com alfa parcial: a cor final depende do alfa dos dois lados."""
+        mascara = self.mascara if self.mascara.size == imagem.size else self.mascara.resize(imagem.size, LANCZOS)
+        return Image.alpha_composite(imagem, mascara).convert("RGB")
+
+def registrar_mascara(caminho_mascara, pasta_saida):
+    """
+    Registra em pasta_saida o conteúdo (sha1) da máscara aplicada e retorna o
+    instante (st_mtime_ns) do registro. O registro só é regravado quando a
+    máscara muda, então saídas mais antigas que ele foram geradas com outra
+    máscara (inclusive em uma execução interrompida). Retorna None se não for
+    possível ler a máscara ou gravar o registro.
+    """
+    registro = os.path.join(pasta_saida, REGISTRO_MASCARA)
+    temporario = None
+    try:
+        with open(caminho_mascara, "rb") as f:
+            assinatura = hashlib.sha1(f.read()).hexdigest()
+        try:
+            with open(registro, "r", encoding="utf-8") as f:
+                if json.load(f).get("sha1") == assinatura:
+                    return os.stat(registro).st_mtime_ns
+        except (OSError, ValueError, AttributeError):
+            pass
+        os.makedirs(pasta_saida, exist_ok=True)
+        fd, temporario = tempfile.mkstemp(prefix=REGISTRO_MASCARA + ".", suffix=".tmp", dir=pasta_saida)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"mascara": os.path.abspath(caminho_mascara), "sha1": assinatura}, f, ensure_ascii=False)
+        os.replace(temporario, registro)
+        return os.stat(registro).st_mtime_ns
+    except OSError as e:
+        print("Erro ao registrar a máscara aplicada:", e)
+        if temporario is not None and os.path.exists(temporario):
+            os.remove(temporario)
+        return None
+
+def fotos_pendentes(pasta, pasta_saida, caminho_mascara, apenas_alteradas=True, ao_ignorar=None):
+    """
+    Percorre a pasta recursivamente (à medida que os arquivos são encontrados) e
+    gera (origem, destino) para cada foto a processar; destino mantém o caminho
+    relativo dentro de pasta_saida, que não é percorrida.
+    Com apenas_alteradas, fotos cuja saída já existe, é mais nova que a origem e
+    foi gerada com a mesma máscara (ver registrar_mascara) são puladas
+    (ao_ignorar(origem) é chamado para cada uma).
+    """
+    registrada_em = registrar_mascara(caminho_mascara, pasta_saida)
+    for imagem in percorrer_imagens(pasta, EXTENSOES_FOTOS, ignorar=(pasta_saida,)):
+        destino = os.path.join(pasta_saida, imagem.nome)
+        if apenas_alteradas and registrada_em is not None:
+            try:
+                if os.stat(destino).st_mtime_ns >= max(imagem.stat.st_mtime_ns, registrada_em):
+                    if ao_ignorar is not None:
+                        ao_ignorar(imagem.caminho)
+                    continue
+            except OSError:
+                pass
+        yield imagem.caminho, destino
+
+# Máscara do processo atual (carregada uma vez por worker)
+_mascara_do_processo = None
+
+def _iniciar_worker(caminho_mascara):
+    global _mascara_do_processo
+    _mascara_do_processo = MascaraPreparada.abrir(caminho_mascara)
+
+def _compor_arquivo(origem, destino):
+    """
+    Aplica a máscara do processo em uma foto e grava o resultado no destino, no
+    mesmo formato da origem (PNG ou JPEG). Retorna a mensagem de erro ou None.
+    """
+    temporario = destino + ".tmp"
+    try:
+        with Image.open(origem) as imagem:
+            resultado = _mascara_do_processo.aplicar(imagem)
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        formato = "PNG" if destino.lower().endswith(".png") else "JPEG"
+        # Grava em um temporário para que uma saída incompleta nunca pareça atualizada
+        resultado.save(temporario, formato)
+        os.replace(temporario, destino)
+        return None
+    except Exception as e:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        return str(e)
+
+def compor_fotos(caminho_mascara, tarefas, workers=None, max_em_andamento=None, operacao=None):
+    """
+    Aplica a máscara em cada (origem, destino) de tarefas, em um pool de processos.
+    tarefas pode ser um gerador (ex.: fotos_pendentes): as fotos são enviadas aos
+    workers à medida que são encontradas, com no máximo max_em_andamento em
+    processamento ao mesmo tempo (padrão: 2 por worker).
+    Gera (origem, erro) na ordem de tarefas; erro é None em caso de sucesso.
+    Com uma Operacao, cada foto só é iniciada depois de operacao.verificar():
+    ao cancelar, as fotos ainda não iniciadas são descartadas e as que estão
+    em andamento terminam (cada saída é gravada por inteiro ou não é gravada).
+    """
+    global _mascara_do_processo
+    workers = numero_de_workers(workers)
+    tarefas = iter(tarefas)
+    if workers == 1:
+        _iniciar_worker(caminho_mascara)
+        try:
+            for origem, destino in tarefas:
+                verificar(operacao)
+                yield origem, _compor_arquivo(origem, destino)
+        finally:
+            _mascara_do_processo = None
+        return
+
+    if max_em_andamento is None:
+        max_em_andamento = workers * 2
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=_iniciar_worker, initargs=(caminho_mascara,))
+    try:
+        pendentes = deque()
+
+        def enviar_proxima():
+            verificar(operacao)
+            tarefa = next(tarefas, None)
+            if tarefa is None:
+                return False
+            pendentes.append((tarefa[0], executor.submit(_compor_arquivo, *tarefa)))
+            return True
+
+        while len(pendentes) < max_em_andamento and enviar_proxima():
+            pass
+        while pendentes:
+            origem, futuro = pendentes.popleft()
+            erro = futuro.result()
+            enviar_proxima()
+            yield origem, erro
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,44 @@
+# src/output_profiles.py
+import os
+from collections import namedtuple
+
+# Caixa (em pontos) em que cada página do catálogo é encaixada. A 72 DPI, 1 pixel
+# da imagem corresponde a 1 ponto, que é o formato histórico do catálogo.
+TAMANHO_PAGINA_REFERENCIA = (1024, 1024)
+
+class PerfilSaida(namedtuple("PerfilSaida", ["nome", "dpi", "quality", "sufixo"])):
+    """
+    Perfil de saída do catálogo: resolução das imagens (DPI em relação ao
+    tamanho da página), qualidade JPEG e sufixo do arquivo gerado.
+    Todos os perfis têm as mesmas páginas (mesmo tamanho em pontos e a mesma
+    tabela); muda apenas a quantidade de pixels das imagens.
+    """
+    __slots__ = ()
+
+    @property
+    def max_size(self):
+        """Tamanho máximo das imagens, em pixels, para o DPI do perfil."""
+        return tuple(round(lado * self.dpi / 72) for lado in TAMANHO_PAGINA_REFERENCIA)
+
+PERFIL_PADRAO = PerfilSaida("padrao", 72, 85, "")
+
+PERFIS = {
+    "padrao": PERFIL_PADRAO,
+    "impressao": PerfilSaida("impressao", 150, 92, "_impressao"),
+    "web": PerfilSaida("web", 54, 70, "_web"),
+}
+
+def obter_perfis(nomes):
+    """Converte nomes de perfis ("padrao", "impressao", "web") em PerfilSaida, sem repetir."""
+    perfis = []
+    for nome in nomes:
+        if nome not in PERFIS:
+            raise ValueError(f"Perfil de saída desconhecido: {nome} (disponíveis: {', '.join(PERFIS)})")
+        if PERFIS[nome] not in perfis:
+            perfis.append(PERFIS[nome])
+    return perfis
+
+def caminho_do_perfil(output_file, perfil):
+    """Arquivo de saída do perfil (ex.: Catalogo.pdf -> Catalogo_web.pdf)."""
+    base, ext = os.path.splitext(output_file)
+    return f"{base}{perfil.sufixo}{ext}"
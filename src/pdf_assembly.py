@@ -0,0 +1,117 @@
+# src/pdf_assembly.py
+import fitz  # PyMuPDF
+from PIL import Image
+from pdf_stream import StreamingPDF
+from tracing import etapa, cronometrado, tamanho_arquivo
+
+def coalescer_segmentos(segmentos):
+    """
+    Agrupa uma sequência de páginas (caminho_pdf, indice_pagina) em trechos
+    consecutivos (caminho_pdf, primeira, ultima), para copiá-los de uma só vez.
+    Segmentos de imagem (caminho_imagem, None) ficam como trechos isolados
+    (caminho_imagem, None, None).
+    """
+    trechos = []
+    for pdf_path, pagina in segmentos:
+        if pagina is None:
+            trechos.append((pdf_path, None, None))
+            continue
+        if trechos:
+            ultimo_path, primeira, ultima = trechos[-1]
+            if ultimo_path == pdf_path and ultima is not None and pagina == ultima + 1:
+                trechos[-1] = (ultimo_path, primeira, pagina)
+                continue
+        trechos.append((pdf_path, pagina, pagina))
+    return trechos
+
+def inserir_pagina_de_imagem(saida, image_path):
+    """
+    Acrescenta uma página do tamanho da imagem (1 pixel = 1 ponto) com a imagem
+    embutida diretamente (JPEG sem recodificação).
+    """
+    with Image.open(image_path) as img:
+        largura, altura = img.size
+    pagina = saida.new_page(width=largura, height=altura)
+    pagina.insert_image(pagina.rect, filename=image_path)
+
+@cronometrado("pdf.montar")
+def montar_pdf(segmentos, output_file, progresso=None):
+    """
+    Monta um PDF copiando páginas de outros PDFs, na ordem de segmentos
+    [(caminho_pdf, indice_pagina), ...]; (caminho_imagem, None) insere uma
+    imagem como página. Cada arquivo de origem é aberto uma única vez e páginas
+    consecutivas são copiadas como um único trecho. O resultado passa por coleta
+    de lixo e deduplicação de objetos (garbage=3).
+    progresso(atual, total), se informado, recebe as páginas já copiadas.
+    """
+    trechos = coalescer_segmentos(segmentos)
+    total = len(segmentos)
+    copiadas = 0
+    saida = fitz.open()
+    abertos = {}
+    try:
+        for pdf_path, primeira, ultima in trechos:
+            if primeira is None:
+                inserir_pagina_de_imagem(saida, pdf_path)
+                copiadas += 1
+            else:
+                origem = abertos.get(pdf_path)
+                if origem is None:
+                    origem = abertos[pdf_path] = fitz.open(pdf_path)
+                saida.insert_pdf(origem, from_page=primeira, to_page=ultima)
+                copiadas += ultima - primeira + 1
+            if progresso is not None:
+                progresso(copiadas, total)
+        with etapa("pdf.salvar", paginas=total) as medicao:
+            saida.save(output_file, garbage=3, deflate=True)
+            medicao.adicionar(bytes_gravados=tamanho_arquivo(output_file))
+    finally:
+        saida.close()
+        for origem in abertos.values():
+            origem.close()
+
+@cronometrado("pdf.montar")
+def montar_pdf_em_fluxo(segmentos, output_file, progresso=None):
+    """
+    Mesmo resultado de montar_pdf, mas gravando cada página copiada direto no
+    arquivo (StreamingPDF.copiar_paginas): o uso de memória não cresce com o
+    tamanho do catálogo. Sem a coleta de lixo do save(garbage=3); os recursos
+    repetidos dentro de uma origem e os streams idênticos entre origens são
+    gravados uma única vez. Usado para juntar os blocos da geração retomável.
+    """
+    trechos = coalescer_segmentos(segmentos)
+    total = len(segmentos)
+    copiadas = 0
+    # Cada origem é fechada depois do seu último trecho, liberando os objetos já lidos
+    ultimo_trecho = {pdf_path: n for n, (pdf_path, primeira, _) in enumerate(trechos) if primeira is not None}
+    saida = StreamingPDF(output_file)
+    abertos = {}
+    try:
+        for n, (pdf_path, primeira, ultima) in enumerate(trechos):
+            if primeira is None:
+                with Image.open(pdf_path) as img:
+                    largura, altura = img.size
+                saida.add_page(format=(largura, altura))
+                saida.image(pdf_path, 0, 0, largura, altura)
+                copiadas += 1
+            else:
+                if pdf_path not in abertos:
+                    abertos[pdf_path] = (fitz.open(pdf_path), {})
+                origem, copiados = abertos[pdf_path]
+                saida.copiar_paginas(origem, primeira, ultima, copiados)
+                copiadas += ultima - primeira + 1
+                if ultimo_trecho[pdf_path] == n:
+                    abertos.pop(pdf_path)[0].close()
+            if progresso is not None:
+                progresso(copiadas, total)
+        # Todas as origens já foram fechadas: o arquivo final pode substituir uma
+        # delas (ex.: o catálogo anterior)
+        with etapa("pdf.salvar", paginas=total) as medicao:
+            saida.output(output_file)
+            medicao.adicionar(bytes_gravados=tamanho_arquivo(output_file))
+    except BaseException:
+        saida.descartar()
+        raise
+    finally:
+        for origem, _ in abertos.values():
+            origem.close()
@@ -0,0 +1,195 @@
+# src/pdf_optimizer.py
+import os
+import hashlib
+from io import BytesIO
+from collections import namedtuple
+import fitz  # PyMuPDF
+from PIL import Image
+
+# Tentativas para atingir o tamanho alvo: (escala das imagens, qualidade JPEG), da mais leve para a mais forte
+NIVEIS_COMPRESSAO = [
+    (1.0, 80), (1.0, 65), (0.75, 65), (0.75, 50), (0.5, 50), (0.5, 35), (0.35, 35),
+]
+
+# Chaves do dicionário da imagem que, junto com o stream, a identificam
+_CHAVES_IMAGEM = ("Width", "Height", "BitsPerComponent", "ColorSpace", "Filter", "DecodeParms", "Decode", "ImageMask")
+
+RelatorioOtimizacao = namedtuple("RelatorioOtimizacao", [
+    "bytes_antes", "bytes_depois", "imagens", "imagens_duplicadas", "imagens_recomprimidas",
+    "escala", "qualidade",
+])
+
+def _avisar(progresso, mensagem, log_type="default"):
+    if progresso is not None:
+        progresso(mensagem, log_type)
+
+def _impressao_digital(doc, xref):
+    """Hash do stream bruto e do dicionário da imagem (inclusive da máscara suave, se houver)."""
+    h = hashlib.sha1(doc.xref_stream_raw(xref) or b"")
+    for chave in _CHAVES_IMAGEM:
+        h.update(repr(doc.xref_get_key(xref, chave)).encode("utf-8"))
+    tipo, valor = doc.xref_get_key(xref, "SMask")
+    if tipo == "xref":
+        h.update(_impressao_digital(doc, int(valor.split()[0])).encode("ascii"))
+    return h.hexdigest()
+
+def _apontar_recurso(doc, referenciador, nome, xref):
+    """Faz o recurso /XObject/nome do objeto referenciador apontar para xref."""
+    alvo, prefixo = referenciador, ""
+    for chave in ("Resources", "XObject"):
+        tipo, valor = doc.xref_get_key(alvo, prefixo + chave)
+        if tipo == "xref":
+            alvo, prefixo = int(valor.split()[0]), ""
+        elif tipo == "dict":
+            prefixo += chave + "/"
+        else:
+            return False
+    doc.xref_set_key(alvo, prefixo + nome, f"{xref} 0 R")
+    return True
+
+def deduplicar_imagens(doc):
+    """
+    Faz todas as referências a imagens idênticas (mesmo stream e dicionário)
+    apontarem para um único objeto; as cópias ficam órfãs e são removidas ao salvar.
+    Retorna ({xref: [páginas em que aparece]} das imagens únicas, quantidade de duplicadas).
+    """
+    canonicos = {}
+    substituidos = {}
+    paginas_por_imagem = {}
+    for page in doc:
+        for xref, smask, *_, nome, _, referenciador in page.get_images(full=True):
+            if xref not in substituidos:
+                impressao = _impressao_digital(doc, xref)
+                substituidos[xref] = canonicos.setdefault(impressao, xref)
+            canonico = substituidos[xref]
+            if canonico != xref:
+                _apontar_recurso(doc, referenciador or page.xref, nome, canonico)
+            paginas = paginas_por_imagem.setdefault(canonico, [])
+            if not paginas or paginas[-1] != page.number:
+                paginas.append(page.number)
+    duplicadas = sum(1 for xref, canonico in substituidos.items() if xref != canonico)
+    return paginas_por_imagem, duplicadas
+
+def _lado_necessario(doc, xref, paginas, dpi):
+    """Maior lado (em pixels) que a imagem precisa ter para ser exibida com dpi em todas as páginas."""
+    maior = 0
+    for numero in paginas:
+        for rect in doc[numero].get_image_rects(xref):
+            maior = max(maior, rect.width, rect.height)
+    return int(round(maior / 72 * dpi)) if maior else None
+
+def recomprimir_imagem(doc, xref, max_lado=None, qualidade=75):
+    """
+    Reduz (se maior que max_lado) e recodifica em JPEG uma imagem sem
+    transparência. O stream só é substituído se ficar menor. Retorna True se substituiu.
+
+    Imagens com /SMask ou /Mask (transparência) e máscaras /ImageMask (1 bit,
+    pintadas com a cor atual) são mantidas: o JPEG descartaria a máscara.
+    """
+    for chave in ("SMask", "Mask"):
+        tipo, _ = doc.xref_get_key(xref, chave)
+        if tipo != "null":
+            return False
+    tipo, valor = doc.xref_get_key(xref, "ImageMask")
+    if tipo == "bool" and valor == "true":
+        return False
+    original = doc.xref_stream_raw(xref) or b""
+    extraida = doc.extract_image(xref)
+    if not extraida:
+        return False
+    with Image.open(BytesIO(extraida["image"])) as img:
+        img = img.convert("L" if img.mode in ("1", "L") else "RGB")
+    if max_lado and max(img.size) > max_lado:
+        img.thumbnail((max_lado, max_lado), Image.LANCZOS)
+    buffer = BytesIO()
+    img.save(buffer, format="JPEG", quality=qualidade, optimize=True)
+    novo = buffer.getvalue()
+    if len(novo) >= len(original):
+        return False
+    doc.update_stream(xref, novo, compress=False)
+    doc.xref_set_key(xref, "Filter", "/DCTDecode")
+    doc.xref_set_key(xref, "DecodeParms", "null")
+    doc.xref_set_key(xref, "Decode", "null")
+    doc.xref_set_key(xref, "Width", str(img.width))
+    doc.xref_set_key(xref, "Height", str(img.height))
+    doc.xref_set_key(xref, "BitsPerComponent", "8")
+    doc.xref_set_key(xref, "ColorSpace", "/DeviceGray" if img.mode == "L" else "/DeviceRGB")
+    return True
+
+def _gerar_versao(entrada, destino, escala=None, qualidade=None, max_lado=None, dpi=None):
+    """Gera uma versão otimizada de entrada em destino. Retorna (imagens, duplicadas, recomprimidas)."""
+    with fitz.open(entrada) as doc:
+        paginas_por_imagem, duplicadas = deduplicar_imagens(doc)
+        recomprimidas = 0
+        if qualidade is not None:
+            for xref, paginas in paginas_por_imagem.items():
+                lado = max_lado
+                if dpi:
+                    necessario = _lado_necessario(doc, xref, paginas, dpi)
+                    if necessario:
+                        lado = min(lado, necessario) if lado else necessario
+                if escala is not None and escala < 1:
+                    atual = max(int(doc.xref_get_key(xref, "Width")[1]), int(doc.xref_get_key(xref, "Height")[1]))
+                    lado = int(min(lado or atual, atual) * escala)
+                if recomprimir_imagem(doc, xref, lado, qualidade):
+                    recomprimidas += 1
+        doc.save(destino, garbage=4, deflate=True)
+    return len(paginas_por_imagem), duplicadas, recomprimidas
+
+def otimizar_pdf(entrada, saida, tamanho_alvo=None, dpi=None, max_lado=None, qualidade=None, progresso=None):
+    """
+    Gera uma versão menor do PDF (ex.: catálogo para enviar por e-mail ou WhatsApp).
+
+    Sempre remove imagens duplicadas (mesmo conteúdo embutido mais de uma vez).
+    Com qualidade, dpi ou max_lado, recomprime as imagens em JPEG, reduzindo as
+    que têm mais pixels que o necessário. Com tamanho_alvo (bytes), tenta níveis
+    crescentes de compressão (NIVEIS_COMPRESSAO) até o arquivo caber no alvo; se
+    nenhum couber, fica o menor resultado obtido.
+    saida pode ser igual à entrada. Retorna um RelatorioOtimizacao.
+    """
+    entrada = os.path.normpath(entrada)
+    saida = os.path.normpath(saida)
+    bytes_antes = os.path.getsize(entrada)
+    temporario = saida + ".otimizando.tmp"
+    melhor = saida + ".otimizado.tmp"
+    if tamanho_alvo:
+        niveis = [(None, qualidade)] + [(e, q) for e, q in NIVEIS_COMPRESSAO if qualidade is None or q <= qualidade]
+    else:
+        niveis = [(None, qualidade if qualidade is not None else (75 if dpi or max_lado else None))]
+    resultado = None
+    try:
+        for escala, q in niveis:
+            if escala is not None or q is not None:
+                _avisar(progresso, f"🗜 Recomprimindo imagens (qualidade {q}, escala {escala or 1.0:.0%})")
+            imagens, duplicadas, recomprimidas = _gerar_versao(entrada, temporario, escala, q, max_lado, dpi)
+            tamanho = os.path.getsize(temporario)
+            if resultado is None or tamanho < resultado.bytes_depois:
+                os.replace(temporario, melhor)
+                resultado = RelatorioOtimizacao(bytes_antes, tamanho, imagens, duplicadas, recomprimidas,
+                                                escala or 1.0, q)
+            if not tamanho_alvo or tamanho <= tamanho_alvo:
+                break
+        os.replace(melhor, saida)
+    finally:
+        for arquivo in (temporario, melhor):
+            if os.path.exists(arquivo):
+                os.remove(arquivo)
+    if tamanho_alvo and resultado.bytes_depois > tamanho_alvo:
+        _avisar(progresso, f"Não foi possível chegar a {formatar_bytes(tamanho_alvo)}; "
+                           f"mantido o menor resultado ({formatar_bytes(resultado.bytes_depois)}).", "alerta")
+    return resultado
+
+def formatar_bytes(n):
+    """Formata um tamanho em bytes como "812 KB" ou "12.4 MB"."""
+    if n < 1024 * 1024:
+        return f"{n / 1024:.0f} KB"
+    return f"{n / (1024 * 1024):.1f} MB"
+
+def resumo_otimizacao(relatorio):
+    """Texto com o resultado da otimização (bytes economizados e imagens tratadas)."""
+    economia = relatorio.bytes_antes - relatorio.bytes_depois
+    percentual = economia / relatorio.bytes_antes * 100 if relatorio.bytes_antes else 0
+    return (f"{formatar_bytes(relatorio.bytes_antes)} → {formatar_bytes(relatorio.bytes_depois)} "
+            f"({formatar_bytes(max(economia, 0))} economizados, {percentual:.0f}%); "
+            f"{relatorio.imagens_duplicadas} imagens duplicadas removidas, "
+            f"{relatorio.imagens_recomprimidas} recomprimidas")
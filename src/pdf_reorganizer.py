@@ -1,11 +1,18 @@
 import sys
 import os
+import itertools
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
 import fitz  # PyMuPDF
 from PyQt5 import QtWidgets, QtGui, QtCore
-from PIL import Image
 from io import BytesIO
-from PyPDF2 import PdfFileReader, PdfFileWriter
 from utils import get_base_path  # Função para obter o caminho base
+from pdf_utils import abrir_imagem_reduzida
+from pdf_assembly import montar_pdf
+from thumbnail_cache import ThumbnailCache, DocumentPool, pasta_miniaturas_padrao
+import tracing
+from tracing import etapa, cronometrado, tamanho_arquivo
 
 # Define a pasta base do projeto
 if getattr(sys, 'frozen', False):
@@ -13,32 +20,354 @@ if getattr(sys, 'frozen', False):
 else:
     project_folder = os.path.abspath(os.path.dirname(__file__))
 
-def pil2pixmap(im):
-    """Converte uma imagem PIL para QPixmap."""
-    im = im.convert("RGBA")
-    data = im.tobytes("raw", "RGBA")
-    qimage = QtGui.QImage(data, im.size[0], im.size[1], QtGui.QImage.Format_RGBA8888)
-    return QtGui.QPixmap.fromImage(qimage)
+# Tamanho fixo de cada linha da lista e escala das miniaturas das páginas
+ALTURA_LINHA = 170
+LARGURA_MINIATURA = 120
+ESCALA_MINIATURA = 0.2
+TAMANHO_MINIATURA_IMAGEM = (100, 150)
+TIPO_MIME_PAGINAS = "application/x-paginas-reorganizador"
 
-class PDFPageWidget(QtWidgets.QWidget):
+@cronometrado("miniatura.rasterizar")
+def rasterizar_miniatura(page, documentos=None):
     """
-    Widget que exibe a miniatura de uma página com seu índice e um botão para removê-la.
+    Renderiza a miniatura de uma página conforme a fonte e retorna (largura, altura, bytes PNG):
+      - "original": página do PDF carregado
+      - "image": imagem adicionada
+      - "pdf": página de um PDF externo
+    documentos (DocumentPool) evita reabrir o mesmo PDF a cada página.
     """
-    def __init__(self, pixmap, index, parent=None):
+    if page["source"] == "image":
+        img = abrir_imagem_reduzida(os.path.normpath(page["image_path"]), TAMANHO_MINIATURA_IMAGEM)
+        buffer = BytesIO()
+        img.save(buffer, format="PNG")
+        return img.width, img.height, buffer.getvalue()
+    matriz = fitz.Matrix(ESCALA_MINIATURA, ESCALA_MINIATURA)
+    if documentos is not None:
+        pix = documentos.abrir(page["pdf_path"])[page["page"]].get_pixmap(matrix=matriz)
+    else:
+        with fitz.open(page["pdf_path"]) as doc:
+            pix = doc[page["page"]].get_pixmap(matrix=matriz)
+    return pix.width, pix.height, pix.tobytes("png")
+
+def renderizar_miniatura(page, cache=None, documentos=None):
+    """
+    Retorna a miniatura da página como QImage, lendo do ThumbnailCache quando
+    possível e gravando nele as miniaturas novas. Pode rodar fora da thread da interface.
+    """
+    if page["source"] == "image":
+        chave = cache.chave(page["image_path"], None, TAMANHO_MINIATURA_IMAGEM) if cache is not None else None
+    else:
+        chave = cache.chave(page["pdf_path"], page["page"], ESCALA_MINIATURA) if cache is not None else None
+    entrada = cache.obter(chave) if chave is not None else None
+    if entrada is None:
+        entrada = rasterizar_miniatura(page, documentos)
+        if chave is not None:
+            cache.gravar(chave, entrada)
+    return QtGui.QImage.fromData(entrada[2], "PNG")
+
+class RenderizadorMiniaturas(QtCore.QObject):
+    """
+    Renderiza miniaturas em uma thread de fundo. Os pedidos mais recentes são
+    atendidos primeiro (são as linhas que acabaram de ficar visíveis) e pedidos
+    cancelados ou repetidos são descartados. O resultado chega pelo sinal
+    pronta(id_pagina, QImage), entregue na thread da interface.
+    As miniaturas passam pelo ThumbnailCache (memória e disco) e os PDFs ficam
+    abertos em um DocumentPool usado apenas por esta thread.
+    """
+    pronta = QtCore.pyqtSignal(int, QtGui.QImage)
+
+    def __init__(self, parent=None, cache=None):
         super().__init__(parent)
-        self.initUI(pixmap, index)
-
-    def initUI(self, pixmap, index):
-        layout = QtWidgets.QHBoxLayout(self)
-        layout.setContentsMargins(5, 5, 5, 5)
-        self.index_label = QtWidgets.QLabel(f"{index + 1}.")
-        layout.addWidget(self.index_label)
-        self.thumbnail_label = QtWidgets.QLabel(self)
-        self.thumbnail_label.setPixmap(pixmap)
-        layout.addWidget(self.thumbnail_label)
-        self.remove_button = QtWidgets.QPushButton("Remover", self)
-        self.remove_button.setObjectName("removeButton")
-        layout.addWidget(self.remove_button)
+        self.cache = cache
+        self.documentos = DocumentPool()
+        self._pedidos = OrderedDict()
+        # Arquivos que outra thread precisa substituir: [(caminho, evento "já fechado")]
+        self._suspensoes = []
+        self._condicao = threading.Condition()
+        self._encerrar = False
+        self._thread = threading.Thread(target=self._executar, daemon=True)
+        self._thread.start()
+
+    def solicitar(self, page_id, page):
+        with self._condicao:
+            self._pedidos.pop(page_id, None)
+            self._pedidos[page_id] = dict(page)
+            self._condicao.notify()
+
+    def cancelar(self, page_id):
+        with self._condicao:
+            self._pedidos.pop(page_id, None)
+
+    def encerrar(self):
+        with self._condicao:
+            self._encerrar = True
+            self._pedidos.clear()
+            self._condicao.notify()
+        self._thread.join(timeout=2)
+
+    @contextmanager
+    def arquivo_liberado(self, caminho):
+        """
+        Faz a thread de miniaturas fechar o PDF caminho no DocumentPool e suspende
+        a renderização durante o bloco, para que o arquivo possa ser substituído
+        (no Windows um arquivo aberto não pode ser sobrescrito). Depois do bloco o
+        pool reabre o arquivo novo quando precisar dele.
+        """
+        suspensao = (caminho, threading.Event())
+        with self._condicao:
+            self._suspensoes.append(suspensao)
+            self._condicao.notify()
+        # Se a thread já terminou, o pool já foi fechado por ela
+        while not suspensao[1].wait(0.1) and self._thread.is_alive():
+            pass
+        try:
+            yield
+        finally:
+            with self._condicao:
+                self._suspensoes.remove(suspensao)
+                self._condicao.notify()
+
+    def _executar(self):
+        try:
+            if self.cache is not None:
+                self.cache.podar()
+            self._atender_pedidos()
+        finally:
+            self.documentos.fechar_todos()
+
+    def _atender_pedidos(self):
+        while True:
+            with self._condicao:
+                while True:
+                    for caminho, fechado in self._suspensoes:
+                        if not fechado.is_set():
+                            self.documentos.fechar(caminho)
+                            fechado.set()
+                    if self._encerrar:
+                        return
+                    if self._pedidos and not self._suspensoes:
+                        break
+                    self._condicao.wait()
+                page_id, page = self._pedidos.popitem(last=True)
+            try:
+                imagem = renderizar_miniatura(page, self.cache, self.documentos)
+            except Exception as e:
+                print("Erro ao renderizar miniatura:", e)
+                imagem = QtGui.QImage()
+            self.pronta.emit(page_id, imagem)
+
+class PageListModel(QtCore.QAbstractListModel):
+    """
+    Modelo da lista de páginas. Cada página é um dicionário com "source", "page"
+    e o caminho de origem, identificado por um id estável: as miniaturas ficam
+    associadas ao id, então remover, inserir ou reordenar páginas não renderiza
+    nada de novo. Miniaturas só são pedidas quando a view consulta uma linha
+    (ou seja, quando ela fica visível).
+    """
+    PageRole = QtCore.Qt.UserRole
+    PageIdRole = QtCore.Qt.UserRole + 1
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pages = []
+        self._ids = []
+        self._proximo_id = itertools.count()
+        self._miniaturas = {}
+        self._solicitadas = set()
+        try:
+            cache = ThumbnailCache(pasta_miniaturas_padrao())
+        except OSError as e:
+            print("Cache de miniaturas indisponível:", e)
+            cache = None
+        self.renderizador = RenderizadorMiniaturas(self, cache)
+        self.renderizador.pronta.connect(self._miniatura_pronta)
+
+    # Leitura
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.pages)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        if role == QtCore.Qt.DisplayRole:
+            return f"{row + 1}."
+        if role == QtCore.Qt.DecorationRole:
+            page_id = self._ids[row]
+            pixmap = self._miniaturas.get(page_id)
+            if pixmap is None and page_id not in self._solicitadas:
+                self._solicitadas.add(page_id)
+                self.renderizador.solicitar(page_id, self.pages[row])
+            return pixmap
+        if role == self.PageRole:
+            return self.pages[row]
+        if role == self.PageIdRole:
+            return self._ids[row]
+        return None
+
+    def flags(self, index):
+        flags = QtCore.Qt.ItemIsEnabled | QtCore.Qt.ItemIsSelectable
+        if index.isValid():
+            return flags | QtCore.Qt.ItemIsDragEnabled
+        return flags | QtCore.Qt.ItemIsDropEnabled
+
+    # Edição
+    def set_pages(self, pages):
+        """Substitui todas as páginas (ex.: ao carregar um novo PDF)."""
+        self.beginResetModel()
+        for page_id in self._ids:
+            self.renderizador.cancelar(page_id)
+        self.pages = list(pages)
+        self._ids = [next(self._proximo_id) for _ in self.pages]
+        self._miniaturas.clear()
+        self._solicitadas.clear()
+        self.endResetModel()
+
+    def insert_pages(self, row, pages, ids=None):
+        """Insere páginas a partir de row, sem renderizar nenhuma miniatura existente."""
+        if not pages:
+            return
+        ids = ids or [next(self._proximo_id) for _ in pages]
+        self.beginInsertRows(QtCore.QModelIndex(), row, row + len(pages) - 1)
+        self.pages[row:row] = pages
+        self._ids[row:row] = ids
+        self.endInsertRows()
+
+    def removeRows(self, row, count, parent=QtCore.QModelIndex()):
+        if parent.isValid() or count <= 0 or row < 0 or row + count > len(self.pages):
+            return False
+        self.beginRemoveRows(parent, row, row + count - 1)
+        removidos = self._ids[row:row + count]
+        del self.pages[row:row + count]
+        del self._ids[row:row + count]
+        self.endRemoveRows()
+        # Uma mesma página pode estar na lista durante um arrastar (cópia inserida antes da remoção)
+        restantes = set(self._ids)
+        for page_id in removidos:
+            if page_id not in restantes:
+                self.renderizador.cancelar(page_id)
+                self._miniaturas.pop(page_id, None)
+                self._solicitadas.discard(page_id)
+        return True
+
+    def _miniatura_pronta(self, page_id, imagem):
+        if page_id not in self._solicitadas:
+            return  # página removida enquanto a miniatura era renderizada
+        self._miniaturas[page_id] = QtGui.QPixmap.fromImage(imagem)
+        try:
+            row = self._ids.index(page_id)
+        except ValueError:
+            return
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [QtCore.Qt.DecorationRole])
+
+    # Arrastar e soltar (reordenação)
+    def supportedDropActions(self):
+        return QtCore.Qt.MoveAction
+
+    def supportedDragActions(self):
+        return QtCore.Qt.MoveAction
+
+    def mimeTypes(self):
+        return [TIPO_MIME_PAGINAS]
+
+    def mimeData(self, indexes):
+        mime = QtCore.QMimeData()
+        rows = sorted(index.row() for index in indexes if index.isValid())
+        mime.setData(TIPO_MIME_PAGINAS, ",".join(str(self._ids[row]) for row in rows).encode("ascii"))
+        return mime
+
+    def dropMimeData(self, mime, action, row, column, parent):
+        """
+        Insere as páginas arrastadas na posição de destino; a view remove as
+        originais em seguida (removeRows), como em qualquer modelo Qt com MoveAction.
+        """
+        if action != QtCore.Qt.MoveAction or not mime.hasFormat(TIPO_MIME_PAGINAS):
+            return False
+        ids = [int(valor) for valor in bytes(mime.data(TIPO_MIME_PAGINAS)).decode("ascii").split(",") if valor]
+        posicoes = {page_id: i for i, page_id in enumerate(self._ids)}
+        pages = [self.pages[posicoes[page_id]] for page_id in ids if page_id in posicoes]
+        if row < 0:
+            row = parent.row() if parent.isValid() else len(self.pages)
+        self.insert_pages(row, pages, [page_id for page_id in ids if page_id in posicoes])
+        return True
+
+class PageItemDelegate(QtWidgets.QStyledItemDelegate):
+    """
+    Desenha cada linha (número, miniatura e botão "Remover") diretamente, sem
+    um widget por página; o clique no botão remove a linha do modelo.
+    """
+    def sizeHint(self, option, index):
+        return QtCore.QSize(option.rect.width() or 400, ALTURA_LINHA)
+
+    def _retangulo_botao(self, rect):
+        return QtCore.QRect(rect.right() - 95, rect.center().y() - 14, 85, 28)
+
+    def paint(self, painter, option, index):
+        painter.save()
+        if option.state & QtWidgets.QStyle.State_Selected:
+            painter.fillRect(option.rect, option.palette.highlight())
+        rect = option.rect.adjusted(5, 5, -5, -5)
+        painter.setPen(option.palette.color(QtGui.QPalette.Text))
+        painter.drawText(QtCore.QRect(rect.left(), rect.top(), 40, rect.height()),
+                         QtCore.Qt.AlignVCenter | QtCore.Qt.AlignLeft, index.data(QtCore.Qt.DisplayRole))
+        area = QtCore.QRect(rect.left() + 45, rect.top(), LARGURA_MINIATURA, rect.height())
+        pixmap = index.data(QtCore.Qt.DecorationRole)
+        if pixmap is not None and not pixmap.isNull():
+            pixmap = pixmap.scaled(area.size(), QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation)
+            painter.drawPixmap(area.left(), area.top() + (area.height() - pixmap.height()) // 2, pixmap)
+        else:
+            painter.drawRect(area.adjusted(0, 0, -1, -1))
+            painter.drawText(area, QtCore.Qt.AlignCenter, "...")
+        # Botão "Remover" com as mesmas cores do estilo anterior (#AA3333 / #BB4444)
+        botao = self._retangulo_botao(option.rect)
+        painter.setBrush(QtGui.QColor("#AA3333"))
+        painter.setPen(QtGui.QColor("#BB4444"))
+        painter.drawRoundedRect(botao, 5, 5)
+        painter.setPen(QtCore.Qt.white)
+        painter.drawText(botao, QtCore.Qt.AlignCenter, "Remover")
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if (event.type() == QtCore.QEvent.MouseButtonRelease
+                and self._retangulo_botao(option.rect).contains(event.pos())):
+            model.removeRows(index.row(), 1)
+            return True
+        return super().editorEvent(event, model, option, index)
+
+class SalvarPDFThread(QtCore.QThread):
+    """
+    Monta e grava o PDF fora da thread da interface. O arquivo é escrito em um
+    temporário e só então substitui o destino (que pode ser um dos PDFs de origem;
+    o renderizador de miniaturas fecha a cópia dele antes da substituição).
+    Sinais: progresso(páginas copiadas, total) e concluido(mensagem de erro ou "").
+    """
+    progresso = QtCore.pyqtSignal(int, int)
+    concluido = QtCore.pyqtSignal(str)
+
+    def __init__(self, segmentos, output, parent=None, renderizador=None):
+        super().__init__(parent)
+        self.segmentos = segmentos
+        self.output = output
+        self.renderizador = renderizador
+
+    def run(self):
+        temporario = self.output + ".tmp"
+        try:
+            with etapa("reorganizador.salvar", paginas=len(self.segmentos)) as medicao:
+                montar_pdf(self.segmentos, temporario, progresso=self.progresso.emit)
+                medicao.adicionar(bytes_gravados=tamanho_arquivo(temporario))
+                if self.renderizador is not None:
+                    with self.renderizador.arquivo_liberado(self.output):
+                        os.replace(temporario, self.output)
+                else:
+                    os.replace(temporario, self.output)
+        except Exception as e:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            self.concluido.emit(str(e))
+            return
+        self.concluido.emit("")
 
 class PDFManager(QtWidgets.QMainWindow):
     """
@@ -48,17 +377,20 @@ class PDFManager(QtWidgets.QMainWindow):
       - Reordenar (via drag & drop)
       - Remover páginas
       - Adicionar páginas a partir de imagens e PDFs
-      - Salvar o PDF reorganizado utilizando PyPDF2 para mesclagem
+      - Salvar o PDF reorganizado (PyMuPDF, copiando trechos de páginas consecutivas)
     """
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Gerenciador de PDF")
         self.resize(900, 600)
-        self.doc = None                   # Documento PDF original (para visualização)
         self.original_pdf_path = None     # Caminho do PDF original carregado
-        self.pages = []                   # Lista de páginas (cada página é um dicionário com dados)
         self.setupUI()
 
+    @property
+    def pages(self):
+        """Lista de páginas na ordem atual (cada página é um dicionário com dados)."""
+        return self.model.pages
+
     def setupUI(self):
         central = QtWidgets.QWidget(self)
         self.setCentralWidget(central)
@@ -80,79 +412,31 @@ class PDFManager(QtWidgets.QMainWindow):
         hlayout.addWidget(save_btn)
         vlayout.addLayout(hlayout)
         
-        # Lista com suporte a drag & drop para reordenação
-        self.listWidget = QtWidgets.QListWidget()
-        self.listWidget.setDragDropMode(QtWidgets.QAbstractItemView.InternalMove)
-        vlayout.addWidget(self.listWidget)
+        # Lista virtualizada (só as linhas visíveis são desenhadas) com drag & drop para reordenação
+        self.model = PageListModel(self)
+        self.listView = QtWidgets.QListView()
+        self.listView.setModel(self.model)
+        self.listView.setItemDelegate(PageItemDelegate(self.listView))
+        self.listView.setUniformItemSizes(True)
+        self.listView.setSelectionMode(QtWidgets.QAbstractItemView.SingleSelection)
+        self.listView.setDragDropMode(QtWidgets.QAbstractItemView.InternalMove)
+        self.listView.setDefaultDropAction(QtCore.Qt.MoveAction)
+        self.listView.setDragDropOverwriteMode(False)
+        vlayout.addWidget(self.listView)
+
+    def closeEvent(self, event):
+        self.model.renderizador.encerrar()
+        super().closeEvent(event)
 
     def load_pdf(self):
         options = QtWidgets.QFileDialog.Options()
         fileName, _ = QtWidgets.QFileDialog.getOpenFileName(self, "Selecione o PDF", "", "PDF Files (*.pdf)", options=options)
         if fileName:
             fileName = os.path.normpath(fileName)
-            self.doc = fitz.open(fileName)
+            with fitz.open(fileName) as doc:
+                total = len(doc)
             self.original_pdf_path = fileName
-            self.pages = [{"source": "original", "page": i} for i in range(len(self.doc))]
-            self.populate_list()
-
-    def populate_list(self):
-        """Cria os itens do QListWidget com base em self.pages, atualizando a numeração."""
-        self.listWidget.clear()
-        for i, page in enumerate(self.pages):
-            item = QtWidgets.QListWidgetItem()
-            item.setData(QtCore.Qt.UserRole, page)
-            widget = self.create_item_widget(page, i)
-            item.setSizeHint(widget.sizeHint())
-            self.listWidget.addItem(item)
-            self.listWidget.setItemWidget(item, widget)
-
-    def create_item_widget(self, page, index):
-        """
-        Cria o widget que representa uma página.
-        Renderiza uma miniatura baseada na fonte:
-          - "original": página do PDF carregado
-          - "image": imagem adicionada
-          - "pdf": página de um PDF externo
-        """
-        if page["source"] == "original":
-            page_obj = self.doc[page["page"]]
-            mat = fitz.Matrix(0.2, 0.2)
-            pix = page_obj.get_pixmap(matrix=mat)
-            mode = "RGB" if pix.alpha == 0 else "RGBA"
-            img = Image.frombytes(mode, (pix.width, pix.height), pix.samples)
-            qpixmap = pil2pixmap(img)
-        elif page["source"] == "image":
-            image_path = os.path.normpath(page["image_path"])
-            img = Image.open(image_path)
-            img.thumbnail((100, 150))
-            qpixmap = pil2pixmap(img)
-        elif page["source"] == "pdf":
-            ext_pdf = fitz.open(page["pdf_path"])
-            page_obj = ext_pdf[page["page"]]
-            mat = fitz.Matrix(0.2, 0.2)
-            pix = page_obj.get_pixmap(matrix=mat)
-            mode = "RGB" if pix.alpha == 0 else "RGBA"
-            img = Image.frombytes(mode, (pix.width, pix.height), pix.samples)
-            qpixmap = pil2pixmap(img)
-        widget = PDFPageWidget(qpixmap, index)
-        widget.remove_button.clicked.connect(lambda _, w=widget: self.remove_item(w))
-        return widget
-
-    def remove_item(self, widget):
-        for i in range(self.listWidget.count()):
-            item = self.listWidget.item(i)
-            if self.listWidget.itemWidget(item) == widget:
-                self.listWidget.takeItem(i)
-                self.update_pages_order()
-                self.populate_list()
-                break
-
-    def update_pages_order(self):
-        new_order = []
-        for i in range(self.listWidget.count()):
-            item = self.listWidget.item(i)
-            new_order.append(item.data(QtCore.Qt.UserRole))
-        self.pages = new_order
+            self.model.set_pages([{"source": "original", "page": i, "pdf_path": fileName} for i in range(total)])
 
     def add_page(self):
         """Adiciona uma página a partir de uma imagem."""
@@ -163,8 +447,7 @@ class PDFManager(QtWidgets.QMainWindow):
             pos, ok = QtWidgets.QInputDialog.getInt(self, "Inserir Página", "Digite a posição para inserir a nova página:", value=len(self.pages) + 1, min=1, max=len(self.pages) + 1)
             if ok:
                 new_page = {"source": "image", "page": None, "image_path": fileName}
-                self.pages.insert(pos - 1, new_page)
-                self.populate_list()
+                self.model.insert_pages(pos - 1, [new_page])
 
     def add_pdf(self):
         """Adiciona páginas a partir de um arquivo PDF externo."""
@@ -172,17 +455,18 @@ class PDFManager(QtWidgets.QMainWindow):
         fileName, _ = QtWidgets.QFileDialog.getOpenFileName(self, "Selecione o PDF", "", "PDF Files (*.pdf)", options=options)
         if fileName:
             fileName = os.path.normpath(fileName)
-            novo_pdf = fitz.open(fileName)
+            with fitz.open(fileName) as novo_pdf:
+                total = len(novo_pdf)
             pos, ok = QtWidgets.QInputDialog.getInt(self, "Inserir PDF", "Digite a posição para inserir as páginas do PDF:", value=len(self.pages) + 1, min=1, max=len(self.pages) + 1)
             if ok:
-                for i in range(len(novo_pdf)):
-                    nova_pagina = {"source": "pdf", "page": i, "pdf_path": fileName}
-                    self.pages.insert(pos - 1, nova_pagina)
-                    pos += 1
-                self.populate_list()
+                novas_paginas = [{"source": "pdf", "page": i, "pdf_path": fileName} for i in range(total)]
+                self.model.insert_pages(pos - 1, novas_paginas)
 
     def save_pdf(self):
-        """Salva o PDF reorganizado utilizando PyPDF2 para mesclagem de páginas."""
+        """
+        Salva o PDF reorganizado com o PyMuPDF (pdf_assembly.montar_pdf), em uma
+        thread separada, com uma janela de progresso.
+        """
         if not self.pages:
             QtWidgets.QMessageBox.critical(self, "Erro", "Nenhuma página para salvar.")
             return
@@ -190,34 +474,31 @@ class PDFManager(QtWidgets.QMainWindow):
         output, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Salvar PDF", os.path.join(os.getcwd(), "output.pdf"), "PDF Files (*.pdf)", options=options)
         if output:
             output = os.path.normpath(output)
-            pdf_writer = PdfFileWriter()
-            # Itera sobre cada página adicionada
+            segmentos = []
             for page in self.pages:
-                if page["source"] == "original":
-                    pdf_reader = PdfFileReader(self.original_pdf_path)
-                    pdf_writer.addPage(pdf_reader.getPage(page["page"]))
-                elif page["source"] == "pdf":
-                    pdf_reader = PdfFileReader(page["pdf_path"])
-                    pdf_writer.addPage(pdf_reader.getPage(page["page"]))
-                elif page["source"] == "image":
-                    try:
-                        image = Image.open(page["image_path"])
-                    except Exception as e:
-                        QtWidgets.QMessageBox.critical(self, "Erro", f"Erro ao abrir a imagem: {e}")
-                        return
-                    if image.mode in ("RGBA", "LA"):
-                        image = image.convert("RGB")
-                    buffer = BytesIO()
-                    image.save(buffer, format="PDF")
-                    buffer.seek(0)
-                    pdf_image_reader = PdfFileReader(buffer)
-                    pdf_writer.addPage(pdf_image_reader.getPage(0))
-            with open(output, 'wb') as out_file:
-                pdf_writer.write(out_file)
-            QtWidgets.QMessageBox.information(self, "Sucesso", "PDF salvo com sucesso!")
-            self.close()
+                if page["source"] == "image":
+                    segmentos.append((page["image_path"], None))
+                else:
+                    segmentos.append((page["pdf_path"], page["page"]))
+            self.progress_dialog = QtWidgets.QProgressDialog("Salvando PDF...", None, 0, len(segmentos), self)
+            self.progress_dialog.setWindowTitle("Salvar PDF")
+            self.progress_dialog.setWindowModality(QtCore.Qt.WindowModal)
+            self.progress_dialog.setMinimumDuration(0)
+            self.save_thread = SalvarPDFThread(segmentos, output, self, self.model.renderizador)
+            self.save_thread.progresso.connect(self.progress_dialog.setValue)
+            self.save_thread.concluido.connect(self.save_finished)
+            self.save_thread.start()
+
+    def save_finished(self, erro):
+        self.progress_dialog.close()
+        if erro:
+            QtWidgets.QMessageBox.critical(self, "Erro", f"Erro ao salvar o PDF: {erro}")
+            return
+        QtWidgets.QMessageBox.information(self, "Sucesso", "PDF salvo com sucesso!")
+        self.close()
 
 def main():
+    tracing.ativar_pelo_ambiente("_reorganizador")
     app = QtWidgets.QApplication(sys.argv)
     app.setStyle("Fusion")
     dark_palette = QtGui.QPalette()
@@ -246,15 +527,6 @@ def main():
         QPushButton:hover {
             background-color: #444444;
         }
-        QPushButton#removeButton {
-            min-width: 50px;
-            background-color: #AA3333;
-            border: 1px solid #BB4444;
-            padding: 3px 5px;
-        }
-        QPushButton#removeButton:hover {
-            background-color: #BB4444;
-        }
     """)
     
     window = PDFManager()
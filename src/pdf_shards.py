@@ -0,0 +1,49 @@
+# src/pdf_shards.py
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from image_pipeline import numero_de_workers
+from job_control import verificar, em_operacao, iniciar_worker
+
+def dividir_em_lotes(indices, grupos, paginas_por_lote=None):
+    """
+    Divide as páginas a renderizar em lotes independentes.
+    indices: posições das páginas no catálogo; grupos: grupo de cada posição.
+    Sem paginas_por_lote, cada grupo (trecho consecutivo do mesmo grupo) vira um
+    lote; com paginas_por_lote, os trechos maiores são cortados nesse tamanho.
+    Retorna listas de índices, na ordem original.
+    """
+    lotes = []
+    for i in indices:
+        if lotes:
+            lote = lotes[-1]
+            mesmo_grupo = grupos[lote[-1]] == grupos[i] and lote[-1] == i - 1
+            cabe = paginas_por_lote is None or len(lote) < paginas_por_lote
+            if mesmo_grupo and cabe:
+                lote.append(i)
+                continue
+        lotes.append([i])
+    return lotes
+
+def executar_lotes(funcao, tarefas, workers=None, operacao=None):
+    """
+    Executa funcao(tarefa) para cada tarefa em um pool de processos.
+    Gera (indice_da_tarefa, resultado) na ordem em que os lotes terminam,
+    para que o andamento possa ser informado sem esperar o lote mais lento.
+    Com workers == 1 (ou uma única tarefa) tudo roda no processo atual.
+    Com uma Operacao, funcao pode chamar verificar_operacao_atual() entre as
+    páginas (também nos workers) para pausar ou interromper o lote.
+    """
+    workers = min(numero_de_workers(workers), max(1, len(tarefas)))
+    if workers == 1:
+        for n, tarefa in enumerate(tarefas):
+            verificar(operacao)
+            with em_operacao(operacao):
+                resultado = funcao(tarefa)
+            yield n, resultado
+        return
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=iniciar_worker, initargs=(operacao,))
+    try:
+        futuros = {executor.submit(funcao, tarefa): n for n, tarefa in enumerate(tarefas)}
+        for futuro in as_completed(futuros):
+            yield futuros[futuro], futuro.result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,339 @@
+# src/pdf_stream.py
+import os
+import re
+import zlib
+import hashlib
+from io import BytesIO
+from PIL import Image
+from fpdf.fonts import CORE_FONTS_CHARWIDTHS
+
+# Espessura de linha padrão do FPDF (0.2 mm) e margem interna das células
+ESPESSURA_LINHA = 0.567
+MARGEM_CELULA = 2.835
+
+# Fontes padrão do PDF usadas no catálogo ("Arial" no FPDF corresponde à Helvetica).
+# As larguras dos caracteres são as mesmas do FPDF, para alinhar os textos igual.
+_FONTES = {
+    "": ("F1", "Helvetica", CORE_FONTS_CHARWIDTHS["helvetica"]),
+    "B": ("F2", "Helvetica-Bold", CORE_FONTS_CHARWIDTHS["helveticaB"]),
+}
+
+# Referências indiretas ("12 0 R") no texto de um objeto; strings literais são
+# casadas antes para que o conteúdo delas nunca seja tratado como referência
+_REFERENCIA = re.compile(rb"\((?:\\.|[^\\)])*\)|(\d+) (\d+) R\b")
+_COMPRIMENTO = re.compile(rb"/Length(?![0-9A-Za-z])\s*(?:\d+ \d+ R|\d+)")
+
+# Atributos que a página pode herdar da árvore de páginas e chaves que não são
+# copiadas (ligam a página ao documento de origem; referências a outras páginas,
+# ex.: destino de links, viram null)
+_HERDAVEIS = ("Resources", "MediaBox", "CropBox", "Rotate")
+_NAO_COPIADAS = ("Parent", "B", "StructParents", "Thumb")
+
+def _numero(valor):
+    """Formata um número para o conteúdo do PDF (sem zeros desnecessários)."""
+    texto = f"{valor:.2f}"
+    return texto.rstrip("0").rstrip(".") if "." in texto else texto
+
+def _texto_pdf(texto):
+    """Codifica o texto em WinAnsi (cp1252) e escapa os caracteres especiais do PDF."""
+    dados = str(texto).encode("cp1252", errors="replace")
+    return dados.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+class StreamingPDF:
+    """
+    Escritor de PDF que grava cada página e cada imagem no disco assim que são
+    produzidas; apenas as posições dos objetos ficam em memória até o xref final.
+    Assim o uso de memória não cresce com a quantidade de páginas.
+
+    Implementa o subconjunto da API do FPDF usado pelo catálogo (add_page, image,
+    set_xy, set_x, ln, cell, cores e fonte), de modo que desenhar_cabecalho e
+    desenhar_linhas_tabela funcionam sem alterações. Unidade: pontos, origem no
+    canto superior esquerdo, como FPDF(unit="pt").
+
+    O arquivo é escrito em caminho + ".parcial" e só substitui o destino em output().
+    """
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._temporario = caminho + ".parcial"
+        self._arquivo = open(self._temporario, "wb")
+        self._offsets = {}
+        self._proximo_id = 5  # 1: Catalog, 2: Pages, 3 e 4: fontes
+        self._paginas = []
+        self._imagens = {}  # hash dos bytes -> (id do objeto, nome)
+        self._streams_copiados = {}  # hash do objeto copiado por copiar_paginas -> id
+        self._copias_em_andamento = set()
+        self._referencias_circulares = set()
+        self._pagina = None
+        self.x = 0
+        self.y = 0
+        self._fill_color = (0, 0, 0)
+        self._text_color = (0, 0, 0)
+        self._draw_color = (0, 0, 0)
+        self._fonte = _FONTES[""]
+        self._tamanho_fonte = 12
+
+        self._arquivo.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        for obj_id, (_, base_font, _) in zip((3, 4), _FONTES.values()):
+            self._escrever_objeto(obj_id, (
+                f"<< /Type /Font /Subtype /Type1 /BaseFont /{base_font} "
+                f"/Encoding /WinAnsiEncoding >>"
+            ).encode("ascii"))
+
+    # Compatibilidade com FPDF (chamadas feitas por adicionar_pagina_com_jpeg)
+    def set_auto_page_break(self, auto=False, margin=0):
+        pass
+
+    def set_margins(self, left, top, right=None):
+        pass
+
+    @property
+    def page(self):
+        return len(self._paginas) + (1 if self._pagina is not None else 0)
+
+    def _novo_id(self):
+        obj_id = self._proximo_id
+        self._proximo_id += 1
+        return obj_id
+
+    def _escrever_objeto(self, obj_id, corpo, stream=None):
+        self._offsets[obj_id] = self._arquivo.tell()
+        self._arquivo.write(f"{obj_id} 0 obj\n".encode("ascii"))
+        self._arquivo.write(corpo)
+        if stream is not None:
+            self._arquivo.write(b"\nstream\n")
+            self._arquivo.write(stream)
+            self._arquivo.write(b"\nendstream")
+        self._arquivo.write(b"\nendobj\n")
+
+    def add_page(self, format=None):
+        """Inicia uma nova página com o tamanho (largura, altura) em pontos."""
+        self._fechar_pagina()
+        largura, altura = format
+        self._pagina = {
+            "largura": largura,
+            "altura": altura,
+            "conteudo": [f"{_numero(ESPESSURA_LINHA)} w 2 J".encode("ascii")],
+            "imagens": {},
+        }
+        self.x = 0
+        self.y = 0
+
+    def image(self, origem, x, y, w, h):
+        """Desenha uma imagem JPEG (bytes ou arquivo/BytesIO) na página atual."""
+        if isinstance(origem, (bytes, bytearray)):
+            dados = bytes(origem)
+        elif hasattr(origem, "read"):
+            dados = origem.read()
+        else:
+            with open(origem, "rb") as f:
+                dados = f.read()
+        chave = hashlib.md5(dados).digest()
+        if chave not in self._imagens:
+            self._imagens[chave] = self._escrever_imagem(dados)
+        obj_id, nome = self._imagens[chave]
+        self._pagina["imagens"][nome] = obj_id
+        altura_pagina = self._pagina["altura"]
+        self._pagina["conteudo"].append((
+            f"q {_numero(w)} 0 0 {_numero(h)} {_numero(x)} {_numero(altura_pagina - y - h)} cm /{nome} Do Q"
+        ).encode("ascii"))
+
+    def _escrever_imagem(self, dados):
+        with Image.open(BytesIO(dados)) as img:
+            if img.format != "JPEG":
+                # Outros formatos são convertidos para JPEG, como no restante do catálogo
+                buffer = BytesIO()
+                img.convert("RGB").save(buffer, format="JPEG", quality=85)
+                return self._escrever_imagem(buffer.getvalue())
+            largura, altura, modo = img.width, img.height, img.mode
+        espacos = {"L": ("DeviceGray", ""), "CMYK": ("DeviceCMYK", " /Decode [1 0 1 0 1 0 1 0]")}
+        espaco, decode = espacos.get(modo, ("DeviceRGB", ""))
+        obj_id = self._novo_id()
+        nome = f"I{obj_id}"
+        self._escrever_objeto(obj_id, (
+            f"<< /Type /XObject /Subtype /Image /Width {largura} /Height {altura} "
+            f"/ColorSpace /{espaco} /BitsPerComponent 8 /Filter /DCTDecode{decode} /Length {len(dados)} >>"
+        ).encode("ascii"), dados)
+        return obj_id, nome
+
+    def set_xy(self, x, y):
+        self.x = x
+        self.y = y
+
+    def set_x(self, x):
+        self.x = x
+
+    def ln(self, h):
+        self.x = 0
+        self.y += h
+
+    def set_fill_color(self, r, g=None, b=None):
+        self._fill_color = (r, r, r) if g is None else (r, g, b)
+
+    def set_text_color(self, r, g=None, b=None):
+        self._text_color = (r, r, r) if g is None else (r, g, b)
+
+    def set_draw_color(self, r, g=None, b=None):
+        self._draw_color = (r, r, r) if g is None else (r, g, b)
+
+    def set_font(self, family=None, style="", size=None):
+        self._fonte = _FONTES["B" if "B" in (style or "").upper() else ""]
+        if size is not None:
+            self._tamanho_fonte = size
+
+    def _cor(self, rgb, operador):
+        return " ".join(f"{c / 255:.3f}" for c in rgb) + f" {operador}"
+
+    def cell(self, w, h=0, text="", border=0, align="L", fill=False):
+        """Desenha uma célula (borda, fundo e texto) e avança x, como FPDF.cell."""
+        altura_pagina = self._pagina["altura"]
+        partes = ["q"]
+        if fill or border:
+            if fill:
+                partes.append(self._cor(self._fill_color, "rg"))
+            if border:
+                partes.append(self._cor(self._draw_color, "RG"))
+            operador = "B" if fill and border else ("f" if fill else "S")
+            partes.append(f"{_numero(self.x)} {_numero(altura_pagina - self.y)} {_numero(w)} {_numero(-h)} re {operador}")
+        if text:
+            nome_fonte, _, larguras = self._fonte
+            dados = _texto_pdf(text)
+            comprimento = sum(larguras[chr(c)] for c in str(text).encode("cp1252", errors="replace")) * self._tamanho_fonte / 1000
+            if align == "C":
+                texto_x = self.x + (w - comprimento) / 2
+            elif align == "R":
+                texto_x = self.x + w - MARGEM_CELULA - comprimento
+            else:
+                texto_x = self.x + MARGEM_CELULA
+            texto_y = altura_pagina - (self.y + h / 2 + 0.3 * self._tamanho_fonte)
+            partes.append(
+                f"BT /{nome_fonte} {_numero(self._tamanho_fonte)} Tf {self._cor(self._text_color, 'rg')} "
+                f"{_numero(texto_x)} {_numero(texto_y)} Td"
+            )
+            self._pagina["conteudo"].append(" ".join(partes).encode("ascii") + b" (" + dados + b") Tj ET Q")
+        else:
+            partes.append("Q")
+            self._pagina["conteudo"].append(" ".join(partes).encode("ascii"))
+        self.x += w
+
+    def _fechar_pagina(self):
+        """Grava o conteúdo e o objeto da página atual."""
+        pagina = self._pagina
+        if pagina is None:
+            return
+        self._pagina = None
+        conteudo = zlib.compress(b"\n".join(pagina["conteudo"]))
+        conteudo_id = self._novo_id()
+        self._escrever_objeto(conteudo_id, f"<< /Filter /FlateDecode /Length {len(conteudo)} >>".encode("ascii"), conteudo)
+        imagens = " ".join(f"/{nome} {obj_id} 0 R" for nome, obj_id in pagina["imagens"].items())
+        pagina_id = self._novo_id()
+        self._escrever_objeto(pagina_id, (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {_numero(pagina['largura'])} {_numero(pagina['altura'])}] "
+            f"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> /XObject << {imagens} >> >> "
+            f"/Contents {conteudo_id} 0 R >>"
+        ).encode("ascii"))
+        self._paginas.append(pagina_id)
+
+    def copiar_paginas(self, origem, primeira, ultima, copiados):
+        """
+        Copia as páginas primeira..ultima do documento PyMuPDF origem, objeto por
+        objeto, gravando cada um assim que é lido (sem montar o documento em memória).
+        copiados ({xref da origem: id no novo arquivo}) deve ser o mesmo para todas
+        as cópias de uma mesma origem, para que recursos compartilhados entre as
+        páginas (fontes, imagens) sejam gravados uma única vez.
+        """
+        self._fechar_pagina()
+        for numero in range(primeira, ultima + 1):
+            xref = origem.page_xref(numero)
+            for chave in _HERDAVEIS:
+                if origem.xref_get_key(xref, chave)[0] == "null":
+                    herdado = self._atributo_herdado(origem, xref, chave)
+                    if herdado is not None:
+                        origem.xref_set_key(xref, chave, herdado)
+            for chave in _NAO_COPIADAS:
+                origem.xref_set_key(xref, chave, "null")
+            corpo = self._remapear(origem, origem.xref_object(xref, compressed=True).encode("latin-1"), copiados)
+            pagina_id = self._novo_id()
+            self._escrever_objeto(pagina_id, corpo[:corpo.rindex(b">>")] + b"/Parent 2 0 R>>")
+            self._paginas.append(pagina_id)
+
+    @staticmethod
+    def _atributo_herdado(origem, xref, chave):
+        """Valor (texto PDF) de um atributo herdado pela página, procurado nos nós /Parent."""
+        vistos = set()
+        while xref not in vistos:
+            vistos.add(xref)
+            tipo, pai = origem.xref_get_key(xref, "Parent")
+            if tipo != "xref":
+                return None
+            xref = int(pai.split()[0])
+            tipo, valor = origem.xref_get_key(xref, chave)
+            if tipo != "null":
+                return valor
+        return None
+
+    def _remapear(self, origem, corpo, copiados):
+        """Troca as referências do texto de um objeto pelos ids dos objetos copiados."""
+        def trocar(casamento):
+            if casamento.group(1) is None:
+                return casamento.group(0)
+            novo = self._copiar_objeto(origem, int(casamento.group(1)), copiados)
+            return b"null" if novo is None else f"{novo} 0 R".encode("ascii")
+        return _REFERENCIA.sub(trocar, corpo)
+
+    def _copiar_objeto(self, origem, xref, copiados):
+        """Grava o objeto xref da origem (e os que ele referencia) e retorna o novo id."""
+        if xref in copiados:
+            if copiados[xref] in self._copias_em_andamento:
+                self._referencias_circulares.add(copiados[xref])
+            return copiados[xref]
+        if not 0 < xref < origem.xref_length() or origem.xref_get_key(xref, "Type")[1] in ("/Page", "/Pages"):
+            # Outras páginas e a árvore de páginas da origem não são copiadas
+            copiados[xref] = None
+            return None
+        # O id é reservado antes de copiar os objetos referenciados (referências circulares)
+        copiados[xref] = obj_id = self._novo_id()
+        self._copias_em_andamento.add(obj_id)
+        corpo = origem.xref_object(xref, compressed=True).encode("latin-1")
+        dados = None
+        if origem.xref_is_stream(xref):
+            dados = origem.xref_stream_raw(xref) or b""
+            corpo = _COMPRIMENTO.sub(f"/Length {len(dados)}".encode("ascii"), corpo, count=1)
+        corpo = self._remapear(origem, corpo, copiados)
+        self._copias_em_andamento.discard(obj_id)
+        if dados is not None and obj_id not in self._referencias_circulares:
+            # Streams repetidos (ex.: a mesma foto em blocos diferentes) são gravados uma única vez
+            chave = hashlib.md5(corpo + b"\0" + dados).digest()
+            existente = self._streams_copiados.get(chave)
+            if existente is not None:
+                copiados[xref] = existente
+                return existente
+            self._streams_copiados[chave] = obj_id
+        self._escrever_objeto(obj_id, corpo, dados)
+        return obj_id
+
+    def output(self, destino=None):
+        """Finaliza o PDF (árvore de páginas e xref) e o move para o destino."""
+        self._fechar_pagina()
+        kids = " ".join(f"{pagina_id} 0 R" for pagina_id in self._paginas)
+        self._escrever_objeto(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(self._paginas)} >>".encode("ascii"))
+        self._escrever_objeto(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        inicio_xref = self._arquivo.tell()
+        total = self._proximo_id
+        linhas = [f"xref\n0 {total}\n".encode("ascii"), b"0000000000 65535 f \n"]
+        for obj_id in range(1, total):
+            if obj_id in self._offsets:
+                linhas.append(f"{self._offsets[obj_id]:010d} 00000 n \n".encode("ascii"))
+            else:
+                # Id reservado por copiar_paginas para um stream que já tinha sido gravado
+                linhas.append(b"0000000000 00001 f \n")
+        self._arquivo.write(b"".join(linhas))
+        self._arquivo.write(f"trailer\n<< /Size {total} /Root 1 0 R >>\nstartxref\n{inicio_xref}\n%%EOF\n".encode("ascii"))
+        self._arquivo.close()
+        os.replace(self._temporario, destino or self.caminho)
+
+    def descartar(self):
+        """Fecha e remove o arquivo parcial (ex.: geração cancelada). Pode ser chamado mais de uma vez."""
+        if not self._arquivo.closed:
+            self._arquivo.close()
+        if os.path.exists(self._temporario):
+            os.remove(self._temporario)
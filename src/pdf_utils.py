@@ -1,38 +1,188 @@
 import os
+import math
 from PIL import Image
 from io import BytesIO
 from fpdf import FPDF
 from utils import get_base_path  # Função para obter o caminho base
+from tracing import etapa, cronometrado
 
-def processar_imagem(image_path, max_size=(1024, 1024)):
+def resolver_caminho_imagem(image_path):
     """
-    Processa e retorna uma cópia da imagem redimensionada para o tamanho máximo especificado.
+    Normaliza o caminho da imagem; se o arquivo não existir, procura na pasta base
+    (ex: em ambiente empacotado).
     """
     # Normaliza o caminho para garantir compatibilidade no Windows
     image_path = os.path.normpath(image_path)
-    # Se o arquivo não existir, tenta procurar na pasta base (ex: em ambiente empacotado)
     if not os.path.exists(image_path):
         base_path = get_base_path()
         image_path = os.path.join(base_path, image_path)
+    return image_path
+
+@cronometrado("imagem.processar")
+def processar_imagem(image_path, max_size=(1024, 1024)):
+    """
+    Processa e retorna uma cópia da imagem redimensionada para o tamanho máximo especificado.
+    """
+    image_path = resolver_caminho_imagem(image_path)
     with Image.open(image_path) as img:
-        img = img.convert("RGB")
-        img.thumbnail(max_size)
-        return img.copy()
+        return reduzir_imagem(img, max_size)
 
-def adicionar_pagina_com_imagem_simples(pdf, img):
+def aplicar_draft(img, max_size, folga=2.0):
     """
-    Adiciona uma nova página ao PDF com a imagem fornecida.
-    Essa função não desenha cabeçalho nem tabela, apenas insere a imagem.
+    Para JPEGs ainda não decodificados, pede ao decodificador uma versão já reduzida
+    (escala 1/2, 1/4 ou 1/8 no domínio DCT) que continue pelo menos `folga` vezes
+    maior que o tamanho final. O redimensionamento final mantém a mesma qualidade,
+    mas a decodificação de fotos grandes fica várias vezes mais rápida e leve.
+
+    Retorna a região (box) da imagem reduzida que corresponde à foto inteira, a ser
+    passada para redimensionar (o decodificador arredonda o tamanho para cima), ou
+    None se a imagem não foi reduzida.
     """
     width, height = img.size
+    escala = min(max_size[0] / width, max_size[1] / height)
+    if escala * folga >= 1:
+        return None
+    alvo = (max(1, int(width * escala * folga)), max(1, int(height * escala * folga)))
+    resultado = img.draft("RGB", alvo)
+    return resultado[1] if resultado else None
+
+def redimensionar(img, tamanho, box=None):
+    """
+    Redimensiona img para tamanho com o mesmo filtro do Image.thumbnail. O tamanho
+    deve vir de tamanho_reduzido(tamanho original, max_size): calculado a partir da
+    imagem já reduzida (draft ou perfil anterior) ele pode sair 1 pixel diferente.
+    """
+    if img.size == tuple(tamanho) and box is None:
+        return img
+    return img.resize(tamanho, Image.BICUBIC, box=box, reducing_gap=2.0)
+
+def abrir_imagem_reduzida(image_path, max_size):
+    """Abre a imagem já reduzida para caber em max_size, sem decodificá-la em tamanho cheio."""
+    with Image.open(image_path) as img:
+        tamanho = tamanho_reduzido(img.size, max_size)
+        box = aplicar_draft(img, max_size)
+        return redimensionar(img, tamanho, box).copy()
+
+def reduzir_imagem(img, max_size=(1024, 1024)):
+    """Converte a imagem aberta para RGB e a reduz para caber em max_size."""
+    tamanho = tamanho_reduzido(img.size, max_size)
+    box = aplicar_draft(img, max_size)
+    img = img.convert("RGB")
+    return redimensionar(img, tamanho, box)
+
+@cronometrado("imagem.jpeg")
+def codificar_jpeg(img, quality=85):
+    """Codifica uma imagem PIL em JPEG e retorna os bytes."""
+    buffer = BytesIO()
+    img.save(buffer, format="JPEG", quality=quality)
+    return buffer.getvalue()
+
+def pode_embutir_jpeg_original(img, max_size=(1024, 1024)):
+    """
+    Indica se o arquivo original pode ser embutido no PDF sem recodificação:
+    JPEG baseline em RGB que já cabe em max_size.
+    """
+    return (
+        img.format == "JPEG"
+        and img.mode == "RGB"
+        and img.width <= max_size[0]
+        and img.height <= max_size[1]
+        and not img.info.get("progressive")
+        and not img.info.get("progression")
+    )
+
+def tamanho_reduzido(tamanho, max_size):
+    """
+    Tamanho que uma imagem de `tamanho` terá ao ser reduzida para caber em max_size
+    (mesmo cálculo do Image.thumbnail), sem precisar abri-la.
+    """
+    largura, altura = tamanho
+    x, y = max_size
+    if x >= largura and y >= altura:
+        return largura, altura
+    aspecto = largura / altura
+
+    def arredondar(numero, chave):
+        return max(min(math.floor(numero), math.ceil(numero), key=chave), 1)
+
+    if x / y >= aspecto:
+        x = arredondar(y * aspecto, lambda n: abs(aspecto - n / y))
+    else:
+        y = arredondar(x / aspecto, lambda n: 0 if n == 0 else abs(aspecto - x / n))
+    return x, y
+
+@cronometrado("imagem.preparar")
+def preparar_imagem_perfis(image_path, perfis, referencia=None):
+    """
+    Prepara a imagem de uma página em vários perfis [(max_size, quality), ...],
+    decodificando o arquivo uma única vez: a imagem é reduzida do maior para o
+    menor perfil e cada versão é codificada em JPEG. Pode ser executada em outro processo.
+
+    Retorna [(largura, altura, bytes_jpeg), ...] na ordem de perfis, onde largura
+    e altura são o tamanho da página em pontos. Sem referencia (ou se o max_size
+    do perfil é a própria referencia), 1 pixel = 1 ponto; nos demais perfis a
+    página tem o tamanho que a imagem teria reduzida para referencia, de modo que
+    todos os perfis geram páginas iguais, só com mais ou menos pixels.
+    Se o arquivo já é um JPEG RGB que cabe no max_size de um perfil, seus bytes
+    originais são usados diretamente (sem decodificar nem recodificar).
+    """
+    image_path = resolver_caminho_imagem(image_path)
+    with etapa("imagem.ler") as medicao, open(image_path, "rb") as f:
+        dados = f.read()
+        medicao.adicionar(bytes_lidos=len(dados))
+    resultados = [None] * len(perfis)
+    with Image.open(BytesIO(dados)) as original:
+        tamanho_original = original.size
+
+        def pagina(max_size, largura, altura):
+            if referencia is None or tuple(max_size) == tuple(referencia):
+                return largura, altura
+            return tamanho_reduzido(tamanho_original, referencia)
+
+        pendentes = []
+        for n, (max_size, quality) in enumerate(perfis):
+            if pode_embutir_jpeg_original(original, max_size):
+                resultados[n] = (*pagina(max_size, original.width, original.height), dados)
+            else:
+                pendentes.append(n)
+        if pendentes:
+            pendentes.sort(key=lambda n: perfis[n][0][0] * perfis[n][0][1], reverse=True)
+            img = reduzir_imagem(original, perfis[pendentes[0]][0])
+            for n in pendentes:
+                max_size, quality = perfis[n]
+                img = redimensionar(img, tamanho_reduzido(tamanho_original, max_size))
+                resultados[n] = (*pagina(max_size, img.width, img.height), codificar_jpeg(img, quality))
+    return resultados
+
+def preparar_imagem(image_path, max_size=(1024, 1024), quality=85):
+    """
+    Prepara a imagem de uma página: abre, redimensiona e codifica em JPEG.
+    Retorna (largura, altura, bytes_jpeg). Pode ser executada em outro processo.
+    Se o arquivo já é um JPEG RGB que cabe em max_size, seus bytes originais são
+    usados diretamente (sem decodificar nem recodificar).
+    """
+    return preparar_imagem_perfis(image_path, [(max_size, quality)])[0]
+
+@cronometrado("pdf.pagina")
+def adicionar_pagina_com_jpeg(pdf, width, height, jpeg_bytes):
+    """
+    Adiciona uma nova página ao PDF com uma imagem já codificada em JPEG.
+    Essa função não desenha cabeçalho nem tabela, apenas insere a imagem.
+    """
     if pdf is None:
         pdf = FPDF(unit="pt", format=(width, height))
         pdf.set_auto_page_break(auto=False, margin=0)
         pdf.set_margins(0, 0, 0)
     pdf.add_page(format=(width, height))
-    buffer = BytesIO()
-    img.save(buffer, format="JPEG", quality=85)
-    buffer.seek(0)
+    buffer = BytesIO(jpeg_bytes)
     pdf.image(buffer, 0, 0, width, height)
     buffer.close()
     return pdf
+
+def adicionar_pagina_com_imagem_simples(pdf, img):
+    """
+    Adiciona uma nova página ao PDF com a imagem fornecida.
+    Essa função não desenha cabeçalho nem tabela, apenas insere a imagem.
+    """
+    width, height = img.size
+    return adicionar_pagina_com_jpeg(pdf, width, height, codificar_jpeg(img, 85))
@@ -0,0 +1,82 @@
+# src/price_index.py
+from tracing import cronometrado
+
+# Políticas aceitas para códigos repetidos na planilha
+DUPLICADOS_POLITICAS = ("first", "last", "error")
+
+
+def normalizar_codigo(code):
+    """Normaliza um código de produto: remove espaços e converte para maiúsculas."""
+    return str(code).strip().upper()
+
+
+def formatar_preco(valor):
+    """
+    Formata um valor da planilha no padrão usado na tabela de preços ("12.50").
+    Células vazias lidas pelo pandas (NaN) continuam saindo como "nan", como
+    sempre saíram na tabela; None e textos vazios viram "N/A" e textos que não
+    são números são mantidos como estão.
+    """
+    if valor is None:
+        return "N/A"
+    try:
+        return f"{float(valor):.2f}"
+    except (TypeError, ValueError):
+        texto = str(valor).strip()
+        return texto if texto else "N/A"
+
+
+class CodigoDuplicadoError(ValueError):
+    """Levantado quando a planilha repete um código e a política é "error"."""
+
+
+class PriceIndex:
+    """
+    Índice código -> preços formatados, construído uma única vez a partir do
+    DataFrame retornado por carregar_planilha.
+
+    As consultas são O(1) e não alteram o DataFrame. A política de códigos
+    duplicados pode ser:
+      - "first": mantém a primeira linha (comportamento histórico do catálogo)
+      - "last": mantém a última linha
+      - "error": levanta CodigoDuplicadoError
+    """
+    @cronometrado("precos.indexar")
+    def __init__(self, df, codigo_coluna, preco_colunas, duplicados="first"):
+        if duplicados not in DUPLICADOS_POLITICAS:
+            raise ValueError(f"Política de duplicados inválida: {duplicados}")
+        self.preco_colunas = list(preco_colunas)
+        self.duplicados = duplicados
+        self.codigos_duplicados = set()
+        self._precos = {}
+        self._vazio = tuple("N/A" for _ in self.preco_colunas)
+
+        codigos = df[codigo_coluna].tolist()
+        colunas = [df[col].tolist() for col in self.preco_colunas]
+        for i, code in enumerate(codigos):
+            chave = normalizar_codigo(code)
+            if chave in self._precos:
+                self.codigos_duplicados.add(chave)
+                if duplicados == "error":
+                    raise CodigoDuplicadoError(f"Código duplicado na planilha: {chave}")
+                if duplicados == "first":
+                    continue
+            self._precos[chave] = tuple(formatar_preco(valores[i]) for valores in colunas)
+
+    def __len__(self):
+        return len(self._precos)
+
+    def __contains__(self, code):
+        return normalizar_codigo(code) in self._precos
+
+    def get_tuple(self, code):
+        """Retorna a tupla de preços formatados (na ordem de preco_colunas)."""
+        return self._precos.get(normalizar_codigo(code), self._vazio)
+
+    def get(self, code):
+        """Retorna os preços do código como dicionário {coluna: preço}, com "N/A" se ausente."""
+        return dict(zip(self.preco_colunas, self.get_tuple(code)))
+
+    def vazio(self):
+        """Dicionário de preços sem valores (usado para capas)."""
+        return dict(zip(self.preco_colunas, self._vazio))
@@ -0,0 +1,67 @@
+# src/price_overlay.py
+import fitz  # PyMuPDF
+
+# Medidas usadas pelo FPDF nas células da tabela (unidade "pt")
+MARGEM_CELULA = 2.835
+ESPESSURA_BORDA = 0.567
+COR_BORDA = (218, 218, 218)
+COR_TEXTO_LINHAS = (48, 48, 48)
+TAMANHO_FONTE = 14
+
+def abrir_pdf(caminho):
+    """Abre um PDF com o PyMuPDF."""
+    return fitz.open(caminho)
+
+def _cor(rgb):
+    return tuple(c / 255 for c in rgb)
+
+def limpar_regiao(page, x, y, largura, altura):
+    """
+    Apaga o texto e os desenhos vetoriais contidos na região (a tabela antiga),
+    mantendo intactas as imagens da página.
+    """
+    # O MuPDF considera a borda expandida pelo limite de esquadria (10 x espessura)
+    # ao decidir se um desenho está coberto; a folga garante que as células saiam inteiras
+    folga = ESPESSURA_BORDA * 10 + 1
+    rect = fitz.Rect(x, y, x + largura, y + altura) + (-folga, -folga, folga, folga)
+    page.add_redact_annot(rect, fill=False)
+    page.apply_redactions(
+        images=fitz.PDF_REDACT_IMAGE_NONE,
+        graphics=fitz.PDF_REDACT_LINE_ART_REMOVE_IF_COVERED,
+    )
+
+def _celula(shape, x, y, largura, altura, texto, fonte, cor_texto, cor_fundo, align):
+    """Desenha uma célula com borda, fundo e texto, como FPDF.cell(border=1, fill=True)."""
+    shape.draw_rect(fitz.Rect(x, y, x + largura, y + altura))
+    shape.finish(color=_cor(COR_BORDA), fill=_cor(cor_fundo), width=ESPESSURA_BORDA)
+    comprimento = fitz.get_text_length(texto, fontname=fonte, fontsize=TAMANHO_FONTE)
+    if align == "C":
+        texto_x = x + (largura - comprimento) / 2
+    elif align == "R":
+        texto_x = x + largura - MARGEM_CELULA - comprimento
+    else:
+        texto_x = x + MARGEM_CELULA
+    # Linha de base no centro da célula, como no FPDF
+    texto_y = y + altura / 2 + 0.3 * TAMANHO_FONTE
+    shape.insert_text((texto_x, texto_y), texto, fontname=fonte, fontsize=TAMANHO_FONTE, color=_cor(cor_texto))
+
+def desenhar_tabela_sobreposta(page, layout, preco_colunas, prices):
+    """
+    Desenha a tabela de preços como vetor sobre a página, reproduzindo o visual de
+    desenhar_cabecalho/desenhar_linhas_tabela. layout vem de layout_tabela_personalizada.
+    """
+    x = layout["table_x"]
+    y = layout["table_y"]
+    altura = layout["cell_height"]
+    shape = page.new_shape()
+    _celula(shape, x, y, layout["total_width"], altura, "Preços/Unidade", "hebo",
+            layout["header_text_color"], layout["header_fill_color"], "C")
+    fill = False
+    for col in preco_colunas:
+        y += altura
+        fundo = (248, 248, 248) if fill else (255, 255, 255)
+        _celula(shape, x, y, layout["cell_width_left"], altura, str(col), "helv", COR_TEXTO_LINHAS, fundo, "L")
+        _celula(shape, x + layout["cell_width_left"], y, layout["cell_width_right"], altura,
+                f"R$ {prices[col]}", "helv", COR_TEXTO_LINHAS, fundo, "R")
+        fill = not fill
+    shape.commit()
@@ -0,0 +1,114 @@
+# src/thumbnail_cache.py
+import os
+import hashlib
+from collections import OrderedDict
+import fitz  # PyMuPDF
+from image_cache import ImageCache
+
+def pasta_miniaturas_padrao():
+    """
+    Retorna a pasta do cache de miniaturas do reorganizador (dentro de
+    Documentos/GeradorCatalogo/cache). Se a pasta não existir, ela será criada.
+    """
+    pasta = os.path.join(os.path.expanduser("~"), "Documents", "GeradorCatalogo", "cache", "miniaturas")
+    os.makedirs(pasta, exist_ok=True)
+    return pasta
+
+def assinatura_arquivo(caminho):
+    """(tamanho, data de modificação em ns) do arquivo, ou None se ele não puder ser lido."""
+    try:
+        stat = os.stat(caminho)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+class ThumbnailCache(ImageCache):
+    """
+    Cache de miniaturas: uma camada em memória (LRU de itens_em_memoria entradas)
+    sobre o cache em disco do ImageCache. Cada entrada é (largura, altura, bytes PNG).
+
+    A chave combina o arquivo de origem (caminho, tamanho e data de modificação),
+    o índice da página e a escala, então reabrir o mesmo catálogo reaproveita as
+    miniaturas e um arquivo alterado gera chaves novas.
+    """
+    def __init__(self, pasta, limite_bytes=128 * 1024 * 1024, itens_em_memoria=500):
+        super().__init__(pasta, limite_bytes)
+        self.itens_em_memoria = itens_em_memoria
+        self._memoria = OrderedDict()
+
+    def chave(self, caminho, pagina=None, escala=None):
+        """Calcula a chave da miniatura; retorna None se o arquivo não puder ser lido."""
+        caminho = os.path.abspath(os.path.normpath(caminho))
+        assinatura = assinatura_arquivo(caminho)
+        if assinatura is None:
+            return None
+        tamanho, mtime_ns = assinatura
+        texto = f"{os.path.normcase(caminho)}|{tamanho}|{mtime_ns}|{pagina}|{escala}"
+        return hashlib.sha1(texto.encode("utf-8")).hexdigest()
+
+    def _lembrar(self, chave, resultado):
+        self._memoria[chave] = resultado
+        self._memoria.move_to_end(chave)
+        while len(self._memoria) > self.itens_em_memoria:
+            self._memoria.popitem(last=False)
+
+    def obter(self, chave):
+        """Retorna (largura, altura, bytes_png) da memória ou do disco, ou None."""
+        if chave is None:
+            return None
+        resultado = self._memoria.get(chave)
+        if resultado is not None:
+            self._memoria.move_to_end(chave)
+            self.acertos += 1
+            return resultado
+        resultado = super().obter(chave)
+        if resultado is not None:
+            self._lembrar(chave, resultado)
+        return resultado
+
+    def gravar(self, chave, resultado):
+        if chave is None:
+            return
+        super().gravar(chave, resultado)
+        self._lembrar(chave, resultado)
+
+class DocumentPool:
+    """
+    Mantém abertos os últimos max_abertos documentos PDF (LRU), para que
+    miniaturas de um mesmo arquivo não o abram de novo a cada página.
+    Um arquivo alterado no disco é reaberto. Não é thread-safe: deve ser usado
+    por uma única thread (a de miniaturas).
+    """
+    def __init__(self, max_abertos=8):
+        self.max_abertos = max_abertos
+        self._abertos = OrderedDict()  # caminho -> (assinatura, documento)
+
+    def abrir(self, caminho):
+        caminho = os.path.normpath(caminho)
+        assinatura = assinatura_arquivo(caminho)
+        aberto = self._abertos.get(caminho)
+        if aberto is not None:
+            if aberto[0] == assinatura:
+                self._abertos.move_to_end(caminho)
+                return aberto[1]
+            self._fechar(caminho)
+        doc = fitz.open(caminho)
+        self._abertos[caminho] = (assinatura, doc)
+        while len(self._abertos) > self.max_abertos:
+            self._fechar(next(iter(self._abertos)))
+        return doc
+
+    def _fechar(self, caminho):
+        _, doc = self._abertos.pop(caminho)
+        doc.close()
+
+    def fechar(self, caminho):
+        """Fecha o documento caminho, se estiver aberto (ex.: antes de o arquivo ser substituído)."""
+        alvo = os.path.normcase(os.path.abspath(caminho))
+        for aberto in list(self._abertos):
+            if os.path.normcase(os.path.abspath(aberto)) == alvo:
+                self._fechar(aberto)
+
+    def fechar_todos(self):
+        for caminho in list(self._abertos):
+            self._fechar(caminho)
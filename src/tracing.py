@@ -0,0 +1,234 @@
+# src/tracing.py
+"""
+Medição de tempo por etapa da geração dos catálogos.
+
+Desativada por padrão: etapa() devolve um objeto que não faz nada, então o
+custo nas funções instrumentadas é desprezível. Para ativar, defina a variável
+de ambiente CATALOGO_TRACE com o arquivo do trace (ex.: CATALOGO_TRACE=trace.json)
+antes de abrir o programa ou use `python -m cli --trace trace.json ...`.
+
+Ao exportar são gravados dois arquivos:
+  - o trace no formato do Chrome (abrir em chrome://tracing ou https://ui.perfetto.dev),
+    com uma barra por etapa e por página e o pico de memória ao longo do tempo;
+  - <trace>.resumo.json, com chamadas, tempo total/médio/máximo, bytes lidos e
+    gravados por etapa e o pico de memória do processo.
+
+Só o processo atual é medido: com vários workers, a preparação das imagens
+aparece como o tempo de espera pelos resultados (use --workers 1 para ver cada
+imagem em detalhe).
+"""
+import os
+import sys
+import json
+import time
+import atexit
+import threading
+from functools import wraps
+
+VARIAVEL_AMBIENTE = "CATALOGO_TRACE"
+
+def pico_memoria_mb():
+    """Pico de memória residente do processo atual, em MB."""
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                        ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                        ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+        contadores = PROCESS_MEMORY_COUNTERS()
+        contadores.cb = ctypes.sizeof(contadores)
+        processo = ctypes.windll.kernel32.GetCurrentProcess()
+        ctypes.windll.psapi.GetProcessMemoryInfo(processo, ctypes.byref(contadores), contadores.cb)
+        return contadores.PeakWorkingSetSize / (1024 * 1024)
+    import resource
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa em KB; macOS em bytes
+    return pico / (1024 * 1024) if sys.platform == "darwin" else pico / 1024
+
+class Rastreador:
+    """Guarda as etapas medidas (eventos do trace do Chrome) de uma execução."""
+    def __init__(self, caminho=None):
+        self.caminho = caminho
+        self.pid = os.getpid()
+        self.inicio = time.perf_counter()
+        self.eventos = []
+        self._lock = threading.Lock()
+
+    def microssegundos(self, instante):
+        return (instante - self.inicio) * 1_000_000
+
+    def registrar(self, nome, inicio, fim, args):
+        memoria = pico_memoria_mb()
+        tid = threading.get_ident()
+        ts = round(self.microssegundos(inicio), 1)
+        dur = round((fim - inicio) * 1_000_000, 1)
+        with self._lock:
+            self.eventos.append({"name": nome, "ph": "X", "pid": self.pid, "tid": tid, "ts": ts, "dur": dur,
+                                 "args": args})
+            self.eventos.append({"name": "memoria", "ph": "C", "pid": self.pid, "tid": tid,
+                                 "ts": round(ts + dur, 1), "args": {"pico_mb": round(memoria, 1)}})
+
+    def limpar(self):
+        with self._lock:
+            self.eventos = []
+            self.inicio = time.perf_counter()
+
+class Etapa:
+    """Mede um trecho com `with`; adicionar() anexa dados à etapa (ex.: bytes gravados)."""
+    __slots__ = ("rastreador", "nome", "args", "inicio")
+
+    def __init__(self, rastreador, nome, args):
+        self.rastreador = rastreador
+        self.nome = nome
+        self.args = args
+        self.inicio = None
+
+    def adicionar(self, **args):
+        self.args.update(args)
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, tipo, erro, tb):
+        if tipo is not None:
+            self.args["erro"] = tipo.__name__
+        self.rastreador.registrar(self.nome, self.inicio, time.perf_counter(), self.args)
+        return False
+
+class _EtapaInativa:
+    """Etapa usada com a medição desativada: não registra nada."""
+    __slots__ = ()
+
+    def adicionar(self, **args):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, erro, tb):
+        return False
+
+_ETAPA_INATIVA = _EtapaInativa()
+_rastreador = None
+
+def ativar(caminho=None):
+    """Ativa a medição; caminho é onde exportar() grava o trace."""
+    global _rastreador
+    _rastreador = Rastreador(caminho)
+    return _rastreador
+
+def ativar_pelo_ambiente(sufixo=""):
+    """
+    Ativa a medição se CATALOGO_TRACE estiver definida (chamada pelos pontos de
+    entrada, não pelos workers). sufixo separa o trace de cada programa
+    (ex.: trace_reorganizador.json). O trace é exportado ao sair.
+    """
+    caminho = os.environ.get(VARIAVEL_AMBIENTE)
+    if not caminho:
+        return False
+    base, ext = os.path.splitext(caminho)
+    ativar(f"{base}{sufixo}{ext or '.json'}")
+    return True
+
+def desativar():
+    global _rastreador
+    _rastreador = None
+
+def ativo():
+    return _rastreador is not None
+
+def caminho_trace():
+    """Arquivo em que exportar() grava o trace (None se a medição estiver desativada)."""
+    return _rastreador.caminho if _rastreador is not None else None
+
+def etapa(nome, **args):
+    """
+    Mede o bloco `with etapa("pdf.output", arquivo=...) as e:`; args (e os de
+    e.adicionar) aparecem no trace. Use bytes_lidos/bytes_gravados para que o
+    resumo some o volume de dados de cada etapa.
+    """
+    if _rastreador is None:
+        return _ETAPA_INATIVA
+    return Etapa(_rastreador, nome, args)
+
+def cronometrado(nome):
+    """Decorador que mede cada chamada da função como a etapa nome."""
+    def decorador(funcao):
+        @wraps(funcao)
+        def medida(*args, **kwargs):
+            if _rastreador is None:
+                return funcao(*args, **kwargs)
+            with Etapa(_rastreador, nome, {}):
+                return funcao(*args, **kwargs)
+        return medida
+    return decorador
+
+def tamanho_arquivo(caminho):
+    """Tamanho do arquivo em bytes (0 se não existir), para bytes_lidos/bytes_gravados."""
+    try:
+        return os.path.getsize(caminho)
+    except OSError:
+        return 0
+
+def resumo(rastreador=None):
+    """Agrupa as etapas por nome: chamadas, tempos (ms) e bytes lidos/gravados."""
+    rastreador = rastreador or _rastreador
+    etapas = {}
+    for evento in (rastreador.eventos if rastreador else []):
+        if evento["ph"] != "X":
+            continue
+        dados = etapas.setdefault(evento["name"], {"chamadas": 0, "total_ms": 0.0, "max_ms": 0.0,
+                                                   "bytes_lidos": 0, "bytes_gravados": 0})
+        duracao = evento["dur"] / 1000
+        dados["chamadas"] += 1
+        dados["total_ms"] += duracao
+        dados["max_ms"] = max(dados["max_ms"], duracao)
+        dados["bytes_lidos"] += evento["args"].get("bytes_lidos", 0)
+        dados["bytes_gravados"] += evento["args"].get("bytes_gravados", 0)
+    for dados in etapas.values():
+        dados["media_ms"] = round(dados["total_ms"] / dados["chamadas"], 3)
+        dados["total_ms"] = round(dados["total_ms"], 3)
+        dados["max_ms"] = round(dados["max_ms"], 3)
+    return {"etapas": etapas, "pico_memoria_mb": round(pico_memoria_mb(), 1)}
+
+def caminho_resumo(caminho):
+    """Arquivo do resumo correspondente ao trace (trace.json -> trace.resumo.json)."""
+    base, _ = os.path.splitext(caminho)
+    return base + ".resumo.json"
+
+def exportar(caminho=None, limpar=False):
+    """
+    Grava o trace do Chrome em caminho (padrão: o informado ao ativar) e o resumo
+    ao lado dele. Com limpar, a próxima execução começa um trace novo.
+    Retorna o resumo, ou None se a medição estiver desativada.
+    """
+    rastreador = _rastreador
+    if rastreador is None:
+        return None
+    caminho = caminho or rastreador.caminho
+    dados = resumo(rastreador)
+    if caminho:
+        with rastreador._lock:
+            eventos = list(rastreador.eventos)
+        metadados = [{"name": "process_name", "ph": "M", "pid": rastreador.pid,
+                      "args": {"name": "Gerador de Catálogos"}}]
+        with open(caminho, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": metadados + eventos, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+        with open(caminho_resumo(caminho), "w", encoding="utf-8") as f:
+            json.dump(dados, f, ensure_ascii=False, indent=2)
+    if limpar:
+        rastreador.limpar()
+    return dados
+
+def _exportar_ao_sair():
+    # Só o processo que ativou a medição grava (processos filhos herdam o estado no fork)
+    if _rastreador is not None and _rastreador.pid == os.getpid() and _rastreador.eventos:
+        exportar()
+
+atexit.register(_exportar_ao_sair)
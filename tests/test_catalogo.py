@@ -0,0 +1,55 @@
+# tests/test_catalogo.py
+import os
+import pickle
+import pytest
+import catalogo
+from benchmarks.dados_sinteticos import gerar_planilha
+
+CODIGOS = ["LFC-0000", "LVZ-0000", "LFC-0001"]
+
+class _IncompativelAoCarregar:
+    """Objeto cujo unpickle falha com TypeError, como um DataFrame de outra versão do pandas."""
+    def __reduce__(self):
+        return (int, ("1", 10, "sobra"))
+
+@pytest.fixture
+def planilha(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    monkeypatch.setenv("USERPROFILE", str(tmp_path / "home"))
+    caminho = str(tmp_path / "planilha.ods")
+    gerar_planilha(caminho, CODIGOS)
+    return caminho
+
+def test_snapshot_reaproveitado(planilha, monkeypatch):
+    df, codigo_coluna, _ = catalogo.carregar_planilha(planilha)
+    assert os.path.exists(catalogo._caminho_snapshot_planilha(planilha))
+    monkeypatch.setattr(catalogo.pd, "read_excel", lambda *a, **k: pytest.fail("planilha lida de novo"))
+    df2, codigo_coluna2, _ = catalogo.carregar_planilha(planilha)
+    assert codigo_coluna2 == codigo_coluna and df2.equals(df)
+
+@pytest.mark.parametrize("conteudo", [
+    pickle.dumps(_IncompativelAoCarregar()),
+    pickle.dumps({"versao": catalogo.SNAPSHOT_PLANILHA_VERSAO})[:-4],
+    b"lixo",
+], ids=["outra_versao", "truncado", "lixo"])
+def test_snapshot_ilegivel_le_a_planilha(planilha, conteudo):
+    esperado = catalogo.carregar_planilha(planilha, usar_snapshot=False)
+    caminho = catalogo._caminho_snapshot_planilha(planilha)
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    with open(caminho, "wb") as f:
+        f.write(conteudo)
+    df, codigo_coluna, preco_colunas = catalogo.carregar_planilha(planilha)
+    assert df.equals(esperado[0]) and codigo_coluna == esperado[1] and preco_colunas == esperado[2]
+    # O snapshot é regravado e não sobram temporários
+    assert catalogo._ler_snapshot_planilha(planilha) is not None
+    assert os.listdir(os.path.dirname(caminho)) == [os.path.basename(caminho)]
+
+def test_planilha_xlsx_igual_a_ods(planilha, tmp_path):
+    pytest.importorskip("openpyxl")
+    caminho_xlsx = str(tmp_path / "planilha.xlsx")
+    gerar_planilha(caminho_xlsx, CODIGOS)
+    df_ods, codigo_ods, precos_ods = catalogo.carregar_planilha(planilha, usar_snapshot=False)
+    df_xlsx, codigo_xlsx, precos_xlsx = catalogo.carregar_planilha(caminho_xlsx, usar_snapshot=False)
+    assert (codigo_xlsx, precos_xlsx) == (codigo_ods, precos_ods)
+    assert df_xlsx[codigo_xlsx].tolist() == df_ods[codigo_ods].tolist() == CODIGOS
+    assert df_xlsx[precos_xlsx].astype(float).equals(df_ods[precos_ods].astype(float))
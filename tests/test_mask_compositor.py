@@ -0,0 +1,128 @@
+# tests/test_mask_compositor.py
+import os
+import numpy as np
+import pytest
+from PIL import Image
+from mask_compositor import MascaraPreparada, LANCZOS, compor_fotos, fotos_pendentes
+
+def compor_original(imagem, mascara):
+    """Composição da versão original da ferramenta de máscara (Image.alpha_composite)."""
+    imagem = imagem.convert("RGBA")
+    if imagem.size != mascara.size:
+        mascara = mascara.resize(imagem.size, LANCZOS)
+    return Image.alpha_composite(imagem, mascara).convert("RGB")
+
+def mascara_parcial(tamanho=(160, 120)):
+    """Máscara com alfa variado só em um retângulo; o resto é transparente."""
+    gerador = np.random.default_rng(1)
+    dados = np.zeros((tamanho[1], tamanho[0], 4), dtype=np.uint8)
+    dados[30:90, 40:130] = gerador.integers(0, 256, (60, 90, 4))
+    dados[30:90, 40:60, 3] = 255
+    return Image.fromarray(dados, "RGBA")
+
+def foto(modo, tamanho=(320, 240), alfa=None):
+    dados = np.random.default_rng(2).integers(0, 256, (tamanho[1], tamanho[0], 4), dtype=np.uint8)
+    if alfa is not None:
+        dados[:, :, 3] = alfa
+    return Image.fromarray(dados, "RGBA").convert(modo)
+
+@pytest.mark.parametrize("modo", ["RGB", "L", "P", "RGBA"])
+@pytest.mark.parametrize("tamanho_mascara", [(320, 240), (160, 120)])
+def test_igual_alpha_composite(modo, tamanho_mascara):
+    mascara = mascara_parcial().resize(tamanho_mascara, LANCZOS)
+    imagem = foto(modo)
+    resultado = MascaraPreparada(mascara).aplicar(imagem)
+    assert resultado.mode == "RGB" and resultado.size == imagem.size
+    assert np.array_equal(np.asarray(resultado), np.asarray(compor_original(imagem, mascara)))
+
+def test_rgba_opaca_igual_alpha_composite():
+    imagem = foto("RGBA", alfa=255)
+    mascara = mascara_parcial()
+    resultado = MascaraPreparada(mascara).aplicar(imagem)
+    assert np.array_equal(np.asarray(resultado), np.asarray(compor_original(imagem, mascara)))
+
+def test_mascara_menor_que_a_caixa_altera_so_a_regiao():
+    mascara = mascara_parcial()
+    imagem = foto("RGB", tamanho=mascara.size)
+    resultado = np.asarray(MascaraPreparada(mascara).aplicar(imagem))
+    original = np.asarray(imagem)
+    esquerda, topo, direita, base = mascara.getchannel("A").getbbox()
+    fora = np.ones(original.shape[:2], dtype=bool)
+    fora[topo:base, esquerda:direita] = False
+    assert np.array_equal(resultado[fora], original[fora])
+    assert np.array_equal(resultado, np.asarray(compor_original(imagem, mascara)))
+
+def test_mascara_transparente_devolve_copia():
+    mascara = Image.new("RGBA", (40, 30), (255, 0, 0, 0))
+    imagem = foto("RGB", tamanho=(80, 60))
+    resultado = MascaraPreparada(mascara).aplicar(imagem)
+    assert resultado is not imagem
+    assert np.array_equal(np.asarray(resultado), np.asarray(compor_original(imagem, mascara)))
+
+def test_tamanhos_em_cache():
+    preparada = MascaraPreparada(mascara_parcial(), max_tamanhos=2)
+    for tamanho in [(320, 240), (160, 120), (320, 240), (80, 60)]:
+        preparada.aplicar(foto("RGB", tamanho=tamanho))
+    assert list(preparada._por_tamanho) == [(320, 240), (80, 60)]
+
+def envelhecer(*caminhos, segundos):
+    """Atrasa a data de modificação (as execuções anteriores aconteceram antes desta)."""
+    for caminho in caminhos:
+        instante = os.stat(caminho).st_mtime_ns - segundos * 10 ** 9
+        os.utime(caminho, ns=(instante, instante))
+
+def criar_fotos(pasta, nomes, tamanho):
+    pasta.mkdir()
+    for nome in nomes:
+        Image.new("RGB", tamanho, (128, 128, 128)).save(pasta / nome)
+    envelhecer(*(pasta / nome for nome in nomes), segundos=60)
+
+def processar_pasta(pasta, pasta_saida, caminho_mascara):
+    """Aplica a máscara nas fotos pendentes; retorna (processadas, ignoradas)."""
+    ignoradas = []
+    tarefas = fotos_pendentes(str(pasta), str(pasta_saida), str(caminho_mascara), ao_ignorar=ignoradas.append)
+    resultados = list(compor_fotos(str(caminho_mascara), tarefas, workers=1))
+    assert all(erro is None for _, erro in resultados)
+    return len(resultados), len(ignoradas)
+
+def cor_central(caminho):
+    with Image.open(caminho) as img:
+        return img.convert("RGB").getpixel((img.width // 2, img.height // 2))
+
+@pytest.mark.parametrize("mesmo_arquivo", [True, False])
+def test_trocar_mascara_reprocessa_fotos(tmp_path, mesmo_arquivo):
+    pasta, pasta_saida = tmp_path / "fotos", tmp_path / "fotos" / "saida"
+    criar_fotos(pasta, ("a.jpg", "b.png"), (80, 60))
+    vermelha, verde = tmp_path / "vermelha.png", tmp_path / ("vermelha.png" if mesmo_arquivo else "verde.png")
+    Image.new("RGBA", (80, 60), (255, 0, 0, 255)).save(vermelha)
+    envelhecer(vermelha, segundos=120)
+    assert processar_pasta(pasta, pasta_saida, vermelha) == (2, 0)
+    assert processar_pasta(pasta, pasta_saida, vermelha) == (0, 2)
+    envelhecer(pasta_saida / "a.jpg", pasta_saida / "b.png", segundos=30)
+
+    # A nova máscara é mais antiga que as saídas (ex.: arquivo copiado mantendo a data)
+    Image.new("RGBA", (80, 60), (0, 255, 0, 255)).save(verde)
+    envelhecer(verde, segundos=120)
+    assert processar_pasta(pasta, pasta_saida, verde) == (2, 0)
+    for nome in ("a.jpg", "b.png"):
+        r, g, b = cor_central(pasta_saida / nome)
+        assert g > 200 and r < 60 and b < 60
+    assert processar_pasta(pasta, pasta_saida, verde) == (0, 2)
+
+def test_execucao_interrompida_nao_marca_saidas_antigas(tmp_path):
+    pasta, pasta_saida = tmp_path / "fotos", tmp_path / "saida"
+    criar_fotos(pasta, ("a.jpg", "b.jpg"), (40, 30))
+    vermelha, verde = tmp_path / "vermelha.png", tmp_path / "verde.png"
+    Image.new("RGBA", (40, 30), (255, 0, 0, 255)).save(vermelha)
+    Image.new("RGBA", (40, 30), (0, 255, 0, 255)).save(verde)
+    assert processar_pasta(pasta, pasta_saida, vermelha) == (2, 0)
+    envelhecer(pasta_saida / "a.jpg", pasta_saida / "b.jpg", segundos=30)
+    # Execução com a nova máscara interrompida depois da primeira foto
+    fotos = compor_fotos(str(verde), fotos_pendentes(str(pasta), str(pasta_saida), str(verde)), workers=1)
+    origem, erro = next(fotos)
+    fotos.close()
+    assert erro is None
+    # Só a foto que ainda tem a máscara anterior é processada de novo
+    assert processar_pasta(pasta, pasta_saida, verde) == (1, 1)
+    for nome in ("a.jpg", "b.jpg"):
+        assert cor_central(pasta_saida / nome)[1] > 200
@@ -0,0 +1,83 @@
+# tests/test_pdf_stream.py
+import io
+import fitz
+import numpy as np
+from PIL import Image
+from pdf_stream import StreamingPDF
+
+PAGINA = (400, 300)
+
+def jpeg(semente, tamanho=(64, 48)):
+    dados = np.random.default_rng(semente).integers(0, 256, (tamanho[1], tamanho[0], 3), dtype=np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(dados, "RGB").save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+def gerar_origem(caminho, textos, foto):
+    """Grava uma página por texto, todas com a mesma foto e uma célula com o texto."""
+    pdf = StreamingPDF(caminho)
+    for texto in textos:
+        pdf.add_page(format=PAGINA)
+        pdf.image(foto, 10, 10, 200, 150)
+        pdf.set_font("Arial", "B", 12)
+        pdf.set_xy(10, 200)
+        pdf.cell(300, 20, texto, border=1, align="C", fill=True)
+    pdf.output()
+
+def herdar_da_arvore(caminho, mediabox, rotacao):
+    """Move /MediaBox para a árvore de páginas e define /Rotate nela (atributos herdados)."""
+    with fitz.open(caminho) as doc:
+        raiz = int(doc.xref_get_key(doc.pdf_catalog(), "Pages")[1].split()[0])
+        doc.xref_set_key(raiz, "MediaBox", mediabox)
+        doc.xref_set_key(raiz, "Rotate", str(rotacao))
+        for numero in range(doc.page_count):
+            doc.xref_set_key(doc.page_xref(numero), "MediaBox", "null")
+        dados = doc.tobytes()
+    with open(caminho, "wb") as f:
+        f.write(dados)
+
+def anotar(caminho, texto):
+    """Acrescenta uma anotação de texto na primeira página (string literal no dicionário do objeto)."""
+    with fitz.open(caminho) as doc:
+        doc[0].add_text_annot((20, 20), texto)
+        dados = doc.tobytes()
+    with open(caminho, "wb") as f:
+        f.write(dados)
+
+def imagens_do_arquivo(doc):
+    return [xref for xref in range(1, doc.xref_length())
+            if doc.xref_get_key(xref, "Subtype")[1] == "/Image"]
+
+def test_copiar_paginas_ida_e_volta(tmp_path):
+    foto = jpeg(0)
+    origem_a, origem_b = str(tmp_path / "a.pdf"), str(tmp_path / "b.pdf")
+    gerar_origem(origem_a, ["Página A1", "Referência (12 0 R)"], foto)
+    gerar_origem(origem_b, ["Página B1"], foto)
+    anotar(origem_a, "ver 3 0 R")
+    herdar_da_arvore(origem_b, "[0 0 500 250]", 90)
+
+    destino = str(tmp_path / "juntos.pdf")
+    pdf = StreamingPDF(destino)
+    with fitz.open(origem_a) as a:
+        copiados = {}
+        # Duas cópias da mesma origem compartilham o mapa: fontes e foto uma vez só
+        pdf.copiar_paginas(a, 0, 0, copiados)
+        pdf.copiar_paginas(a, 1, 1, copiados)
+    with fitz.open(origem_b) as b:
+        pdf.copiar_paginas(b, 0, 0, {})
+    pdf.output()
+
+    with fitz.open(destino) as doc:
+        assert not doc.is_repaired
+        assert doc.page_count == 3
+        assert [tuple(doc[n].mediabox) for n in range(2)] == [(0, 0, *PAGINA)] * 2
+        assert tuple(doc[2].mediabox) == (0, 0, 500, 250) and doc[2].rotation == 90
+        assert [doc[n].get_text().strip() for n in range(3)] == ["Página A1", "Referência (12 0 R)", "Página B1"]
+        # Referências dentro de strings não são remapeadas
+        assert [annot.info["content"] for annot in doc[0].annots()] == ["ver 3 0 R"]
+        # A foto repetida nas duas origens é gravada uma única vez
+        assert len(imagens_do_arquivo(doc)) == 1
+        assert {img[0] for n in range(3) for img in doc[n].get_images()} == set(imagens_do_arquivo(doc))
+        assert doc[0].get_fonts() == doc[1].get_fonts()
+        extraida = doc.extract_image(imagens_do_arquivo(doc)[0])
+        assert extraida["ext"] == "jpeg" and extraida["image"] == foto
@@ -0,0 +1,77 @@
+# tests/test_pdf_utils.py
+from io import BytesIO
+import pytest
+from PIL import Image, ImageChops, ImageStat
+from pdf_utils import (aplicar_draft, reduzir_imagem, abrir_imagem_reduzida, tamanho_reduzido,
+                       preparar_imagem_perfis)
+
+# Diferença aceita entre a redução com e sem draft (níveis de 0 a 255, por canal): na
+# média e em 99% dos pixels (bordas do fractal podem variar mais em pixels isolados)
+TOLERANCIA_MEDIA = 1.0
+TOLERANCIA_P99 = 8
+
+def percentil(histograma, fracao):
+    """Menor nível que cobre fracao dos valores de um histograma de canal (256 posições)."""
+    limite = fracao * sum(histograma)
+    acumulado = 0
+    for nivel, quantidade in enumerate(histograma):
+        acumulado += quantidade
+        if acumulado >= limite:
+            return nivel
+    return 255
+
+def foto_jpeg(tamanho, quality=92):
+    """JPEG com detalhes finos (fractal) e gradientes, parecido com uma foto de produto."""
+    detalhe = Image.effect_mandelbrot(tamanho, (-2.2, -1.3, 1.0, 1.3), 80)
+    img = Image.merge("RGB", (detalhe, Image.linear_gradient("L").resize(tamanho),
+                              Image.radial_gradient("L").resize(tamanho)))
+    buffer = BytesIO()
+    img.save(buffer, format="JPEG", quality=quality)
+    return buffer.getvalue()
+
+@pytest.fixture(scope="module")
+def foto():
+    return foto_jpeg((3001, 2203))
+
+@pytest.mark.parametrize("max_size", [(400, 400), (150, 150)])
+def test_draft_decodifica_reduzida(foto, max_size):
+    with Image.open(BytesIO(foto)) as img:
+        assert aplicar_draft(img, max_size) is not None
+        assert img.width < 3001 and img.width >= 2 * max_size[0]
+
+@pytest.mark.parametrize("max_size", [(1024, 1024), (400, 400), (150, 150)])
+def test_draft_mantem_qualidade(foto, max_size):
+    with Image.open(BytesIO(foto)) as img:
+        com_draft = reduzir_imagem(img, max_size)
+    with Image.open(BytesIO(foto)) as img:
+        tamanho = tamanho_reduzido(img.size, max_size)
+        sem_draft = img.convert("RGB").resize(tamanho, Image.BICUBIC, reducing_gap=2.0)
+    assert com_draft.size == sem_draft.size
+    diferenca = ImageChops.difference(com_draft, sem_draft)
+    assert max(ImageStat.Stat(diferenca).mean) <= TOLERANCIA_MEDIA
+    for canal in diferenca.split():
+        assert percentil(canal.histogram(), 0.99) <= TOLERANCIA_P99
+
+@pytest.mark.parametrize("tamanho,max_size", [
+    ((2416, 4187), (150, 150)),
+    ((4136, 770), (400, 400)),
+    ((3374, 2005), (768, 768)),
+    ((4529, 4320), (768, 768)),
+    ((1637, 4953), (1024, 1024)),
+])
+def test_tamanho_com_draft_igual_tamanho_reduzido(tmp_path, tamanho, max_size):
+    caminho = tmp_path / "foto.jpg"
+    Image.new("RGB", tamanho, (120, 90, 60)).save(caminho, quality=50)
+    esperado = tamanho_reduzido(tamanho, max_size)
+    with Image.open(caminho) as img:
+        assert reduzir_imagem(img, max_size).size == esperado
+    assert abrir_imagem_reduzida(str(caminho), max_size).size == esperado
+
+@pytest.mark.parametrize("tamanho", [(617, 4248), (4057, 837), (3911, 3994), (2080, 1350), (4846, 3707)])
+def test_perfis_com_tamanho_reduzido(tmp_path, tamanho):
+    caminho = tmp_path / "foto.jpg"
+    Image.new("RGB", tamanho, (120, 90, 60)).save(caminho, quality=50)
+    perfis = [((2048, 2048), 92), ((1024, 1024), 85), ((768, 768), 70)]
+    for (max_size, _), (_, _, dados) in zip(perfis, preparar_imagem_perfis(str(caminho), perfis)):
+        with Image.open(BytesIO(dados)) as img:
+            assert img.size == tamanho_reduzido(tamanho, max_size)
@@ -0,0 +1,136 @@
+# tests/test_retomada.py
+import os
+import json
+import fitz
+import pytest
+import catalogo
+from build_journal import pasta_trabalho
+from benchmarks.dados_sinteticos import codigos_sinteticos, gerar_fotos, gerar_planilha
+
+GRUPOS = {"Churrasco": ["LFC-"], "Vazadas Gerais": ["LVZ-"]}
+GRUPOS_ORDENADOS = list(GRUPOS)
+# Com blocos de 2 páginas, cada grupo de 5 fotos fica em blocos [0, 1], [2, 3], [4]
+PAGINAS_POR_BLOCO = 2
+CODIGOS = codigos_sinteticos(GRUPOS, 10)
+# Códigos na ordem das páginas (grupo a grupo)
+ORDEM_PAGINAS = [codigo for prefixo in ("LFC-", "LVZ-") for codigo in CODIGOS if codigo.startswith(prefixo)]
+DEFEITUOSA = "LVZ-0001"  # 7ª página: falha no primeiro bloco do segundo grupo
+
+@pytest.fixture
+def catalogo_sintetico(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    monkeypatch.setenv("USERPROFILE", str(tmp_path / "home"))
+    monkeypatch.setattr(catalogo, "PAGINAS_POR_BLOCO", PAGINAS_POR_BLOCO)
+    pasta = str(tmp_path / "imagens")
+    gerar_fotos(pasta, CODIGOS, (120, 90), capas=False)
+    planilha = str(tmp_path / "planilha.ods")
+    gerar_planilha(planilha, CODIGOS)
+    df, codigo_coluna, preco_colunas = catalogo.carregar_planilha(planilha, usar_snapshot=False)
+    # Registra as fotos preparadas em cada geração (as páginas que foram geradas de novo)
+    preparadas = []
+    preparar = catalogo.preparar_imagens_perfis
+
+    def registrar(caminhos, *args, **kwargs):
+        preparadas.append([os.path.splitext(os.path.basename(c))[0] for c in caminhos])
+        return preparar(caminhos, *args, **kwargs)
+
+    monkeypatch.setattr(catalogo, "preparar_imagens_perfis", registrar)
+
+    def gerar(saida, **opcoes):
+        mensagens = []
+        ok = catalogo.gerar_catalogo_personalizado(
+            "Teste", pasta, str(saida), df, codigo_coluna, preco_colunas, GRUPOS_ORDENADOS, GRUPOS,
+            progresso=lambda mensagem, *_: mensagens.append(mensagem), workers=1, usar_cache=False, **opcoes)
+        return ok, mensagens
+
+    return pasta, gerar, preparadas
+
+def estragar(pasta, codigo):
+    """Troca a foto por um arquivo que não é imagem; retorna o conteúdo original."""
+    caminho = os.path.join(pasta, f"{codigo}.jpg")
+    with open(caminho, "rb") as f:
+        original = f.read()
+    with open(caminho, "wb") as f:
+        f.write(b"nao e uma imagem")
+    return original
+
+def restaurar(pasta, codigo, conteudo):
+    with open(os.path.join(pasta, f"{codigo}.jpg"), "wb") as f:
+        f.write(conteudo)
+
+def blocos_do_diario(saida):
+    with open(os.path.join(pasta_trabalho(str(saida)), "diario.json"), "r", encoding="utf-8") as f:
+        return json.load(f)["blocos"]
+
+def paginas_renderizadas(caminho):
+    with fitz.open(caminho) as doc:
+        return [doc[n].get_pixmap(dpi=30).samples for n in range(doc.page_count)]
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_retoma_geracao_interrompida(catalogo_sintetico, tmp_path, streaming):
+    pasta, gerar, preparadas = catalogo_sintetico
+    saida = tmp_path / "saida" / "catalogo.pdf"
+    original = estragar(pasta, DEFEITUOSA)
+    ok, mensagens = gerar(saida, streaming=streaming)
+    assert ok is False
+    assert any("aproveitadas na próxima geração" in mensagem for mensagem in mensagens)
+    # Os blocos do primeiro grupo ficam no diário; o catálogo não é gravado
+    blocos = blocos_do_diario(saida)
+    assert [len(bloco["paginas"]) for bloco in blocos] == [2, 2, 1]
+    assert all(os.path.exists(os.path.join(pasta_trabalho(str(saida)), b["arquivo"])) for b in blocos)
+    assert not os.path.exists(saida)
+
+    restaurar(pasta, DEFEITUOSA, original)
+    ok, mensagens = gerar(saida, streaming=streaming)
+    assert ok is True
+    assert any(mensagem.startswith("⏯ 5 páginas recuperadas") for mensagem in mensagens)
+    # Só as páginas que faltavam (segundo grupo) são geradas de novo
+    assert preparadas[-1] == ORDEM_PAGINAS[5:]
+    assert not os.path.exists(pasta_trabalho(str(saida)))
+
+    # O catálogo retomado é igual ao gerado sem interrupção
+    completo = tmp_path / "completo" / "catalogo.pdf"
+    assert gerar(completo, streaming=streaming)[0] is True
+    assert paginas_renderizadas(saida) == paginas_renderizadas(completo)
+
+def test_entradas_alteradas_descartam_o_diario(catalogo_sintetico, tmp_path):
+    pasta, gerar, preparadas = catalogo_sintetico
+    saida = tmp_path / "catalogo.pdf"
+    original = estragar(pasta, DEFEITUOSA)
+    assert gerar(saida)[0] is False
+    assert len(blocos_do_diario(saida)) == 3
+    restaurar(pasta, DEFEITUOSA, original)
+
+    # Com outro estilo nenhuma página do diário corresponde: todas são geradas de novo
+    ok, mensagens = gerar(saida, style="principal")
+    assert ok is True
+    assert not any(mensagem.startswith("⏯") for mensagem in mensagens)
+    assert preparadas[-1] == ORDEM_PAGINAS
+    assert not os.path.exists(pasta_trabalho(str(saida)))
+
+def test_foto_alterada_nao_e_recuperada(catalogo_sintetico, tmp_path):
+    pasta, gerar, preparadas = catalogo_sintetico
+    saida = tmp_path / "catalogo.pdf"
+    original = estragar(pasta, DEFEITUOSA)
+    assert gerar(saida)[0] is False
+    restaurar(pasta, DEFEITUOSA, original)
+    # Foto de um bloco já concluído trocada entre as execuções
+    os.remove(os.path.join(pasta, "LFC-0001.jpg"))
+    gerar_fotos(pasta, ["LFC-0001"], (120, 90), semente=1, capas=False)
+
+    ok, mensagens = gerar(saida)
+    assert ok is True
+    assert any(mensagem.startswith("⏯ 4 páginas recuperadas") for mensagem in mensagens)
+    assert preparadas[-1] == ["LFC-0001"] + ORDEM_PAGINAS[5:]
+
+def test_sem_incremental_descarta_blocos_anteriores(catalogo_sintetico, tmp_path):
+    pasta, gerar, preparadas = catalogo_sintetico
+    saida = tmp_path / "catalogo.pdf"
+    original = estragar(pasta, DEFEITUOSA)
+    assert gerar(saida)[0] is False
+    restaurar(pasta, DEFEITUOSA, original)
+
+    assert gerar(saida, incremental=False)[0] is True
+    assert preparadas[-1] == ORDEM_PAGINAS
+    with fitz.open(saida) as doc:
+        assert doc.page_count == len(CODIGOS)